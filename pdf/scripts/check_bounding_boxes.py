@@ -1,4 +1,6 @@
 from dataclasses import dataclass
+import bisect
+import heapq
 import json
 import sys
 
@@ -14,36 +16,77 @@ class RectAndField:
     field: dict
 
 
+def rects_intersect(r1, r2):
+    disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
+    disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
+    return not (disjoint_horizontal or disjoint_vertical)
+
+
+# Returns {i: [j, ...]} for every pair i < j of boxes on the same page that intersect.
+# Boxes are swept left to right per page, and only boxes whose x-range is still open
+# at the sweep position are compared, instead of comparing every pair. Those open boxes
+# are kept sorted by their top, so a box is only compared with the ones whose top lies
+# within the tallest box's height above its own top and no lower than its bottom.
+def find_intersecting_pairs(rects_and_fields: list[RectAndField]) -> dict[int, list[int]]:
+    by_page = {}
+    for idx, rf in enumerate(rects_and_fields):
+        by_page.setdefault(rf.field["page_number"], []).append(idx)
+
+    intersections = {}
+    for indices in by_page.values():
+        # Use normalized ranges so reversed coordinates can't hide an intersection.
+        spans = {}
+        for idx in indices:
+            x0, y0, x1, y1 = rects_and_fields[idx].rect
+            spans[idx] = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        max_height = max(y1 - y0 for _, y0, _, y1 in spans.values())
+        active = []  # sorted (y0, idx) of the open boxes
+        expiry = []  # heap of (x1, idx) of the open boxes
+        for idx in sorted(indices, key=lambda k: spans[k][0]):
+            x0, y0, _, y1 = spans[idx]
+            while expiry and expiry[0][0] <= x0:
+                _, a = heapq.heappop(expiry)
+                del active[bisect.bisect_left(active, (spans[a][1], a))]
+            first = bisect.bisect_left(active, (y0 - max_height, -1))
+            last = bisect.bisect_right(active, (y1, len(rects_and_fields)))
+            for _, a in active[first:last]:
+                i, j = min(a, idx), max(a, idx)
+                if rects_intersect(rects_and_fields[i].rect, rects_and_fields[j].rect):
+                    intersections.setdefault(i, []).append(j)
+            bisect.insort(active, (y0, idx))
+            heapq.heappush(expiry, (spans[idx][2], idx))
+
+    for js in intersections.values():
+        js.sort()
+    return intersections
+
+
 # Returns a list of messages that are printed to stdout for Claude to read.
 def get_bounding_box_messages(fields_json_stream) -> list[str]:
     messages = []
     fields = json.load(fields_json_stream)
     messages.append(f"Read {len(fields['form_fields'])} fields")
 
-    def rects_intersect(r1, r2):
-        disjoint_horizontal = r1[0] >= r2[2] or r1[2] <= r2[0]
-        disjoint_vertical = r1[1] >= r2[3] or r1[3] <= r2[1]
-        return not (disjoint_horizontal or disjoint_vertical)
-
     rects_and_fields = []
     for f in fields["form_fields"]:
         rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
         rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
 
+    # Maps each index to the later indices it intersects, in increasing order.
+    intersections = find_intersecting_pairs(rects_and_fields)
+
     has_error = False
     for i, ri in enumerate(rects_and_fields):
-        # This is O(N^2); we can optimize if it becomes a problem.
-        for j in range(i + 1, len(rects_and_fields)):
+        for j in intersections.get(i, []):
             rj = rects_and_fields[j]
-            if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
-                has_error = True
-                if ri.field is rj.field:
-                    messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
-                else:
-                    messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
-                if len(messages) >= 20:
-                    messages.append("Aborting further checks; fix bounding boxes and try again")
-                    return messages
+            has_error = True
+            if ri.field is rj.field:
+                messages.append(f"FAILURE: intersection between label and entry bounding boxes for `{ri.field['description']}` ({ri.rect}, {rj.rect})")
+            else:
+                messages.append(f"FAILURE: intersection between {ri.rect_type} bounding box for `{ri.field['description']}` ({ri.rect}) and {rj.rect_type} bounding box for `{rj.field['description']}` ({rj.rect})")
+            if len(messages) >= 20:
+                messages.append("Aborting further checks; fix bounding boxes and try again")
+                return messages
         if ri.rect_type == "entry":
             if "entry_text" in ri.field:
                 font_size = ri.field["entry_text"].get("font_size", 14)
@@ -1,7 +1,10 @@
 import unittest
 import json
 import io
-from check_bounding_boxes import get_bounding_box_messages
+import random
+from unittest import mock
+import check_bounding_boxes
+from check_bounding_boxes import RectAndField, find_intersecting_pairs, get_bounding_box_messages, rects_intersect
 
 
 # Currently this is not run automatically in CI; it's just for documentation and manual checking.
@@ -220,7 +223,58 @@ class TestGetBoundingBoxMessages(unittest.TestCase):
         messages = get_bounding_box_messages(stream)
         self.assertTrue(any("SUCCESS" in msg for msg in messages))
         self.assertFalse(any("FAILURE" in msg for msg in messages))
-    
+
+    def test_intersections_match_all_pairs(self):
+        """Test that the sweep reports the same pairs, in the same order, as comparing all pairs"""
+        rng = random.Random(0)
+        fields = []
+        for i in range(60):
+            x, y = rng.randint(0, 400), rng.randint(0, 400)
+            fields.append({
+                "description": f"Field{i}",
+                "page_number": rng.randint(1, 2),
+                "label_bounding_box": [x, y, x + rng.randint(1, 60), y + rng.randint(1, 30)],
+                "entry_bounding_box": [x + 30, y, x + 30 + rng.randint(1, 80), y + rng.randint(1, 30)]
+            })
+        rects_and_fields = []
+        for f in fields:
+            rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
+            rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
+
+        expected = {}
+        for i, ri in enumerate(rects_and_fields):
+            for j in range(i + 1, len(rects_and_fields)):
+                rj = rects_and_fields[j]
+                if ri.field["page_number"] == rj.field["page_number"] and rects_intersect(ri.rect, rj.rect):
+                    expected.setdefault(i, []).append(j)
+
+        self.assertTrue(expected)
+        self.assertEqual(find_intersecting_pairs(rects_and_fields), expected)
+
+    def test_single_column(self):
+        """Test that boxes stacked in one column are not all compared with each other"""
+        fields = []
+        for i in range(2000):
+            y = 15 * i
+            # Every 100th entry is too tall and reaches into the next row
+            entry = [60, y, 300, y + 20] if i % 100 == 0 else [60, y, 300, y + 10]
+            fields.append({
+                "description": f"Field{i}",
+                "page_number": 1,
+                "label_bounding_box": [10, y, 50, y + 10],
+                "entry_bounding_box": entry
+            })
+        rects_and_fields = []
+        for f in fields:
+            rects_and_fields.append(RectAndField(f["label_bounding_box"], "label", f))
+            rects_and_fields.append(RectAndField(f["entry_bounding_box"], "entry", f))
+
+        with mock.patch.object(check_bounding_boxes, "rects_intersect", wraps=rects_intersect) as compare:
+            intersections = find_intersecting_pairs(rects_and_fields)
+
+        self.assertEqual(intersections, {2 * i + 1: [2 * i + 3] for i in range(0, 2000, 100)})
+        self.assertLess(compare.call_count, 5 * len(rects_and_fields))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,29 +1,97 @@
 import os
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from pdf2image import convert_from_path
+from PIL import Image
+from pypdf import PdfReader
 
 
 # Converts each page of a PDF to a PNG image.
+#
+# Pages are rendered by pdftoppm in chunks of consecutive pages, several chunks
+# at a time, straight to PNG files on disk. Pages that would exceed `max_dim` at
+# 200 DPI are rendered with their longest side scaled to `max_dim` directly,
+# instead of being rendered large and then downscaled.
 
 
-def convert(pdf_path, output_dir, max_dim=1000):
-    images = convert_from_path(pdf_path, dpi=200)
+MAX_DPI = 200
+POINTS_PER_INCH = 72
 
-    for i, image in enumerate(images):
-        # Scale image if needed to keep width/height under `max_dim`
-        width, height = image.size
-        if width > max_dim or height > max_dim:
-            scale_factor = min(max_dim / width, max_dim / height)
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            image = image.resize((new_width, new_height))
-        
-        image_path = os.path.join(output_dir, f"page_{i+1}.png")
-        image.save(image_path)
-        print(f"Saved page {i+1} as {image_path} (size: {image.size})")
 
-    print(f"Converted {len(images)} pages to PNG images")
+def pages_to_scale(pdf_path, max_dim):
+    # For each page, whether it would exceed `max_dim` at MAX_DPI
+    reader = PdfReader(pdf_path)
+    scaled = []
+    for page in reader.pages:
+        # pdftoppm renders the cropbox (clipped to the mediabox). /Rotate only
+        # swaps width and height, which leaves the longest side unchanged.
+        crop, media = page.cropbox, page.mediabox
+        width = min(crop.right, media.right) - max(crop.left, media.left)
+        height = min(crop.top, media.top) - max(crop.bottom, media.bottom)
+        longest_inches = max(float(width), float(height)) / POINTS_PER_INCH
+        scaled.append(longest_inches * MAX_DPI > max_dim)
+    return scaled
+
+
+def plan_chunks(scaled, chunk_size):
+    # Groups consecutive pages rendered the same way into (first, last, scale) ranges
+    chunks = []
+    for page_number, scale in enumerate(scaled, start=1):
+        if chunks and chunks[-1][2] == scale and page_number - chunks[-1][0] < chunk_size:
+            chunks[-1] = (chunks[-1][0], page_number, scale)
+        else:
+            chunks.append((page_number, page_number, scale))
+    return chunks
+
+
+def render_chunk(pdf_path, first, last, scale, output_dir, max_dim):
+    with tempfile.TemporaryDirectory(dir=output_dir) as temp_dir:
+        paths = convert_from_path(
+            pdf_path,
+            dpi=MAX_DPI,
+            first_page=first,
+            last_page=last,
+            output_folder=temp_dir,
+            fmt="png",
+            paths_only=True,
+            # pdftoppm -scale-to: the longest side becomes exactly `max_dim`
+            size=max_dim if scale else None,
+        )
+        saved = []
+        for page_number, path in zip(range(first, last + 1), sorted(paths)):
+            image_path = os.path.join(output_dir, f"page_{page_number}.png")
+            with Image.open(path) as image:
+                size = image.size
+                # Only reached if the page size in the PDF was misleading, e.g. /UserUnit
+                width, height = size
+                if width > max_dim or height > max_dim:
+                    scale_factor = min(max_dim / width, max_dim / height)
+                    size = (int(width * scale_factor), int(height * scale_factor))
+                    image.resize(size, Image.LANCZOS).save(image_path)
+                    saved.append((page_number, image_path, size))
+                    continue
+            os.replace(path, image_path)
+            saved.append((page_number, image_path, size))
+        return saved
+
+
+def convert(pdf_path, output_dir, max_dim=1000, workers=None, chunk_size=8):
+    scaled = pages_to_scale(pdf_path, max_dim)
+    chunks = plan_chunks(scaled, chunk_size)
+    workers = workers or os.cpu_count() or 1
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(render_chunk, pdf_path, first, last, scale, output_dir, max_dim)
+            for first, last, scale in chunks
+        ]
+        for future in as_completed(futures):
+            for page_number, image_path, size in future.result():
+                print(f"Saved page {page_number} as {image_path} (size: {size})")
+
+    print(f"Converted {len(scaled)} pages to PNG images")
 
 
 if __name__ == "__main__":
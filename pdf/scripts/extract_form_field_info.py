@@ -1,5 +1,8 @@
+import hashlib
 import json
+import os
 import sys
+import tempfile
 
 from pypdf import PdfReader
 
@@ -60,7 +63,8 @@ def make_field_dict(field, field_id):
 #   },
 # ]
 def get_field_info(reader: PdfReader):
-    fields = reader.get_fields()
+    # PDFs without an AcroForm have no fields at all.
+    fields = reader.get_fields() or {}
 
     field_info_by_id = {}
     possible_radio_names = set()
@@ -137,9 +141,84 @@ def get_field_info(reader: PdfReader):
     return sorted_fields
 
 
+# Version of the cached index format; bump when the index contents change.
+FIELD_INDEX_VERSION = 1
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pdf-form-field-index")
+
+
+def _json_rect(rect):
+    # Plain numbers; integers stay integers, as in the PDF
+    return [int(v) if isinstance(v, int) else float(v) for v in rect] if rect is not None else None
+
+
+def build_field_index(reader: PdfReader):
+    # Returns the field info from `get_field_info` plus per-page data, in a
+    # JSON-serializable form:
+    # {
+    #   "pages": [{"page_number": 1, "width": 612.0, "height": 792.0, "field_ids": [...]}],
+    #   "fields": [... same entries as get_field_info ...]
+    # }
+    fields = get_field_info(reader)
+    for field in fields:
+        if "rect" in field:
+            field["rect"] = _json_rect(field["rect"])
+        for option in field.get("radio_options", []):
+            option["rect"] = _json_rect(option["rect"])
+
+    pages = []
+    for page_index, page in enumerate(reader.pages):
+        mediabox = page.mediabox
+        pages.append({
+            "page_number": page_index + 1,
+            "width": float(mediabox.width),
+            "height": float(mediabox.height),
+            "field_ids": [],
+        })
+    for field in fields:
+        pages[field["page"] - 1]["field_ids"].append(field["field_id"])
+    return {"pages": pages, "fields": fields}
+
+
+def file_sha256(path: str):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Returns the field index for a PDF, computing it only the first time a given
+# file (by content hash) is seen. The index is stored as JSON in `cache_dir`;
+# pass cache_dir=None to always compute it.
+def load_field_index(pdf_path: str, cache_dir=DEFAULT_INDEX_DIR, reader=None):
+    sha256 = file_sha256(pdf_path)
+    cache_path = os.path.join(cache_dir, f"{sha256}.json") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                index = json.load(f)
+            if index.get("version") == FIELD_INDEX_VERSION:
+                return index
+        except (OSError, ValueError):
+            pass
+
+    index = build_field_index(reader or PdfReader(pdf_path))
+    index = {"version": FIELD_INDEX_VERSION, "sha256": sha256, **index}
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(index, f)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            # The cache is only an optimization; carry on without it.
+            pass
+    return index
+
+
 def write_field_info(pdf_path: str, json_output_path: str):
-    reader = PdfReader(pdf_path)
-    field_info = get_field_info(reader)
+    field_info = load_field_index(pdf_path)["fields"]
     with open(json_output_path, "w") as f:
         json.dump(field_info, f, indent=2)
     print(f"Wrote {len(field_info)} fields to {json_output_path}")
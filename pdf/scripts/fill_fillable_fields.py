@@ -3,7 +3,7 @@ import sys
 
 from pypdf import PdfReader, PdfWriter
 
-from extract_form_field_info import get_field_info
+from extract_form_field_info import load_field_index
 
 
 # Fills fillable form fields in a PDF. See forms.md.
@@ -24,26 +24,35 @@ def fill_pdf_fields(input_pdf_path: str, fields_json_path: str, output_pdf_path:
     
     reader = PdfReader(input_pdf_path)
 
-    has_error = False
-    field_info = get_field_info(reader)
+    field_info = load_field_index(input_pdf_path, reader=reader)["fields"]
     fields_by_ids = {f["field_id"]: f for f in field_info}
+    errors = validation_errors(fields_by_ids, fields)
+    for err in errors:
+        print(err)
+    if errors:
+        sys.exit(1)
+
+    write_filled_pdf(reader, fields_by_page, output_pdf_path)
+
+
+def validation_errors(fields_by_ids, fields):
+    errors = []
     for field in fields:
         existing_field = fields_by_ids.get(field["field_id"])
         if not existing_field:
-            has_error = True
-            print(f"ERROR: `{field['field_id']}` is not a valid field ID")
+            errors.append(f"ERROR: `{field['field_id']}` is not a valid field ID")
         elif field["page"] != existing_field["page"]:
-            has_error = True
-            print(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {existing_field['page']})")
+            errors.append(f"ERROR: Incorrect page number for `{field['field_id']}` (got {field['page']}, expected {existing_field['page']})")
         else:
             if "value" in field:
                 err = validation_error_for_field_value(existing_field, field["value"])
                 if err:
-                    print(err)
-                    has_error = True
-    if has_error:
-        sys.exit(1)
+                    errors.append(err)
+    return errors
+
 
+# `fields_by_page` maps 1-based page numbers to {field_id: value}.
+def write_filled_pdf(reader: PdfReader, fields_by_page, output_pdf_path: str):
     writer = PdfWriter(clone_from=reader)
     for page, field_values in fields_by_page.items():
         writer.update_page_form_field_values(writer.pages[page - 1], field_values, auto_regenerate=False)
@@ -0,0 +1,201 @@
+import csv
+import io
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from pypdf import PdfReader
+
+from extract_form_field_info import load_field_index
+from fill_fillable_fields import (
+    monkeypatch_pydpf_method,
+    validation_errors,
+    write_filled_pdf,
+)
+
+
+# Fills one fillable PDF template once per record, for many records. See forms.md.
+#
+# Records come from a JSONL file (one {"field_id": value, ...} object per line)
+# or a CSV file (one column per field_id). An optional "output" key/column
+# names each record's PDF; otherwise records are numbered. Output names must
+# stay inside the output directory and be unique across records. Empty CSV
+# cells are left unfilled.
+#
+# The template is read and indexed once. Each worker process keeps its own
+# parsed copy of the template in memory and clones it for every record, and
+# records are streamed so only a bounded number are in flight at once.
+
+
+OUTPUT_KEY = "output"
+
+# Per-worker state, set up once by `_init_worker`.
+_template_reader = None
+_fields_by_ids = None
+
+
+def iter_records(records_path: str):
+    # Yields (record_number, {field_id: value}, error) triples, reading the file
+    # lazily. A JSONL line that isn't a JSON object yields record None and an
+    # error message, so one bad line doesn't stop the batch.
+    if records_path.lower().endswith(".csv"):
+        with open(records_path, newline="") as f:
+            for record_number, row in enumerate(csv.DictReader(f), start=1):
+                record = {k: v for k, v in row.items() if v not in (None, "")}
+                yield record_number, record, None
+    else:
+        with open(records_path) as f:
+            record_number = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                record_number += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield record_number, None, f"ERROR: Invalid JSON: {e}"
+                    continue
+                if not isinstance(record, dict):
+                    kind = type(record).__name__
+                    yield record_number, None, f"ERROR: Expected a JSON object, got {kind}"
+                    continue
+                yield record_number, record, None
+
+
+def _init_worker(template_bytes: bytes, fields_by_ids):
+    global _template_reader, _fields_by_ids
+    monkeypatch_pydpf_method()
+    _template_reader = PdfReader(io.BytesIO(template_bytes))
+    _fields_by_ids = fields_by_ids
+
+
+def resolve_output_path(record_number, record, output_dir: str):
+    # Returns the absolute output path for a record, or raises ValueError if
+    # its name would write outside `output_dir`.
+    output_name = record.get(OUTPUT_KEY) or f"record_{record_number:06d}.pdf"
+    if not isinstance(output_name, str):
+        raise ValueError(
+            f"ERROR: `{OUTPUT_KEY}` must be a file name, got {output_name!r}"
+        )
+    root = os.path.realpath(output_dir)
+    output_path = os.path.realpath(os.path.join(root, output_name))
+    if os.path.dirname(output_path) != root:
+        raise ValueError(
+            f"ERROR: Output name `{output_name}` is not a file name inside {output_dir}"
+        )
+    return output_path
+
+
+def fill_record(record_number, record, output_path: str):
+    # Validates and writes one record. Returns (record_number, output path or None, errors).
+    values = {k: v for k, v in record.items() if k != OUTPUT_KEY}
+
+    fields = []
+    errors = []
+    for field_id, value in values.items():
+        field_info = _fields_by_ids.get(field_id)
+        if field_info is None:
+            errors.append(f"ERROR: `{field_id}` is not a valid field ID")
+            continue
+        fields.append(
+            {"field_id": field_id, "page": field_info["page"], "value": value}
+        )
+    errors += validation_errors(_fields_by_ids, fields)
+    if errors:
+        return record_number, None, errors
+
+    fields_by_page = {}
+    for field in fields:
+        fields_by_page.setdefault(field["page"], {})[field["field_id"]] = field["value"]
+    try:
+        write_filled_pdf(_template_reader, fields_by_page, output_path)
+    except Exception as e:
+        return record_number, None, [f"ERROR: Failed to write {output_path}: {e}"]
+    return record_number, output_path, []
+
+
+def fill_batch(input_pdf_path: str, records_path: str, output_dir: str, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    with open(input_pdf_path, "rb") as f:
+        template_bytes = f.read()
+    fields_by_ids = {
+        f["field_id"]: f for f in load_field_index(input_pdf_path)["fields"]
+    }
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 4
+    failures = []
+    written = 0
+    # Output path -> number of the record that claimed it
+    output_owners = {}
+
+    def collect(done):
+        nonlocal written
+        for future in done:
+            record_number, output_path, errors = future.result()
+            if errors:
+                failures.append({"record": record_number, "errors": errors})
+            else:
+                written += 1
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(template_bytes, fields_by_ids),
+    ) as executor:
+        pending = set()
+        for record_number, record, error in iter_records(records_path):
+            if error:
+                failures.append({"record": record_number, "errors": [error]})
+                continue
+            try:
+                output_path = resolve_output_path(record_number, record, output_dir)
+            except ValueError as e:
+                failures.append({"record": record_number, "errors": [str(e)]})
+                continue
+            owner = output_owners.setdefault(
+                os.path.normcase(output_path), record_number
+            )
+            if owner != record_number:
+                failures.append(
+                    {
+                        "record": record_number,
+                        "errors": [
+                            f"ERROR: Output {output_path} is already used by record {owner}"
+                        ],
+                    }
+                )
+                continue
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(
+                executor.submit(fill_record, record_number, record, output_path)
+            )
+        collect(pending)
+
+    failures.sort(key=lambda f: f["record"])
+    print(f"Filled {written} PDFs in {output_dir}")
+    if failures:
+        print(f"{len(failures)} records failed:")
+        for failure in failures[:20]:
+            for err in failure["errors"]:
+                print(f"  record {failure['record']}: {err}")
+        if len(failures) > 20:
+            print(f"  ... and {len(failures) - 20} more")
+    return {"written": written, "failures": failures}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5):
+        print(
+            "Usage: fill_fillable_fields_batch.py [input pdf] [records.jsonl or .csv] [output directory] [failures.json]"
+        )
+        sys.exit(1)
+    summary = fill_batch(sys.argv[1], sys.argv[2], sys.argv[3])
+    if len(sys.argv) == 5:
+        with open(sys.argv[4], "w") as f:
+            json.dump(summary["failures"], f, indent=2)
+    if summary["failures"]:
+        sys.exit(1)
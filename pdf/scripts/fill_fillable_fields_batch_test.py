@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    FloatObject,
+    NameObject,
+    TextStringObject,
+)
+
+import extract_form_field_info
+import fill_fillable_fields_batch
+from fill_fillable_fields_batch import fill_batch, iter_records
+
+
+def make_form(path, field_ids):
+    """Write a one-page PDF with a text field per id"""
+    writer = PdfWriter()
+    page = writer.add_blank_page(612, 792)
+    annots = ArrayObject()
+    for i, field_id in enumerate(field_ids):
+        widget = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Annot"),
+                NameObject("/Subtype"): NameObject("/Widget"),
+                NameObject("/FT"): NameObject("/Tx"),
+                NameObject("/T"): TextStringObject(field_id),
+                NameObject("/Rect"): ArrayObject(
+                    [
+                        FloatObject(50),
+                        FloatObject(700 - 40 * i),
+                        FloatObject(250),
+                        FloatObject(720 - 40 * i),
+                    ]
+                ),
+                NameObject("/P"): page.indirect_reference,
+            }
+        )
+        annots.append(writer._add_object(widget))
+    page[NameObject("/Annots")] = annots
+    writer._root_object[NameObject("/AcroForm")] = DictionaryObject(
+        {NameObject("/Fields"): ArrayObject(annots)}
+    )
+    writer.write(path)
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestFillBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.form = os.path.join(self.tmp.name, "form.pdf")
+        self.output_dir = os.path.join(self.tmp.name, "out")
+        make_form(self.form, ["name", "city"])
+        # Keep the field index out of the user's cache directory
+        uncached = lambda path: extract_form_field_info.load_field_index(
+            path, cache_dir=None
+        )
+        patcher = mock.patch.object(
+            fill_fillable_fields_batch, "load_field_index", uncached
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_records(self, lines):
+        path = os.path.join(self.tmp.name, "records.jsonl")
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def test_bad_lines_are_reported_per_record(self):
+        records = self.write_records(
+            [
+                json.dumps({"name": "Ada", "output": "ada.pdf"}),
+                '{"name": "broken"',
+                '["not", "an", "object"]',
+                json.dumps({"city": "Paris", "output": "paris.pdf"}),
+            ]
+        )
+        summary = fill_batch(self.form, records, self.output_dir, workers=1)
+
+        self.assertEqual(summary["written"], 2)
+        self.assertEqual([f["record"] for f in summary["failures"]], [2, 3])
+        self.assertIn("Invalid JSON", summary["failures"][0]["errors"][0])
+        self.assertIn("JSON object", summary["failures"][1]["errors"][0])
+        self.assertEqual(sorted(os.listdir(self.output_dir)), ["ada.pdf", "paris.pdf"])
+        filled = PdfReader(os.path.join(self.output_dir, "ada.pdf")).get_fields()
+        self.assertEqual(filled["name"]["/V"], "Ada")
+
+    def test_output_names_must_be_unique_and_inside_the_directory(self):
+        records = self.write_records(
+            [
+                json.dumps({"name": "a", "output": "../escaped.pdf"}),
+                json.dumps({"name": "b", "output": "same.pdf"}),
+                json.dumps({"name": "c", "output": "same.pdf"}),
+            ]
+        )
+        summary = fill_batch(self.form, records, self.output_dir, workers=1)
+
+        self.assertEqual(summary["written"], 1)
+        self.assertEqual([f["record"] for f in summary["failures"]], [1, 3])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "escaped.pdf")))
+
+    def test_csv_records(self):
+        path = os.path.join(self.tmp.name, "records.csv")
+        with open(path, "w") as f:
+            f.write("name,city\nAda,\n")
+        self.assertEqual(list(iter_records(path)), [(1, {"name": "Ada"}, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
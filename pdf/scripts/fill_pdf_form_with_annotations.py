@@ -44,6 +44,7 @@ def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
     for i, page in enumerate(reader.pages):
         mediabox = page.mediabox
         pdf_dimensions[i + 1] = [mediabox.width, mediabox.height]
+    image_pages = {p["page_number"]: p for p in fields_data["pages"]}
     
     # Process each form field
     annotations = []
@@ -51,7 +52,7 @@ def fill_pdf_form(input_pdf_path, fields_json_path, output_pdf_path):
         page_num = field["page_number"]
         
         # Get page dimensions and transform coordinates.
-        page_info = next(p for p in fields_data["pages"] if p["page_number"] == page_num)
+        page_info = image_pages[page_num]
         image_width = page_info["image_width"]
         image_height = page_info["image_height"]
         pdf_width, pdf_height = pdf_dimensions[page_num]
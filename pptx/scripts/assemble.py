@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Assemble a presentation from slides of several template PowerPoint files.
+
+Usage:
+    python assemble.py manifest.json output.pptx
+
+The manifest lists the slides of the new deck, in order, as (template, slide
+index) pairs:
+
+    [
+      {"template": "corporate.pptx", "slide": 0},
+      {"template": "charts.pptx", "slide": 4},
+      ["corporate.pptx", 7]
+    ]
+
+Template paths are relative to the manifest file. The first template is the
+base of the output: its slide size, masters and theme are kept. Slides from
+other templates bring their layout, master and theme along; layouts and
+masters that are identical to ones already in the output are reused, and
+media shared between templates is stored once (deduplicated by content
+hash). Each template is loaded once and the output is saved once.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from copy import deepcopy
+from pathlib import Path
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import XmlPart, _Relationship
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from rearrange import (
+    R_NS,
+    SLIDE_LINK_TAGS,
+    PartNamer,
+    clone_slide_part,
+    drop_slides,
+)
+
+# Relationships that are not carried over when a slide is imported
+SKIPPED_RELTYPES = {RT.NOTES_SLIDE, RT.NOTES_MASTER, RT.HANDOUT_MASTER}
+# Masters and layouts share one id space, starting at 2^31
+MIN_MASTER_LAYOUT_ID = 2147483648
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Assemble a presentation from slides of several templates.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python assemble.py manifest.json deck.pptx
+    Builds deck.pptx from the (template, slide index) pairs in manifest.json
+
+Note: Slide indices are 0-based (first slide is 0, second is 1, etc.)
+        """,
+    )
+    parser.add_argument("manifest", help="JSON manifest of (template, slide) pairs")
+    parser.add_argument("output", help="Path for output PPTX file")
+
+    args = parser.parse_args()
+
+    manifest_path = Path(args.manifest)
+    if not manifest_path.exists():
+        print(f"Error: Manifest file not found: {args.manifest}")
+        sys.exit(1)
+
+    try:
+        slides = load_manifest(manifest_path)
+    except ValueError as e:
+        print(f"Error: Invalid manifest: {e}")
+        sys.exit(1)
+
+    for template in {template for template, _ in slides}:
+        if not template.exists():
+            print(f"Error: Template file not found: {template}")
+            sys.exit(1)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    try:
+        assemble_presentation(slides, output_path)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error processing presentation: {e}")
+        sys.exit(1)
+
+
+def load_manifest(manifest_path):
+    """Read a manifest into a list of (template_path, slide_index) pairs."""
+    with open(manifest_path, "r") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("expected a non-empty list of slides")
+
+    slides = []
+    for i, entry in enumerate(entries):
+        if isinstance(entry, dict):
+            template, index = entry.get("template"), entry.get("slide")
+        elif isinstance(entry, list) and len(entry) == 2:
+            template, index = entry
+        else:
+            raise ValueError(
+                f"entry {i} must be {{template, slide}} or [template, slide]"
+            )
+        if not isinstance(template, str) or not isinstance(index, int):
+            raise ValueError(
+                f"entry {i} needs a template path and an integer slide index"
+            )
+        slides.append(((manifest_path.parent / template).resolve(), index))
+    return slides
+
+
+def is_shareable(part):
+    """Whether a non-XML part can be shared by content (media, embedded files).
+
+    Themes are loaded as plain parts too, but each master needs its own.
+    """
+    return not isinstance(part, XmlPart) and not part.content_type.endswith(
+        "theme+xml"
+    )
+
+
+def partname_template(partname):
+    """Turn /ppt/media/image12.png into /ppt/media/image%d.png."""
+    return re.sub(r"\d*(\.[^./]+)$", r"%d\1", str(partname))
+
+
+class SlideImporter:
+    """Copy slides and everything they depend on from other packages into one presentation.
+
+    Parts are compared by a digest of their content and, recursively, of the
+    parts they relate to. Binary parts (images, media, embedded files) are
+    deduplicated by that digest across all templates; themes are not, as each
+    master needs its own. A layout is reused when the output already has one
+    with the same digest, which covers its images, master and theme;
+    otherwise the layout is imported and attached to its (imported or reused)
+    master.
+    """
+
+    def __init__(self, prs):
+        self.prs = prs
+        self.package = prs.part.package
+        self.namer = PartNamer(self.package)
+        self.imported = {}  # id(source part) -> output part
+        self.digests = {}  # id(part) -> digest of the part and its related parts
+        self.binary_parts = {}  # (content_type, digest) -> output part
+        self.layouts = {}  # layout digest -> output layout part
+        self.masters = {}  # master digest -> output master part
+        self.stats = {"parts": 0, "deduplicated": 0}
+
+        used_ids = [int(el.get("id")) for el in prs.element.iter(qn("p:sldMasterId"))]
+        for master in prs.slide_masters:
+            self.masters[self.part_digest(master.part)] = master.part
+            used_ids += [
+                int(el.get("id")) for el in master.element.iter(qn("p:sldLayoutId"))
+            ]
+            for layout in master.slide_layouts:
+                self.layouts[self.part_digest(layout.part)] = layout.part
+        self.next_master_layout_id = max(used_ids + [MIN_MASTER_LAYOUT_ID - 1]) + 1
+
+        for part in self.package.iter_parts():
+            if is_shareable(part):
+                self.binary_parts.setdefault(
+                    (part.content_type, self.part_digest(part)), part
+                )
+
+    def part_digest(self, part):
+        """Hash a part together with, recursively, the parts it relates to.
+
+        Relationships that are not imported (notes, links to other slides) are
+        ignored, and so are a master's links back to its layouts. Digests are
+        computed once per part.
+        """
+        key = id(part)
+        if key in self.digests:
+            return self.digests[key]
+        # Mark as in progress so relationship cycles terminate
+        self.digests[key] = ""
+
+        h = hashlib.sha256(part.blob)
+        for rId, rel in sorted(part.rels.items()):
+            if rel.reltype in SKIPPED_RELTYPES or rel.reltype == RT.SLIDE:
+                continue
+            if rel.reltype == RT.SLIDE_LAYOUT and part.content_type.endswith(
+                "slideMaster+xml"
+            ):
+                continue
+            h.update(f"{rId}|{rel.reltype}|".encode())
+            if rel.is_external:
+                h.update(rel.target_ref.encode())
+            else:
+                h.update(self.part_digest(rel.target_part).encode())
+
+        self.digests[key] = h.hexdigest()
+        return self.digests[key]
+
+    def import_slide(self, slide_part):
+        """Import a slide part from another package; return the new slide part."""
+        return self.import_part(slide_part)
+
+    def import_part(self, part):
+        """Import a part and, recursively, the parts it relates to."""
+        key = id(part)
+        if key in self.imported:
+            return self.imported[key]
+
+        if not isinstance(part, XmlPart):
+            content_key = (part.content_type, self.part_digest(part))
+            shareable = is_shareable(part)
+            existing = self.binary_parts.get(content_key) if shareable else None
+            if existing is not None:
+                self.stats["deduplicated"] += 1
+                self.imported[key] = existing
+                return existing
+            new_part = type(part)(
+                self.namer.next(partname_template(part.partname)),
+                part.content_type,
+                self.package,
+                part.blob,
+            )
+            if shareable:
+                self.binary_parts[content_key] = new_part
+            self.imported[key] = new_part
+            self.stats["parts"] += 1
+            self.import_binary_rels(part, new_part)
+            return new_part
+
+        if part.content_type.endswith("slideLayout+xml"):
+            digest = self.part_digest(part)
+            if digest in self.layouts:
+                self.stats["deduplicated"] += 1
+                self.imported[key] = self.layouts[digest]
+                return self.layouts[digest]
+        elif part.content_type.endswith("slideMaster+xml"):
+            digest = self.part_digest(part)
+            if digest in self.masters:
+                self.stats["deduplicated"] += 1
+                self.imported[key] = self.masters[digest]
+                return self.masters[digest]
+
+        element = deepcopy(part._element)
+        new_part = type(part)(
+            self.namer.next(partname_template(part.partname)),
+            part.content_type,
+            self.package,
+            element,
+        )
+        # Register before following rels: layouts and masters refer to each other
+        self.imported[key] = new_part
+        self.stats["parts"] += 1
+
+        is_master = part.content_type.endswith("slideMaster+xml")
+        rId_map = {}
+        dropped = set()
+        for rId, rel in part.rels.items():
+            if rel.reltype in SKIPPED_RELTYPES:
+                continue
+            if is_master and rel.reltype == RT.SLIDE_LAYOUT:
+                # Only layouts that are actually used get attached to the master
+                continue
+            if rel.reltype == RT.SLIDE:
+                # Links to slides of the template can't be carried over
+                dropped.add(rId)
+                continue
+            if rel.is_external:
+                rId_map[rId] = new_part.rels.get_or_add_ext_rel(
+                    rel.reltype, rel.target_ref
+                )
+            else:
+                target = self.import_part(rel.target_part)
+                rId_map[rId] = new_part.rels.get_or_add(rel.reltype, target)
+
+        for el in list(element.iter()):
+            for attr, value in el.attrib.items():
+                if not attr.startswith(R_NS):
+                    continue
+                if value in dropped and el.tag in SLIDE_LINK_TAGS:
+                    el.getparent().remove(el)
+                    break
+                if value in rId_map:
+                    el.set(attr, rId_map[value])
+
+        if is_master:
+            self.attach_master(new_part)
+            self.masters[self.part_digest(part)] = new_part
+        elif part.content_type.endswith("slideLayout+xml"):
+            self.attach_layout(new_part)
+            self.layouts[self.part_digest(part)] = new_part
+
+        return new_part
+
+    def import_binary_rels(self, part, new_part):
+        """Copy the relationships of a non-XML part (e.g. a diagram part).
+
+        Its content can't be rewritten, so each relationship keeps its rId.
+        """
+        for rId, rel in part.rels.items():
+            if rel.reltype in SKIPPED_RELTYPES or rel.reltype == RT.SLIDE:
+                continue
+            if rel.is_external:
+                target, mode = rel.target_ref, RTM.EXTERNAL
+            else:
+                target, mode = self.import_part(rel.target_part), RTM.INTERNAL
+            new_part.rels._rels[rId] = _Relationship(
+                new_part.rels._base_uri, rId, rel.reltype, mode, target
+            )
+
+    def allocate_master_layout_id(self):
+        value = self.next_master_layout_id
+        self.next_master_layout_id += 1
+        return value
+
+    def attach_master(self, master_part):
+        """Register an imported master in the presentation, with no layouts yet."""
+        layout_list = master_part._element.find(qn("p:sldLayoutIdLst"))
+        if layout_list is not None:
+            for layout_id in list(layout_list):
+                layout_list.remove(layout_id)
+
+        rId = self.prs.part.relate_to(master_part, RT.SLIDE_MASTER)
+        master_list = self.prs.element.get_or_add_sldMasterIdLst()
+        master_list.append(
+            parse_xml(
+                f'<p:sldMasterId {nsdecls("p", "r")} '
+                f'id="{self.allocate_master_layout_id()}" r:id="{rId}"/>'
+            )
+        )
+
+    def attach_layout(self, layout_part):
+        """List an imported layout under its master."""
+        master_part = layout_part.part_related_by(RT.SLIDE_MASTER)
+        rId = master_part.relate_to(layout_part, RT.SLIDE_LAYOUT)
+        master = master_part._element
+        layout_list = master.find(qn("p:sldLayoutIdLst"))
+        if layout_list is None:
+            layout_list = parse_xml(f'<p:sldLayoutIdLst {nsdecls("p")}/>')
+            # sldLayoutIdLst follows cSld and clrMap in the schema
+            master.find(qn("p:clrMap")).addnext(layout_list)
+        layout_list.append(
+            parse_xml(
+                f'<p:sldLayoutId {nsdecls("p", "r")} '
+                f'id="{self.allocate_master_layout_id()}" r:id="{rId}"/>'
+            )
+        )
+
+
+def assemble_presentation(slides, output_path):
+    """
+    Create a presentation from (template_path, slide_index) pairs in one save.
+
+    Args:
+        slides: List of (template_path, slide_index) pairs, in output order
+        output_path: Path for output PPTX file
+
+    Returns:
+        Dict with timings per stage (seconds) and bytes written
+    """
+    timings = {}
+
+    # Stage 1: load each template once
+    start = time.perf_counter()
+    base_path = slides[0][0]
+    templates = {}
+    for template, _ in slides:
+        if template not in templates:
+            templates[template] = Presentation(str(template))
+    prs = templates[base_path]
+    timings["load"] = time.perf_counter() - start
+
+    for template, index in slides:
+        total = len(templates[template].slides)
+        if index < 0 or index >= total:
+            raise ValueError(
+                f"Slide index {index} out of range for {template.name} (0-{total - 1})"
+            )
+        if templates[template].slide_width != prs.slide_width or (
+            templates[template].slide_height != prs.slide_height
+        ):
+            print(f"Warning: {template.name} has a different slide size than the base")
+
+    # Stage 2: build the slide list
+    start = time.perf_counter()
+    prs_part = prs.part
+    sldIdLst = prs.slides._sldIdLst
+    base_entries = [(sldId.get("id"), sldId.rId) for sldId in sldIdLst]
+    next_id = max([int(slide_id) for slide_id, _ in base_entries] + [255]) + 1
+
+    importer = SlideImporter(prs)
+    source_parts = {
+        template: [slide.part for slide in pres.slides]
+        for template, pres in templates.items()
+    }
+
+    final_entries = []
+    used_base = set()
+    imported_slides = {}
+    print(f"Assembling {len(slides)} slides from {len(templates)} template(s)...")
+    for template, index in slides:
+        if template == base_path:
+            slide_id, rId = base_entries[index]
+            if index not in used_base:
+                used_base.add(index)
+                final_entries.append((slide_id, rId))
+                continue
+            new_part = clone_slide_part(prs_part.related_part(rId), importer.namer)
+        elif (template, index) in imported_slides:
+            new_part = clone_slide_part(
+                imported_slides[template, index], importer.namer
+            )
+        else:
+            new_part = importer.import_slide(source_parts[template][index])
+            imported_slides[template, index] = new_part
+        final_entries.append((str(next_id), prs_part.relate_to(new_part, RT.SLIDE)))
+        next_id += 1
+
+    # Rewrite the slide list once and drop unused base slides in one sweep
+    for sldId in list(sldIdLst):
+        sldIdLst.remove(sldId)
+    for slide_id, rId in final_entries:
+        sldIdLst._add_sldId(id=int(slide_id), rId=rId)
+    drop_slides(
+        prs_part,
+        [rId for index, (_, rId) in enumerate(base_entries) if index not in used_base],
+    )
+    prs_part.rename_slide_parts([rId for _, rId in final_entries])
+    timings["assemble"] = time.perf_counter() - start
+
+    # Stage 3: single save
+    start = time.perf_counter()
+    prs.save(str(output_path))
+    timings["save"] = time.perf_counter() - start
+
+    bytes_written = os.path.getsize(output_path)
+    print(f"  Imported {importer.stats['parts']} part(s)")
+    print(f"  Reused {importer.stats['deduplicated']} identical part(s)")
+    print(f"\nSaved assembled presentation to: {output_path}")
+    print(f"Final presentation has {len(prs.slides)} slides")
+    print(f"Bytes written: {bytes_written:,}")
+    for stage, seconds in timings.items():
+        print(f"  {stage}: {seconds:.2f}s")
+
+    return {"timings": timings, "bytes_written": bytes_written}
+
+
+if __name__ == "__main__":
+    main()
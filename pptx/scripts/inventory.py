@@ -9,31 +9,43 @@ This module provides functionality to:
 - Sort shapes by visual position on slides
 - Filter out slide numbers and non-content placeholders
 - Export to JSON with clean, structured data
+- Read the presentation without modifying it, so inventories can be taken
+  from a presentation that is still being edited
 
 Classes:
     ParagraphData: Represents a text paragraph with formatting
     ShapeData: Represents a shape with position and text content
+    TextMetrics: Cached font loading and word-level text measurement
 
 Main Functions:
     extract_text_inventory: Extract all text from a presentation
+    get_inventory_as_dict: Extract as JSON-serializable data, optionally in parallel
     save_inventory: Save extracted data to JSON
 
 Usage:
-    python inventory.py input.pptx output.json
+    python inventory.py input.pptx output.json [--workers N]
 """
 
 import argparse
+import bisect
+import heapq
 import json
+import os
 import platform
 import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import ImageFont
 from pptx import Presentation
+from pptx.enum.dml import MSO_FILL
 from pptx.enum.text import PP_ALIGN
+from pptx.oxml.ns import qn
 from pptx.shapes.base import BaseShape
+from pptx.text.text import Font
 
 # Type aliases for cleaner signatures
 JsonValue = Union[str, int, float, bool, None]
@@ -60,6 +72,9 @@ Examples:
   python inventory.py presentation.pptx inventory.json --issues-only
     Extracts only text shapes that have overflow or overlap issues
 
+  python inventory.py presentation.pptx inventory.json --workers 8
+    Extracts slides in 8 worker processes (output is identical to a serial run)
+
 The output JSON includes:
   - All text content organized by slide and shape
   - Correct absolute positions for shapes in groups
@@ -76,6 +91,12 @@ The output JSON includes:
         action="store_true",
         help="Include only text shapes that have overflow or overlap issues",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes for per-slide extraction (default: 1, 0 = all CPUs)",
+    )
 
     args = parser.parse_args()
 
@@ -94,7 +115,9 @@ The output JSON includes:
             print(
                 "Filtering to include only text shapes with issues (overflow/overlap)"
             )
-        inventory = extract_text_inventory(input_path, issues_only=args.issues_only)
+        inventory = get_inventory_as_dict(
+            input_path, issues_only=args.issues_only, workers=args.workers
+        )
 
         output_path = Path(args.output)
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -175,14 +198,17 @@ class ParagraphData:
                     self.level = paragraph.level
 
         # Add alignment if not LEFT (default)
-        if hasattr(paragraph, "alignment") and paragraph.alignment is not None:
+        # (paragraph.alignment creates an empty <a:pPr> when missing, so read it directly)
+        pPr = paragraph._p.pPr if hasattr(paragraph, "_p") else None
+        alignment = pPr.algn if pPr is not None else None
+        if alignment is not None:
             alignment_map = {
                 PP_ALIGN.CENTER: "CENTER",
                 PP_ALIGN.RIGHT: "RIGHT",
                 PP_ALIGN.JUSTIFY: "JUSTIFY",
             }
-            if paragraph.alignment in alignment_map:
-                self.alignment = alignment_map[paragraph.alignment]
+            if alignment in alignment_map:
+                self.alignment = alignment_map[alignment]
 
         # Add spacing properties if set
         if hasattr(paragraph, "space_before") and paragraph.space_before:
@@ -191,10 +217,12 @@ class ParagraphData:
             self.space_after = paragraph.space_after.pt
 
         # Extract font properties from first run
+        # (run.font creates an empty <a:rPr> when missing, so read it directly)
         if paragraph.runs:
             first_run = paragraph.runs[0]
-            if hasattr(first_run, "font"):
-                font = first_run.font
+            rPr = first_run._r.rPr
+            if rPr is not None:
+                font = Font(rPr)
                 if font.name:
                     self.font_name = font.name
                 if font.size:
@@ -207,17 +235,20 @@ class ParagraphData:
                     self.underline = font.underline
 
                 # Handle color - both RGB and theme colors
-                try:
-                    # Try RGB color first
-                    if font.color.rgb:
-                        self.color = str(font.color.rgb)
-                except (AttributeError, TypeError):
-                    # Fall back to theme color
+                # (font.color converts the fill to solid, so only read it when
+                # the run already has a solid fill)
+                if font.fill.type == MSO_FILL.SOLID:
                     try:
-                        if font.color.theme_color:
-                            self.theme_color = font.color.theme_color.name
+                        # Try RGB color first
+                        if font.color.rgb:
+                            self.color = str(font.color.rgb)
                     except (AttributeError, TypeError):
-                        pass
+                        # Fall back to theme color
+                        try:
+                            if font.color.theme_color:
+                                self.theme_color = font.color.theme_color.name
+                        except (AttributeError, TypeError):
+                            pass
 
         # Add line spacing if set
         if hasattr(paragraph, "line_spacing") and paragraph.line_spacing is not None:
@@ -263,6 +294,130 @@ class ParagraphData:
         return result
 
 
+class TextMetrics:
+    """Cached font loading and word-level text measurement for overflow estimation.
+
+    Each word is measured once per (font, size) and line widths are built from
+    those word widths plus the width of a space, so wrapping a line costs one
+    measurement per distinct word instead of one per growing prefix. Loaded
+    fonts and their word widths are kept in an LRU keyed by (font name, size),
+    shared by every inventory built in the same process.
+    """
+
+    def __init__(self, max_fonts: int = 32, max_words_per_font: int = 8192):
+        """Initialize empty caches.
+
+        Args:
+            max_fonts: Number of (font name, size) entries to keep before evicting
+            max_words_per_font: Number of word widths to keep per font entry
+        """
+        self.max_fonts = max_fonts
+        self.max_words_per_font = max_words_per_font
+        self._font_paths: Dict[str, Optional[str]] = {}
+        # (font_name, font_size) -> (font, {word: width_px})
+        self._fonts: "OrderedDict[Tuple[str, int], Tuple[Any, Dict[str, float]]]" = (
+            OrderedDict()
+        )
+
+    def _get_entry(
+        self, font_name: str, font_size: int
+    ) -> Tuple[Any, Dict[str, float]]:
+        """Return the cached font and word widths, loading the font if needed."""
+        key = (font_name, font_size)
+        entry = self._fonts.get(key)
+        if entry is not None:
+            self._fonts.move_to_end(key)
+            return entry
+
+        if font_name not in self._font_paths:
+            self._font_paths[font_name] = ShapeData.get_font_path(font_name)
+        font_path = self._font_paths[font_name]
+
+        font = None
+        if font_path:
+            try:
+                font = ImageFont.truetype(font_path, size=font_size)
+            except Exception:
+                font = ImageFont.load_default()
+        else:
+            font = ImageFont.load_default()
+
+        entry = (font, {})
+        self._fonts[key] = entry
+        if len(self._fonts) > self.max_fonts:
+            self._fonts.popitem(last=False)
+        return entry
+
+    def get_font(self, font_name: str, font_size: int) -> Any:
+        """Get a PIL font for the given name and size, falling back to the default font."""
+        return self._get_entry(font_name, font_size)[0]
+
+    def word_width(self, font_name: str, font_size: int, word: str) -> float:
+        """Get the rendered width of a single word in pixels."""
+        font, widths = self._get_entry(font_name, font_size)
+        width = widths.get(word)
+        if width is None:
+            width = font.getlength(word) if word else 0.0
+            if len(widths) >= self.max_words_per_font:
+                widths.clear()
+            widths[word] = width
+        return width
+
+    def wrap_line(
+        self, line: str, max_width_px: int, font_name: str, font_size: int
+    ) -> List[str]:
+        """Wrap a single line of text to fit within max_width_px.
+
+        Words are placed greedily; a word that is wider than the line on its own
+        still gets a line to itself.
+        """
+        if not line:
+            return [""]
+
+        words = line.split(" ")
+        space_width = self.word_width(font_name, font_size, " ")
+        word_widths = [self.word_width(font_name, font_size, w) for w in words]
+
+        # Whole line fits: sum of word widths plus the spaces between them
+        if sum(word_widths) + space_width * (len(words) - 1) <= max_width_px:
+            return [line]
+
+        # Need to wrap - grow the current line using the running width
+        wrapped = []
+        current_words: List[str] = []
+        current_has_text = False
+        current_width = 0.0
+
+        for word, width in zip(words, word_widths):
+            if current_has_text:
+                test_width = current_width + space_width + width
+            else:
+                test_width = width
+            if test_width <= max_width_px:
+                if current_has_text:
+                    current_words.append(word)
+                else:
+                    current_words = [word]
+                current_width = test_width
+                current_has_text = current_has_text or bool(word)
+            else:
+                if current_has_text:
+                    wrapped.append(" ".join(current_words))
+                current_words = [word]
+                current_width = width
+                current_has_text = bool(word)
+
+        if current_has_text:
+            wrapped.append(" ".join(current_words))
+
+        return wrapped
+
+
+# Shared across inventories so repeated runs (e.g. before and after replacement)
+# reuse fonts and word measurements
+_text_metrics = TextMetrics()
+
+
 class ShapeData:
     """Data structure for shape properties extracted from a PowerPoint shape."""
 
@@ -531,33 +686,11 @@ class ShapeData:
             self.inches_to_pixels(usable_height),
         )
 
-    def _wrap_text_line(self, line: str, max_width_px: int, draw, font) -> List[str]:
+    def _wrap_text_line(
+        self, line: str, max_width_px: int, font_name: str, font_size: int
+    ) -> List[str]:
         """Wrap a single line of text to fit within max_width_px."""
-        if not line:
-            return [""]
-
-        # Use textlength for efficient width calculation
-        if draw.textlength(line, font=font) <= max_width_px:
-            return [line]
-
-        # Need to wrap - split into words
-        wrapped = []
-        words = line.split(" ")
-        current_line = ""
-
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            if draw.textlength(test_line, font=font) <= max_width_px:
-                current_line = test_line
-            else:
-                if current_line:
-                    wrapped.append(current_line)
-                current_line = word
-
-        if current_line:
-            wrapped.append(current_line)
-
-        return wrapped
+        return _text_metrics.wrap_line(line, max_width_px, font_name, font_size)
 
     def _estimate_frame_overflow(self) -> None:
         """Estimate if text overflows the shape bounds using PIL text measurement."""
@@ -573,10 +706,6 @@ class ShapeData:
         if usable_width_px <= 0 or usable_height_px <= 0:
             return
 
-        # Set up PIL for text measurement
-        dummy_img = Image.new("RGB", (1, 1))
-        draw = ImageDraw.Draw(dummy_img)
-
         # Get default font size from placeholder or use conservative estimate
         default_font_size = self._get_default_font_size()
 
@@ -589,24 +718,16 @@ class ShapeData:
 
             para_data = ParagraphData(paragraph)
 
-            # Load font for this paragraph
+            # Font for this paragraph (loaded and cached by the text metrics layer)
             font_name = para_data.font_name or "Arial"
             font_size = int(para_data.font_size or default_font_size)
 
-            font = None
-            font_path = self.get_font_path(font_name)
-            if font_path:
-                try:
-                    font = ImageFont.truetype(font_path, size=font_size)
-                except Exception:
-                    font = ImageFont.load_default()
-            else:
-                font = ImageFont.load_default()
-
             # Wrap all lines in this paragraph
             all_wrapped_lines = []
             for line in paragraph.text.split("\n"):
-                wrapped = self._wrap_text_line(line, usable_width_px, draw, font)
+                wrapped = self._wrap_text_line(
+                    line, usable_width_px, font_name, font_size
+                )
                 all_wrapped_lines.extend(wrapped)
 
             if all_wrapped_lines:
@@ -742,7 +863,14 @@ class ShapeData:
 def is_valid_shape(shape: BaseShape) -> bool:
     """Check if a shape contains meaningful text content."""
     # Must have a text frame with content
-    if not hasattr(shape, "text_frame") or not shape.text_frame:  # type: ignore
+    if not hasattr(shape, "text_frame"):
+        return False
+
+    # Autoshape.text_frame adds an empty <p:txBody> when missing, so check first
+    if shape.element.find(qn("p:txBody")) is None:
+        return False
+
+    if not shape.text_frame:  # type: ignore
         return False
 
     text = shape.text_frame.text.strip()  # type: ignore
@@ -879,6 +1007,56 @@ def calculate_overlap(
     return False, 0
 
 
+def find_overlapping_pairs(
+    rects: List[Tuple[float, float, float, float]], tolerance: float = 0.05
+) -> List[Tuple[int, int, float]]:
+    """Find all pairs of overlapping rectangles using a sweep line over the x-axis.
+
+    Rectangles are visited in order of their left edge while an active set keeps
+    only those whose right edge can still reach the sweep position. The active
+    set is sorted by top edge, so each rectangle is only compared with active
+    ones whose top lies between its own bottom and its top minus the tallest
+    height; a column of stacked shapes does not degrade to all pairs. Candidate
+    pairs are then confirmed with calculate_overlap, so the result matches an
+    all-pairs comparison with the same tolerance.
+
+    Args:
+        rects: List of (left, top, width, height) rectangles in inches
+        tolerance: Minimum overlap in inches to consider as overlapping (default: 0.05")
+
+    Returns:
+        List of (i, j, overlap_area) tuples with i < j, sorted by (i, j)
+    """
+    order = sorted(range(len(rects)), key=lambda k: rects[k][0])
+    rights = [left + width for left, _, width, _ in rects]
+    max_height = max((height for _, _, _, height in rects), default=0.0)
+
+    pairs = []
+    # (top, index) of the active rectangles, sorted, and (right, index) as a heap
+    active: List[Tuple[float, int]] = []
+    expiry: List[Tuple[float, int]] = []
+    for k in order:
+        left, top, _, height = rects[k]
+        # Shapes that end before the sweep position (within tolerance) can no
+        # longer overlap anything that starts further right
+        while expiry and expiry[0][0] - left <= tolerance:
+            _, a = heapq.heappop(expiry)
+            del active[bisect.bisect_left(active, (rects[a][1], a))]
+
+        first = bisect.bisect_left(active, (top - max_height, -1))
+        last = bisect.bisect_right(active, (top + height, len(rects)))
+        for _, a in active[first:last]:
+            i, j = (a, k) if a < k else (k, a)
+            overlaps, overlap_area = calculate_overlap(rects[i], rects[j], tolerance)
+            if overlaps:
+                pairs.append((i, j, overlap_area))
+        bisect.insort(active, (top, k))
+        heapq.heappush(expiry, (rights[k], k))
+
+    pairs.sort()
+    return pairs
+
+
 def detect_overlaps(shapes: List[ShapeData]) -> None:
     """Detect overlapping shapes and update their overlapping_shapes dictionaries.
 
@@ -888,27 +1066,68 @@ def detect_overlaps(shapes: List[ShapeData]) -> None:
     Args:
         shapes: List of ShapeData objects with shape_id attributes set
     """
-    n = len(shapes)
+    # Ensure shape IDs are set
+    for i, shape in enumerate(shapes):
+        assert shape.shape_id, f"Shape at index {i} has no shape_id"
 
-    # Compare each pair of shapes
-    for i in range(n):
-        for j in range(i + 1, n):
-            shape1 = shapes[i]
-            shape2 = shapes[j]
+    rects = [(s.left, s.top, s.width, s.height) for s in shapes]
 
-            # Ensure shape IDs are set
-            assert shape1.shape_id, f"Shape at index {i} has no shape_id"
-            assert shape2.shape_id, f"Shape at index {j} has no shape_id"
+    # Pairs come back in (i, j) order, so the dictionaries are filled in the
+    # same order as a nested loop over all pairs would fill them
+    for i, j, overlap_area in find_overlapping_pairs(rects):
+        shape1 = shapes[i]
+        shape2 = shapes[j]
 
-            rect1 = (shape1.left, shape1.top, shape1.width, shape1.height)
-            rect2 = (shape2.left, shape2.top, shape2.width, shape2.height)
+        # Add shape IDs with overlap area in square inches
+        shape1.overlapping_shapes[shape2.shape_id] = overlap_area
+        shape2.overlapping_shapes[shape1.shape_id] = overlap_area
 
-            overlaps, overlap_area = calculate_overlap(rect1, rect2)
 
-            if overlaps:
-                # Add shape IDs with overlap area in square inches
-                shape1.overlapping_shapes[shape2.shape_id] = overlap_area
-                shape2.overlapping_shapes[shape1.shape_id] = overlap_area
+def extract_slide_inventory(
+    slide: Any, issues_only: bool = False
+) -> Dict[str, ShapeData]:
+    """Extract text content from a single slide.
+
+    Args:
+        slide: The PowerPoint slide object
+        issues_only: If True, only include shapes that have overflow or overlap issues
+
+    Returns a dictionary of {shape-N: ShapeData}, empty if the slide has no text.
+    """
+    # Collect all valid shapes from this slide with absolute positions
+    shapes_with_positions = []
+    for shape in slide.shapes:  # type: ignore
+        shapes_with_positions.extend(collect_shapes_with_absolute_positions(shape))
+
+    if not shapes_with_positions:
+        return {}
+
+    # Convert to ShapeData with absolute positions and slide reference
+    shape_data_list = [
+        ShapeData(
+            swp.shape,
+            swp.absolute_left,
+            swp.absolute_top,
+            slide,
+        )
+        for swp in shapes_with_positions
+    ]
+
+    # Sort by visual position and assign stable IDs in one step
+    sorted_shapes = sort_shapes_by_position(shape_data_list)
+    for idx, shape_data in enumerate(sorted_shapes):
+        shape_data.shape_id = f"shape-{idx}"
+
+    # Detect overlaps using the stable shape IDs
+    if len(sorted_shapes) > 1:
+        detect_overlaps(sorted_shapes)
+
+    # Filter for issues only if requested (after overlap detection)
+    if issues_only:
+        sorted_shapes = [sd for sd in sorted_shapes if sd.has_any_issues]
+
+    # Create slide inventory using the stable shape IDs
+    return {shape_data.shape_id: shape_data for shape_data in sorted_shapes}
 
 
 def extract_text_inventory(
@@ -931,85 +1150,139 @@ def extract_text_inventory(
     inventory: InventoryData = {}
 
     for slide_idx, slide in enumerate(prs.slides):
-        # Collect all valid shapes from this slide with absolute positions
-        shapes_with_positions = []
-        for shape in slide.shapes:  # type: ignore
-            shapes_with_positions.extend(collect_shapes_with_absolute_positions(shape))
-
-        if not shapes_with_positions:
-            continue
-
-        # Convert to ShapeData with absolute positions and slide reference
-        shape_data_list = [
-            ShapeData(
-                swp.shape,
-                swp.absolute_left,
-                swp.absolute_top,
-                slide,
-            )
-            for swp in shapes_with_positions
-        ]
+        slide_inventory = extract_slide_inventory(slide, issues_only=issues_only)
+        if slide_inventory:
+            inventory[f"slide-{slide_idx}"] = slide_inventory
 
-        # Sort by visual position and assign stable IDs in one step
-        sorted_shapes = sort_shapes_by_position(shape_data_list)
-        for idx, shape_data in enumerate(sorted_shapes):
-            shape_data.shape_id = f"shape-{idx}"
+    return inventory
 
-        # Detect overlaps using the stable shape IDs
-        if len(sorted_shapes) > 1:
-            detect_overlaps(sorted_shapes)
 
-        # Filter for issues only if requested (after overlap detection)
-        if issues_only:
-            sorted_shapes = [sd for sd in sorted_shapes if sd.has_any_issues]
+def refresh_inventory(
+    inventory: InventoryData,
+    prs: Any,
+    shape_keys: List[Tuple[str, str]],
+) -> InventoryData:
+    """Re-measure selected shapes of an existing inventory against the current presentation.
 
-        if not sorted_shapes:
-            continue
+    Shape positions and IDs are taken from the existing inventory, and each
+    ShapeData is rebuilt from its (possibly edited) shape, so overflow and
+    warnings reflect the current text. Because inventory extraction never
+    modifies the presentation, this can run directly on a presentation that
+    is still being edited, without saving and reloading it.
 
-        # Create slide inventory using the stable shape IDs
-        inventory[f"slide-{slide_idx}"] = {
-            shape_data.shape_id: shape_data for shape_data in sorted_shapes
-        }
+    Args:
+        inventory: Inventory previously extracted from prs
+        prs: The Presentation object the inventory's shapes belong to
+        shape_keys: (slide_key, shape_key) pairs to re-measure
 
-    return inventory
+    Returns:
+        Inventory with fresh ShapeData for only the requested shapes
+    """
+    refreshed: InventoryData = {}
+    for slide_key, shape_key in shape_keys:
+        old = inventory[slide_key][shape_key]
+        slide = prs.slides[int(slide_key.split("-")[1])]
+        shape_data = ShapeData(old.shape, old.left_emu, old.top_emu, slide)
+        shape_data.shape_id = shape_key
+        refreshed.setdefault(slide_key, {})[shape_key] = shape_data
+    return refreshed
+
+
+def _extract_slides_as_dict(
+    pptx_path: str, slide_indices: List[int], issues_only: bool
+) -> InventoryDict:
+    """Worker for parallel extraction: load the presentation and serialize some slides."""
+    prs = Presentation(pptx_path)
+    slides = prs.slides
+    result: InventoryDict = {}
+    for slide_idx in slide_indices:
+        slide_inventory = extract_slide_inventory(slides[slide_idx], issues_only)
+        if slide_inventory:
+            result[f"slide-{slide_idx}"] = {
+                shape_key: shape_data.to_dict()
+                for shape_key, shape_data in slide_inventory.items()
+            }
+    return result
 
 
-def get_inventory_as_dict(pptx_path: Path, issues_only: bool = False) -> InventoryDict:
+def get_inventory_as_dict(
+    pptx_path: Path, issues_only: bool = False, workers: int = 1
+) -> InventoryDict:
     """Extract text inventory and return as JSON-serializable dictionaries.
 
     This is a convenience wrapper around extract_text_inventory that returns
     dictionaries instead of ShapeData objects, useful for testing and direct
     JSON serialization.
 
+    Slides are independent once the package is loaded, so with workers > 1
+    each worker process loads the presentation once and extracts an
+    interleaved share of the slides. The merged result is identical to a
+    serial run.
+
     Args:
         pptx_path: Path to the PowerPoint file
         issues_only: If True, only include shapes that have overflow or overlap issues
+        workers: Number of worker processes (1 = serial, 0 = one per CPU)
 
     Returns:
         Nested dictionary with all data serialized for JSON
     """
-    inventory = extract_text_inventory(pptx_path, issues_only=issues_only)
-
-    # Convert ShapeData objects to dictionaries
-    dict_inventory: InventoryDict = {}
-    for slide_key, shapes in inventory.items():
-        dict_inventory[slide_key] = {
-            shape_key: shape_data.to_dict() for shape_key, shape_data in shapes.items()
-        }
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    if workers > 1:
+        slide_count = len(Presentation(str(pptx_path)).slides)
+        workers = min(workers, slide_count)
+
+    if workers <= 1:
+        inventory = extract_text_inventory(pptx_path, issues_only=issues_only)
+
+        # Convert ShapeData objects to dictionaries
+        dict_inventory: InventoryDict = {}
+        for slide_key, shapes in inventory.items():
+            dict_inventory[slide_key] = {
+                shape_key: shape_data.to_dict()
+                for shape_key, shape_data in shapes.items()
+            }
+        return dict_inventory
+
+    # Interleave slides so heavy sections of the deck are spread across workers
+    chunks = [list(range(w, slide_count, workers)) for w in range(workers)]
+    merged: InventoryDict = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_extract_slides_as_dict, str(pptx_path), chunk, issues_only)
+            for chunk in chunks
+        ]
+        for future in futures:
+            merged.update(future.result())
 
-    return dict_inventory
+    # Restore slide order
+    return {
+        f"slide-{slide_idx}": merged[f"slide-{slide_idx}"]
+        for slide_idx in range(slide_count)
+        if f"slide-{slide_idx}" in merged
+    }
 
 
-def save_inventory(inventory: InventoryData, output_path: Path) -> None:
+def save_inventory(
+    inventory: Union[InventoryData, InventoryDict], output_path: Path
+) -> None:
     """Save inventory to JSON file with proper formatting.
 
-    Converts ShapeData objects to dictionaries for JSON serialization.
+    Converts ShapeData objects to dictionaries for JSON serialization;
+    already-serialized shape dictionaries are written as-is.
     """
     # Convert ShapeData objects to dictionaries
     json_inventory: InventoryDict = {}
     for slide_key, shapes in inventory.items():
         json_inventory[slide_key] = {
-            shape_key: shape_data.to_dict() for shape_key, shape_data in shapes.items()
+            shape_key: (
+                shape_data.to_dict()
+                if isinstance(shape_data, ShapeData)
+                else shape_data
+            )
+            for shape_key, shape_data in shapes.items()
         }
 
     with open(output_path, "w", encoding="utf-8") as f:
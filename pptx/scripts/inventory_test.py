@@ -0,0 +1,52 @@
+import random
+import unittest
+from unittest import mock
+
+import inventory
+from inventory import calculate_overlap, find_overlapping_pairs
+
+
+def all_pairs(rects, tolerance=0.05):
+    pairs = []
+    for i in range(len(rects)):
+        for j in range(i + 1, len(rects)):
+            overlaps, overlap_area = calculate_overlap(rects[i], rects[j], tolerance)
+            if overlaps:
+                pairs.append((i, j, overlap_area))
+    return pairs
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestFindOverlappingPairs(unittest.TestCase):
+    def test_matches_all_pairs(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            rects = [
+                (
+                    rng.uniform(0, 10),
+                    rng.uniform(0, 7),
+                    rng.uniform(0, 3),
+                    rng.uniform(0, 3),
+                )
+                for _ in range(rng.randint(0, 40))
+            ]
+            self.assertEqual(find_overlapping_pairs(rects), all_pairs(rects))
+
+    def test_single_column(self):
+        """Stacked shapes share an x-range, so only y pruning keeps this near linear"""
+        # 2000 rows of 0.25" with 0.2" gaps, and a narrow overlapping strip every 100 rows
+        rects = [(1.0, 0.45 * i, 4.0, 0.25) for i in range(2000)]
+        rects += [(2.0, 0.45 * i, 0.5, 0.6) for i in range(0, 2000, 100)]
+
+        with mock.patch.object(
+            inventory, "calculate_overlap", wraps=calculate_overlap
+        ) as compare:
+            pairs = find_overlapping_pairs(rects)
+
+        self.assertEqual(pairs, all_pairs(rects))
+        self.assertEqual(len(pairs), 40)
+        self.assertLess(compare.call_count, 5 * len(rects))
+
+
+if __name__ == "__main__":
+    unittest.main()
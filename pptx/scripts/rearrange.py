@@ -7,6 +7,10 @@ Usage:
 
 This will create output.pptx using slides from template.pptx in the specified order.
 Slides can be repeated (e.g., 34 appears twice).
+
+Rearranging works on the package's part graph: repeated slides are cloned as
+parts together with their relationships, the slide list is rewritten once,
+and slides that are not used are dropped in a single pass.
 """
 
 import argparse
@@ -15,8 +19,16 @@ import sys
 from copy import deepcopy
 from pathlib import Path
 
-import six
 from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import XmlPart
+from pptx.opc.packuri import PackURI
+from pptx.oxml.ns import qn
+
+# Namespace of relationship-id attributes (r:id, r:embed, r:link, ...)
+R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+# Elements that only link to another slide; removed with their relationship
+SLIDE_LINK_TAGS = {qn("a:hlinkClick"), qn("a:hlinkHover")}
 
 
 def main():
@@ -72,59 +84,173 @@ Note: Slide indices are 0-based (first slide is 0, second is 1, etc.)
         sys.exit(1)
 
 
-def duplicate_slide(pres, index):
-    """Duplicate a slide in the presentation."""
-    source = pres.slides[index]
-
-    # Use source's layout to preserve formatting
-    new_slide = pres.slides.add_slide(source.slide_layout)
-
-    # Collect all image and media relationships from the source slide
-    image_rels = {}
-    for rel_id, rel in six.iteritems(source.part.rels):
-        if "image" in rel.reltype or "media" in rel.reltype:
-            image_rels[rel_id] = rel
-
-    # CRITICAL: Clear placeholder shapes to avoid duplicates
-    for shape in new_slide.shapes:
-        sp = shape.element
-        sp.getparent().remove(sp)
-
-    # Copy all shapes from source
-    for shape in source.shapes:
-        el = shape.element
-        new_el = deepcopy(el)
-        new_slide.shapes._spTree.insert_element_before(new_el, "p:extLst")
-
-        # Handle picture shapes - need to update the blip reference
-        # Look for all blip elements (they can be in pic or other contexts)
-        # Using the element's own xpath method without namespaces argument
-        blips = new_el.xpath(".//a:blip[@r:embed]")
-        for blip in blips:
-            old_rId = blip.get(
-                "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed"
+class PartNamer:
+    """Hand out unused partnames like /ppt/slides/slide12.xml.
+
+    Existing partnames are collected once, so naming many cloned parts does
+    not rescan the package for every part.
+    """
+
+    def __init__(self, package):
+        self.used = {str(part.partname) for part in package.iter_parts()}
+        self.counters = {}
+
+    def next(self, template):
+        n = self.counters.get(template, 0) + 1
+        while template % n in self.used:
+            n += 1
+        self.counters[template] = n
+        partname = template % n
+        self.used.add(partname)
+        return PackURI(partname)
+
+
+def clone_part(part, partname, namer, skip_reltypes=()):
+    """Clone an XML part and its relationships.
+
+    Related parts are shared with the source (layouts, images, media), except
+    charts, which are cloned so the copies can be edited independently.
+    Relationship ids in the cloned XML are remapped to the clone's own rels.
+    """
+    element = deepcopy(part._element)
+    clone = type(part)(partname, part.content_type, part.package, element)
+
+    rId_map = {}
+    for rId, rel in part.rels.items():
+        if rel.reltype in skip_reltypes:
+            continue
+        if rel.is_external:
+            rId_map[rId] = clone.rels.get_or_add_ext_rel(rel.reltype, rel.target_ref)
+        elif rel.reltype == RT.CHART:
+            chart = clone_part(
+                rel.target_part, namer.next("/ppt/charts/chart%d.xml"), namer
             )
-            if old_rId in image_rels:
-                # Create a new relationship in the destination slide for this image
-                old_rel = image_rels[old_rId]
-                # get_or_add returns the rId directly, or adds and returns new rId
-                new_rId = new_slide.part.rels.get_or_add(
-                    old_rel.reltype, old_rel._target
-                )
-                # Update the blip's embed reference to use the new relationship ID
-                blip.set(
-                    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed",
-                    new_rId,
-                )
-
-    # Copy any additional image/media relationships that might be referenced elsewhere
-    for rel_id, rel in image_rels.items():
-        try:
-            new_slide.part.rels.get_or_add(rel.reltype, rel._target)
-        except Exception:
-            pass  # Relationship might already exist
-
-    return new_slide
+            rId_map[rId] = clone.rels.get_or_add(rel.reltype, chart)
+        else:
+            rId_map[rId] = clone.rels.get_or_add(rel.reltype, rel.target_part)
+
+    for el in element.iter():
+        for attr, value in el.attrib.items():
+            if attr.startswith(R_NS) and value in rId_map:
+                el.set(attr, rId_map[value])
+
+    return clone
+
+
+def clone_slide_part(slide_part, namer):
+    """Clone a slide part with its relationships; notes are not copied."""
+    return clone_part(
+        slide_part,
+        namer.next("/ppt/slides/slide%d.xml"),
+        namer,
+        skip_reltypes=(RT.NOTES_SLIDE,),
+    )
+
+
+def duplicate_slide(pres, index):
+    """Duplicate a slide in the presentation, appending the copy at the end."""
+    source_part = pres.slides[index].part
+    new_part = clone_slide_part(source_part, PartNamer(pres.part.package))
+    rId = pres.part.relate_to(new_part, RT.SLIDE)
+
+    sldIdLst = pres.slides._sldIdLst
+    sldIdLst._add_sldId(id=sldIdLst._next_id, rId=rId)
+    return pres.slides[len(pres.slides) - 1]
+
+
+def rearrange_slides(pres, slide_sequence):
+    """Rearrange the slides of a presentation in place, working on the part graph.
+
+    The first use of each slide keeps the original part; repeated uses are
+    cloned in bulk. The slide list is rewritten once and the relationships
+    to unused slides are dropped in one pass, so their parts (and notes) are
+    not written when the package is saved.
+
+    Args:
+        pres: Presentation to modify
+        slide_sequence: List of slide indices (0-based) for the final deck
+
+    Returns:
+        Number of slides cloned
+    """
+    sldIdLst = pres.slides._sldIdLst
+    entries = [(sldId.get("id"), sldId.rId) for sldId in sldIdLst]
+    prs_part = pres.part
+
+    total_slides = len(entries)
+    for idx in slide_sequence:
+        if idx < 0 or idx >= total_slides:
+            raise ValueError(f"Slide index {idx} out of range (0-{total_slides - 1})")
+
+    namer = PartNamer(prs_part.package)
+    next_id = max([int(slide_id) for slide_id, _ in entries] + [255]) + 1
+
+    final_entries = []
+    used = set()
+    clones = 0
+    for idx in slide_sequence:
+        slide_id, rId = entries[idx]
+        if idx not in used:
+            used.add(idx)
+            final_entries.append((slide_id, rId))
+            continue
+        new_part = clone_slide_part(prs_part.related_part(rId), namer)
+        final_entries.append((str(next_id), prs_part.relate_to(new_part, RT.SLIDE)))
+        next_id += 1
+        clones += 1
+
+    # Rewrite the slide list once
+    for sldId in list(sldIdLst):
+        sldIdLst.remove(sldId)
+    for slide_id, rId in final_entries:
+        sldIdLst._add_sldId(id=int(slide_id), rId=rId)
+
+    # Drop unused slides in one sweep
+    drop_slides(
+        prs_part, [entries[idx][1] for idx in range(total_slides) if idx not in used]
+    )
+
+    # Number slide parts in presentation order
+    prs_part.rename_slide_parts([rId for _, rId in final_entries])
+    return clones
+
+
+def drop_slides(prs_part, rIds):
+    """Remove slides from the presentation part, along with links to them.
+
+    Other parts can still reach a dropped slide, e.g. through a hyperlink on a
+    kept slide. Those relationships and their link elements are removed too,
+    so dropped slides are not written and don't collide with the renumbered
+    kept slides.
+    """
+    dropped = set()
+    for rId in rIds:
+        dropped.add(prs_part.related_part(rId))
+        prs_part.rels.pop(rId)
+    if not dropped:
+        return
+
+    for part in list(prs_part.package.iter_parts()):
+        if part in dropped:
+            continue
+        stale = [
+            rId
+            for rId, rel in part.rels.items()
+            if not rel.is_external and rel.target_part in dropped
+        ]
+        if not stale:
+            continue
+        for rId in stale:
+            part.rels.pop(rId)
+        if not isinstance(part, XmlPart):
+            continue
+        stale = set(stale)
+        for el in list(part._element.iter(*SLIDE_LINK_TAGS)):
+            if any(
+                attr.startswith(R_NS) and value in stale
+                for attr, value in el.attrib.items()
+            ):
+                el.getparent().remove(el)
 
 
 def delete_slide(pres, index):
@@ -162,64 +288,11 @@ def rearrange_presentation(template_path, output_path, slide_sequence):
     else:
         prs = Presentation(template_path)
 
-    total_slides = len(prs.slides)
-
-    # Validate indices
-    for idx in slide_sequence:
-        if idx < 0 or idx >= total_slides:
-            raise ValueError(f"Slide index {idx} out of range (0-{total_slides - 1})")
-
-    # Track original slides and their duplicates
-    slide_map = []  # List of actual slide indices for final presentation
-    duplicated = {}  # Track duplicates: original_idx -> [duplicate_indices]
-
-    # Step 1: DUPLICATE repeated slides
     print(f"Processing {len(slide_sequence)} slides from template...")
-    for i, template_idx in enumerate(slide_sequence):
-        if template_idx in duplicated and duplicated[template_idx]:
-            # Already duplicated this slide, use the duplicate
-            slide_map.append(duplicated[template_idx].pop(0))
-            print(f"  [{i}] Using duplicate of slide {template_idx}")
-        elif slide_sequence.count(template_idx) > 1 and template_idx not in duplicated:
-            # First occurrence of a repeated slide - create duplicates
-            slide_map.append(template_idx)
-            duplicates = []
-            count = slide_sequence.count(template_idx) - 1
-            print(
-                f"  [{i}] Using original slide {template_idx}, creating {count} duplicate(s)"
-            )
-            for _ in range(count):
-                duplicate_slide(prs, template_idx)
-                duplicates.append(len(prs.slides) - 1)
-            duplicated[template_idx] = duplicates
-        else:
-            # Unique slide or first occurrence already handled, use original
-            slide_map.append(template_idx)
-            print(f"  [{i}] Using original slide {template_idx}")
-
-    # Step 2: DELETE unwanted slides (work backwards)
-    slides_to_keep = set(slide_map)
-    print(f"\nDeleting {len(prs.slides) - len(slides_to_keep)} unused slides...")
-    for i in range(len(prs.slides) - 1, -1, -1):
-        if i not in slides_to_keep:
-            delete_slide(prs, i)
-            # Update slide_map indices after deletion
-            slide_map = [idx - 1 if idx > i else idx for idx in slide_map]
-
-    # Step 3: REORDER to final sequence
-    print(f"Reordering {len(slide_map)} slides to final sequence...")
-    for target_pos in range(len(slide_map)):
-        # Find which slide should be at target_pos
-        current_pos = slide_map[target_pos]
-        if current_pos != target_pos:
-            reorder_slides(prs, current_pos, target_pos)
-            # Update slide_map: the move shifts other slides
-            for i in range(len(slide_map)):
-                if slide_map[i] > current_pos and slide_map[i] <= target_pos:
-                    slide_map[i] -= 1
-                elif slide_map[i] < current_pos and slide_map[i] >= target_pos:
-                    slide_map[i] += 1
-            slide_map[target_pos] = target_pos
+    total_slides = len(prs.slides)
+    clones = rearrange_slides(prs, slide_sequence)
+    print(f"  Duplicated {clones} slide(s)")
+    print(f"  Dropped {total_slides - len(set(slide_sequence))} unused slide(s)")
 
     # Save the presentation
     prs.save(output_path)
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+import zipfile
+
+from pptx import Presentation
+from pptx.util import Inches
+
+from rearrange import rearrange_presentation
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestRearrangePresentation(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.template = os.path.join(self.tmp.name, "template.pptx")
+        self.output = os.path.join(self.tmp.name, "output.pptx")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_template(self, num_slides, links=()):
+        """Save a deck with one labelled text box per slide and (source, target) hyperlinks"""
+        prs = Presentation()
+        for i in range(num_slides):
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            box = slide.shapes.add_textbox(Inches(1), Inches(1), Inches(2), Inches(1))
+            box.text = f"slide {i}"
+        for source, target in links:
+            prs.slides[source].shapes[0].click_action.target_slide = prs.slides[target]
+        prs.save(self.template)
+
+    def labels(self, prs):
+        return [slide.shapes[0].text_frame.text for slide in prs.slides]
+
+    def test_reorder_duplicate_and_drop(self):
+        self.make_template(4)
+        rearrange_presentation(self.template, self.output, [3, 0, 0, 2])
+        prs = Presentation(self.output)
+        self.assertEqual(self.labels(prs), ["slide 3", "slide 0", "slide 0", "slide 2"])
+        self.assertEqual(
+            [str(slide.part.partname) for slide in prs.slides],
+            [f"/ppt/slides/slide{n}.xml" for n in range(1, 5)],
+        )
+
+    def test_link_to_dropped_slide(self):
+        """A kept slide linking to a dropped slide must not leave duplicate parts behind"""
+        self.make_template(5, links=[(0, 4), (1, 2)])
+        rearrange_presentation(self.template, self.output, [0, 1, 1, 2, 0])
+
+        names = zipfile.ZipFile(self.output).namelist()
+        self.assertEqual(len(names), len(set(names)))
+
+        prs = Presentation(self.output)
+        self.assertEqual(
+            self.labels(prs), ["slide 0", "slide 1", "slide 1", "slide 2", "slide 0"]
+        )
+        # The link to the dropped slide is removed, links to kept slides survive
+        targets = [slide.shapes[0].click_action.target_slide for slide in prs.slides]
+        self.assertIsNone(targets[0])
+        self.assertIs(targets[1].part, prs.slides[3].part)
+        self.assertIs(targets[2].part, prs.slides[3].part)
+
+
+if __name__ == "__main__":
+    unittest.main()
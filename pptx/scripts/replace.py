@@ -14,7 +14,7 @@ import sys
 from pathlib import Path
 from typing import Any, Dict, List
 
-from inventory import InventoryData, extract_text_inventory
+from inventory import InventoryData, extract_text_inventory, refresh_inventory
 from pptx import Presentation
 from pptx.dml.color import RGBColor
 from pptx.enum.dml import MSO_THEME_COLOR
@@ -241,6 +241,7 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
         raise ValueError(f"Found {len(errors)} validation error(s)")
 
     # Track statistics
+    replaced_shape_keys = []
     shapes_processed = 0
     shapes_cleared = 0
     shapes_replaced = 0
@@ -278,6 +279,7 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
                 continue
 
             shapes_replaced += 1
+            replaced_shape_keys.append((slide_key, shape_key))
 
             # Add replacement paragraphs
             for i, para_data in enumerate(replacement_shape_data["paragraphs"]):
@@ -289,19 +291,10 @@ def apply_replacements(pptx_file: str, json_file: str, output_file: str):
                 apply_paragraph_properties(p, para_data)
 
     # Check for issues after replacements
-    # Save to a temporary file and reload to avoid modifying the presentation during inventory
-    # (extract_text_inventory accesses font.color which adds empty <a:solidFill/> elements)
-    import tempfile
-
-    with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as tmp:
-        tmp_path = Path(tmp.name)
-        prs.save(str(tmp_path))
-
-    try:
-        updated_inventory = extract_text_inventory(tmp_path)
-        updated_overflow = detect_frame_overflow(updated_inventory)
-    finally:
-        tmp_path.unlink()  # Clean up temp file
+    # Inventory extraction is read-only, so re-measure just the replaced shapes
+    # in place (cleared shapes have no text and cannot overflow)
+    updated_inventory = refresh_inventory(inventory, prs, replaced_shape_keys)
+    updated_overflow = detect_frame_overflow(updated_inventory)
 
     # Check if any text overflow got worse
     overflow_errors = []
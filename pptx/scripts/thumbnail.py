@@ -20,6 +20,7 @@ Grid limits by column count:
 
 Usage:
     python thumbnail.py input.pptx [output_prefix] [--cols N] [--outline-placeholders]
+                        [--cache-dir DIR] [--workers N]
 
 Examples:
     python thumbnail.py presentation.pptx
@@ -38,17 +39,34 @@ Examples:
 
     python thumbnail.py template.pptx analysis --outline-placeholders
     # Creates thumbnail grids with red outlines around text placeholders
+
+    python thumbnail.py working.pptx preview --cache-dir .thumbnail-cache
+    # Keeps per-slide images in .thumbnail-cache; later runs only re-render
+    # slides whose XML, media or layout changed, and only rewrite the grids
+    # that contain them
+
+Pages are rasterized by several pdftoppm processes in parallel (one page
+range each, --workers N, default: number of CPUs), and each finished page
+range is decoded into thumbnails while the remaining ranges still render.
 """
 
 import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
 import subprocess
 import sys
 import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from inventory import extract_text_inventory
+from lxml import etree
 from PIL import Image, ImageDraw, ImageFont
-from pptx import Presentation
 
 # Constants
 THUMBNAIL_WIDTH = 300  # Fixed thumbnail width in pixels
@@ -63,6 +81,35 @@ BORDER_WIDTH = 2  # Border width around thumbnails
 FONT_SIZE_RATIO = 0.12  # Font size as fraction of thumbnail width
 LABEL_PADDING_RATIO = 0.4  # Label padding as fraction of font size
 
+# Cache constants
+CACHE_MANIFEST = "manifest.json"  # Grid fingerprints, stored in the cache directory
+CACHE_VERSION = 1  # Bump when rendering changes so old cache entries are ignored
+
+# Namespaces for reading slide geometry directly from the package XML
+NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+# Relationship types, spelled out so python-pptx is only imported for --cache-dir
+RELTYPE_SLIDE_LAYOUT = f"{NS['r']}/slideLayout"
+RELTYPE_SLIDE_MASTER = f"{NS['r']}/slideMaster"
+# Relationships that do not affect how a slide renders
+UNRENDERED_RELTYPES = {
+    f"{NS['r']}/{name}"
+    for name in ("notesSlide", "notesMaster", "handoutMaster", "slide")
+}
+EMU_PER_INCH = 914400.0
+# Master placeholder type a layout placeholder inherits its position from
+MASTER_PLACEHOLDER_TYPES = {
+    "title": "title",
+    "ctrTitle": "title",
+    "dt": "dt",
+    "ftr": "ftr",
+    "sldNum": "sldNum",
+}
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -86,6 +133,16 @@ def main():
         action="store_true",
         help="Outline text placeholders with a colored border",
     )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for cached slide images; only changed slides are re-rendered",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of parallel pdftoppm processes (default: number of CPUs)",
+    )
 
     args = parser.parse_args()
 
@@ -105,21 +162,37 @@ def main():
 
     print(f"Processing: {args.input}")
 
+    cache = ThumbnailCache(Path(args.cache_dir)) if args.cache_dir else None
+    workers = max(1, args.workers)
+
     try:
-        with tempfile.TemporaryDirectory() as temp_dir:
+        with tempfile.TemporaryDirectory() as temp_dir, ThumbnailLoader(
+            THUMBNAIL_WIDTH, workers
+        ) as loader:
+            # Read hidden flags and shape geometry once for both steps below
+            geometry = read_slide_geometry(input_path)
+
             # Get placeholder regions if outlining is enabled
             placeholder_regions = None
             slide_dimensions = None
             if args.outline_placeholders:
                 print("Extracting placeholder regions...")
                 placeholder_regions, slide_dimensions = get_placeholder_regions(
-                    input_path
+                    input_path, geometry
                 )
                 if placeholder_regions:
                     print(f"Found placeholders on {len(placeholder_regions)} slides")
 
             # Convert slides to images
-            slide_images = convert_to_images(input_path, Path(temp_dir), CONVERSION_DPI)
+            slide_images = convert_to_images(
+                input_path,
+                Path(temp_dir),
+                CONVERSION_DPI,
+                cache,
+                workers,
+                loader,
+                geometry,
+            )
             if not slide_images:
                 print("Error: No slides found")
                 sys.exit(1)
@@ -134,8 +207,13 @@ def main():
                 output_path,
                 placeholder_regions,
                 slide_dimensions,
+                cache,
+                loader,
             )
 
+            if cache:
+                cache.save()
+
             # Print saved files
             print(f"Created {len(grid_files)} grid(s):")
             for grid_file in grid_files:
@@ -146,6 +224,169 @@ def main():
         sys.exit(1)
 
 
+class ThumbnailCache:
+    """Slide images and grid fingerprints kept in a directory between runs.
+
+    Slide images are stored as {key}.jpg, where the key is a hash of
+    everything that affects how the slide renders (see compute_slide_keys).
+    The manifest records a fingerprint for each grid file written, so a grid
+    whose slides and layout are unchanged is not recomposed.
+
+    Use one cache directory per deck: entries not used by the latest run are
+    removed when the cache is saved.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.used_keys = set()
+        self.grids = {}
+
+        manifest_path = self.cache_dir / CACHE_MANIFEST
+        if manifest_path.exists():
+            try:
+                manifest = json.loads(manifest_path.read_text())
+                if manifest.get("version") == CACHE_VERSION:
+                    self.grids = manifest.get("grids", {})
+            except (OSError, ValueError):
+                pass
+
+    def image_path(self, key):
+        """Path where the image for a key is stored."""
+        return self.cache_dir / f"{key}.jpg"
+
+    def get_image(self, key):
+        """Return the cached image for a key, or None if it has not been rendered."""
+        path = self.image_path(key)
+        if path.exists():
+            self.used_keys.add(key)
+            return path
+        return None
+
+    def put_image(self, key, image_path):
+        """Store a rendered image under a key and return its cached path."""
+        path = self.image_path(key)
+        shutil.copyfile(image_path, path)
+        self.used_keys.add(key)
+        return path
+
+    def grid_is_current(self, grid_path, fingerprint):
+        """Check whether a grid file was written from the same inputs."""
+        return (
+            Path(grid_path).exists() and self.grids.get(str(grid_path)) == fingerprint
+        )
+
+    def record_grid(self, grid_path, fingerprint):
+        self.grids[str(grid_path)] = fingerprint
+
+    def save(self):
+        """Write the manifest and remove slide images not used by this run."""
+        for path in self.cache_dir.glob("*.jpg"):
+            if path.stem not in self.used_keys:
+                path.unlink()
+        manifest = {"version": CACHE_VERSION, "grids": self.grids}
+        (self.cache_dir / CACHE_MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+
+def compute_slide_keys(prs, dpi):
+    """Compute a cache key per slide from everything that affects its rendering.
+
+    The key covers the slide XML and, through its relationships, the layout,
+    master, theme and media it uses (notes and links to other slides are
+    ignored), plus the presentation's slide size and default text style, the
+    rendering DPI and the slide's position, which slide-number fields show.
+    Hashes of shared parts are computed once.
+    """
+    part_digests = {}
+
+    def part_digest(part):
+        if part.partname in part_digests:
+            return part_digests[part.partname]
+        # Mark as in progress so relationship cycles terminate
+        part_digests[part.partname] = ""
+
+        h = hashlib.sha256(part.blob)
+        for rId, rel in sorted(part.rels.items()):
+            if rel.reltype in UNRENDERED_RELTYPES:
+                continue
+            # Masters link back to all of their layouts; only follow a slide's own layout
+            if rel.reltype == RELTYPE_SLIDE_LAYOUT and part.content_type.endswith(
+                "slideMaster+xml"
+            ):
+                continue
+            h.update(f"{rId}|{rel.reltype}|".encode())
+            if rel.is_external:
+                h.update(rel.target_ref.encode())
+            else:
+                h.update(part_digest(rel.target_part).encode())
+
+        part_digests[part.partname] = h.hexdigest()
+        return part_digests[part.partname]
+
+    base = hashlib.sha256(f"v{CACHE_VERSION}|dpi={dpi}|".encode())
+    for tag in ("p:sldSz", "p:defaultTextStyle"):
+        child = prs.element.find(tag, NS)
+        if child is not None:
+            base.update(etree.tostring(child))
+
+    keys = []
+    for slide_num, slide in enumerate(prs.slides, start=1):
+        h = base.copy()
+        h.update(f"slide={slide_num}|".encode())
+        h.update(part_digest(slide.part).encode())
+        keys.append(h.hexdigest())
+    return keys
+
+
+def load_slide_image(img_path, width):
+    """Open a slide image decoded at reduced size for a thumbnail of the given width.
+
+    JPEG decoding can scale by 1/2, 1/4 or 1/8 on the fly (Image.draft), so a
+    full-DPI page is never fully decoded just to be shrunk to a thumbnail.
+    Returns (image, original_size).
+    """
+    img = Image.open(img_path)
+    orig_size = img.size
+    target_height = max(1, round(width * orig_size[1] / orig_size[0]))
+    img.draft("RGB", (width, target_height))
+    img.load()
+    return img, orig_size
+
+
+class ThumbnailLoader:
+    """Decode slide images in background threads as soon as they are rendered.
+
+    prefetch() starts decoding pages while other pages are still being
+    rasterized; load() returns the decoded image, waiting for it if needed
+    (or decoding directly if it was never prefetched).
+    """
+
+    def __init__(self, width, workers):
+        self.width = width
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._futures = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def prefetch(self, img_paths):
+        for img_path in img_paths:
+            key = str(img_path)
+            if key not in self._futures:
+                self._futures[key] = self._executor.submit(
+                    load_slide_image, img_path, self.width
+                )
+
+    def load(self, img_path):
+        future = self._futures.pop(str(img_path), None)
+        if future is None:
+            return load_slide_image(img_path, self.width)
+        return future.result()
+
+
 def create_hidden_slide_placeholder(size):
     """Create placeholder image for hidden slides."""
     img = Image.new("RGB", size, color="#F0F0F0")
@@ -156,62 +397,285 @@ def create_hidden_slide_placeholder(size):
     return img
 
 
-def get_placeholder_regions(pptx_path):
+@dataclass
+class DeckGeometry:
+    """Hidden flags, slide size and text shape rectangles read from the package XML."""
+
+    slide_width: int  # in EMUs
+    slide_height: int  # in EMUs
+    slide_count: int = 0
+    hidden_slides: set = field(default_factory=set)  # 1-based slide numbers
+    # 0-based slide index -> list of (left, top, width, height) in EMUs
+    text_shapes: dict = field(default_factory=dict)
+
+
+def read_slide_geometry(pptx_path):
+    """Read slide geometry straight from the slide XML, without python-pptx objects.
+
+    Collects the same shapes the text inventory reports (shapes with text,
+    excluding slide numbers and numeric footers), with absolute positions
+    for shapes inside groups and positions inherited from the layout or
+    master for placeholders that do not set their own. No fonts are loaded
+    and no text is measured.
+    """
+    with zipfile.ZipFile(pptx_path) as package:
+        xml_cache = {}
+
+        def read_xml(partname):
+            if partname not in xml_cache:
+                try:
+                    xml_cache[partname] = etree.fromstring(package.read(partname))
+                except KeyError:
+                    xml_cache[partname] = None
+            return xml_cache[partname]
+
+        def read_rels(partname):
+            """Map rId -> (reltype, target partname) for a part."""
+            directory, name = posixpath.split(partname)
+            rels = read_xml(f"{directory}/_rels/{name}.rels")
+            result = {}
+            if rels is not None:
+                for rel in rels.iterfind("rel:Relationship", NS):
+                    if rel.get("TargetMode") == "External":
+                        continue
+                    target = posixpath.normpath(
+                        posixpath.join(directory, rel.get("Target"))
+                    )
+                    result[rel.get("Id")] = (rel.get("Type"), target)
+            return result
+
+        def related(partname, reltype):
+            for rel_type, target in read_rels(partname).values():
+                if rel_type == reltype:
+                    return target
+            return None
+
+        def placeholder_positions(partname, key_of):
+            """Map placeholder key -> (a:off, a:ext) for the placeholders of a layout or master."""
+            root = read_xml(partname) if partname else None
+            positions = {}
+            if root is None:
+                return positions
+            for sp in root.iterfind(".//p:cSld/p:spTree/p:sp", NS):
+                ph = sp.find("p:nvSpPr/p:nvPr/p:ph", NS)
+                if ph is None:
+                    continue
+                xfrm = sp.find("p:spPr/a:xfrm", NS)
+                off = xfrm.find("a:off", NS) if xfrm is not None else None
+                ext = xfrm.find("a:ext", NS) if xfrm is not None else None
+                positions.setdefault(key_of(ph), (off, ext))
+            return positions
+
+        layout_positions = {}
+        master_positions = {}
+
+        def inherited_position(slide_partname, ph):
+            """Find a:off and a:ext for a placeholder through its layout and master."""
+            layout = related(slide_partname, RELTYPE_SLIDE_LAYOUT)
+            if layout not in layout_positions:
+                layout_positions[layout] = placeholder_positions(
+                    layout, lambda p: p.get("idx", "0")
+                )
+            off, ext = layout_positions[layout].get(ph.get("idx", "0"), (None, None))
+            if off is not None and ext is not None:
+                return off, ext
+
+            # Layout placeholder doesn't set it either; fall back to the master by type
+            layout_ph_type = ph.get("type", "obj")
+            if layout:
+                layout_root = read_xml(layout)
+                for sp in layout_root.iterfind(".//p:cSld/p:spTree/p:sp", NS):
+                    layout_ph = sp.find("p:nvSpPr/p:nvPr/p:ph", NS)
+                    if layout_ph is not None and layout_ph.get("idx", "0") == ph.get(
+                        "idx", "0"
+                    ):
+                        layout_ph_type = layout_ph.get("type", "obj")
+                        break
+            master = related(layout, RELTYPE_SLIDE_MASTER) if layout else None
+            if master not in master_positions:
+                master_positions[master] = placeholder_positions(
+                    master, lambda p: p.get("type", "obj")
+                )
+            master_type = MASTER_PLACEHOLDER_TYPES.get(layout_ph_type, "body")
+            master_off, master_ext = master_positions[master].get(
+                master_type, (None, None)
+            )
+            return (
+                off if off is not None else master_off,
+                ext if ext is not None else master_ext,
+            )
+
+        def xy(element, x_attr, y_attr):
+            if element is None:
+                return 0, 0
+            return int(element.get(x_attr, 0)), int(element.get(y_attr, 0))
+
+        def collect(slide_partname, shape_tree, parent_left, parent_top, rects):
+            for child in shape_tree:
+                tag = etree.QName(child).localname
+                if tag == "grpSp":
+                    group_off = child.find("p:grpSpPr/a:xfrm/a:off", NS)
+                    left, top = xy(group_off, "x", "y")
+                    collect(
+                        slide_partname,
+                        child,
+                        parent_left + left,
+                        parent_top + top,
+                        rects,
+                    )
+                elif tag == "sp":
+                    tx_body = child.find("p:txBody", NS)
+                    if tx_body is None:
+                        continue
+                    text = "\n".join(
+                        "".join(t.text or "" for t in p.iterfind(".//a:t", NS))
+                        for p in tx_body.iterfind("a:p", NS)
+                    ).strip()
+                    if not text:
+                        continue
+
+                    ph = child.find("p:nvSpPr/p:nvPr/p:ph", NS)
+                    if ph is not None:
+                        ph_type = ph.get("type", "obj")
+                        if ph_type == "sldNum":
+                            continue
+                        if ph_type == "ftr" and text.isdigit():
+                            continue
+
+                    xfrm = child.find("p:spPr/a:xfrm", NS)
+                    off = xfrm.find("a:off", NS) if xfrm is not None else None
+                    ext = xfrm.find("a:ext", NS) if xfrm is not None else None
+                    if ph is not None and (off is None or ext is None):
+                        base_off, base_ext = inherited_position(slide_partname, ph)
+                        off = off if off is not None else base_off
+                        ext = ext if ext is not None else base_ext
+
+                    left, top = xy(off, "x", "y")
+                    width, height = xy(ext, "cx", "cy")
+                    rects.append((parent_left + left, parent_top + top, width, height))
+
+        presentation = read_xml("ppt/presentation.xml")
+        slide_size = presentation.find("p:sldSz", NS)
+        if slide_size is not None:
+            geometry = DeckGeometry(
+                slide_width=int(slide_size.get("cx")),
+                slide_height=int(slide_size.get("cy")),
+            )
+        else:
+            geometry = DeckGeometry(slide_width=9144000, slide_height=5143500)
+
+        presentation_rels = read_rels("ppt/presentation.xml")
+        slide_ids = presentation.iterfind("p:sldIdLst/p:sldId", NS)
+        for slide_idx, slide_id in enumerate(slide_ids):
+            slide_partname = presentation_rels[slide_id.get(f"{{{NS['r']}}}id")][1]
+            slide = read_xml(slide_partname)
+            geometry.slide_count += 1
+            if slide.get("show") == "0":
+                geometry.hidden_slides.add(slide_idx + 1)
+
+            rects = []
+            shape_tree = slide.find("p:cSld/p:spTree", NS)
+            if shape_tree is not None:
+                collect(slide_partname, shape_tree, 0, 0, rects)
+            if rects:
+                geometry.text_shapes[slide_idx] = rects
+
+    return geometry
+
+
+def get_placeholder_regions(pptx_path, geometry=None):
     """Extract ALL text regions from the presentation.
 
     Returns a tuple of (placeholder_regions, slide_dimensions).
     text_regions is a dict mapping slide indices to lists of text regions.
     Each region is a dict with 'left', 'top', 'width', 'height' in inches.
     slide_dimensions is a tuple of (width_inches, height_inches).
+
+    Regions come from read_slide_geometry; pass its result to avoid reading
+    the package again.
     """
-    prs = Presentation(str(pptx_path))
-    inventory = extract_text_inventory(pptx_path, prs)
+    if geometry is None:
+        geometry = read_slide_geometry(pptx_path)
     placeholder_regions = {}
 
     # Get actual slide dimensions in inches (EMU to inches conversion)
-    slide_width_inches = (prs.slide_width or 9144000) / 914400.0
-    slide_height_inches = (prs.slide_height or 5143500) / 914400.0
-
-    for slide_key, shapes in inventory.items():
-        # Extract slide index from "slide-N" format
-        slide_idx = int(slide_key.split("-")[1])
-        regions = []
-
-        for shape_key, shape_data in shapes.items():
-            # The inventory only contains shapes with text, so all shapes should be highlighted
-            regions.append(
-                {
-                    "left": shape_data.left,
-                    "top": shape_data.top,
-                    "width": shape_data.width,
-                    "height": shape_data.height,
-                }
-            )
-
-        if regions:
-            placeholder_regions[slide_idx] = regions
+    slide_width_inches = geometry.slide_width / EMU_PER_INCH
+    slide_height_inches = geometry.slide_height / EMU_PER_INCH
+
+    for slide_idx, rects in geometry.text_shapes.items():
+        # Only shapes with text are collected, so all shapes should be highlighted
+        placeholder_regions[slide_idx] = [
+            {
+                "left": round(left / EMU_PER_INCH, 2),
+                "top": round(top / EMU_PER_INCH, 2),
+                "width": round(width / EMU_PER_INCH, 2),
+                "height": round(height / EMU_PER_INCH, 2),
+            }
+            for left, top, width, height in rects
+        ]
 
     return placeholder_regions, (slide_width_inches, slide_height_inches)
 
 
-def convert_to_images(pptx_path, temp_dir, dpi):
-    """Convert PowerPoint to images via PDF, handling hidden slides."""
-    # Detect hidden slides
-    print("Analyzing presentation...")
-    prs = Presentation(str(pptx_path))
-    total_slides = len(prs.slides)
+def get_pdf_page_count(pdf_path):
+    """Get the number of pages in a PDF with pdfinfo, or None if unavailable."""
+    try:
+        result = subprocess.run(
+            ["pdfinfo", str(pdf_path)], capture_output=True, text=True
+        )
+    except FileNotFoundError:
+        return None
+    match = re.search(r"^Pages:\s+(\d+)", result.stdout, re.MULTILINE)
+    return int(match.group(1)) if match else None
 
-    # Find hidden slides (1-based indexing for display)
-    hidden_slides = {
-        idx + 1
-        for idx, slide in enumerate(prs.slides)
-        if slide.element.get("show") == "0"
-    }
 
-    print(f"Total slides: {total_slides}")
-    if hidden_slides:
-        print(f"Hidden slides: {sorted(hidden_slides)}")
+def rasterize_pdf(pdf_path, temp_dir, dpi, workers=1, on_ready=None):
+    """Convert PDF pages to JPEGs, splitting page ranges across pdftoppm processes.
+
+    on_ready is called with the images of each page range as soon as that
+    range is finished. Returns all page images in page order.
+    """
+    page_count = get_pdf_page_count(pdf_path) if workers > 1 else None
+    if page_count:
+        workers = min(workers, page_count)
+        bounds = [page_count * w // workers for w in range(workers + 1)]
+        ranges = [(bounds[w] + 1, bounds[w + 1]) for w in range(workers)]
+    else:
+        ranges = [None]
+
+    def run_range(page_range):
+        command = ["pdftoppm", "-jpeg", "-r", str(dpi)]
+        prefix = temp_dir / "slide"
+        if page_range:
+            first, last = page_range
+            command += ["-f", str(first), "-l", str(last)]
+            prefix = temp_dir / f"slide-{first:05d}"
+        result = subprocess.run(
+            command + [str(pdf_path), str(prefix)], capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError("Image conversion failed")
+        # pdftoppm appends the page number; its zero padding depends on the page count
+        return sorted(
+            temp_dir.glob(f"{prefix.name}-*.jpg"),
+            key=lambda p: int(p.stem.rsplit("-", 1)[1]),
+        )
+
+    print(f"Converting to images at {dpi} DPI...")
+    images_by_range = {}
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = {executor.submit(run_range, r): i for i, r in enumerate(ranges)}
+        for future in as_completed(futures):
+            images = future.result()
+            images_by_range[futures[future]] = images
+            if on_ready:
+                on_ready(images)
+
+    return [img for i in range(len(ranges)) for img in images_by_range[i]]
 
+
+def render_slides(pptx_path, temp_dir, dpi, workers=1, on_ready=None):
+    """Render the visible slides of a presentation to JPEGs via PDF, in slide order."""
     pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
 
     # Convert to PDF
@@ -233,16 +697,81 @@ def convert_to_images(pptx_path, temp_dir, dpi):
         raise RuntimeError("PDF conversion failed")
 
     # Convert PDF to images
-    print(f"Converting to images at {dpi} DPI...")
-    result = subprocess.run(
-        ["pdftoppm", "-jpeg", "-r", str(dpi), str(pdf_path), str(temp_dir / "slide")],
-        capture_output=True,
-        text=True,
+    return rasterize_pdf(pdf_path, temp_dir, dpi, workers, on_ready)
+
+
+def render_slides_cached(
+    prs, pptx_path, temp_dir, dpi, hidden_slides, cache, workers=1, on_ready=None
+):
+    """Render only visible slides missing from the cache; return all visible slide images.
+
+    Slides that are already cached are marked hidden in a temporary copy of the
+    presentation, so soffice only exports the slides that need rendering.
+    """
+    keys = compute_slide_keys(prs, dpi)
+    visible = [num for num in range(1, len(keys) + 1) if num not in hidden_slides]
+    to_render = [num for num in visible if cache.get_image(keys[num - 1]) is None]
+
+    print(
+        f"Cached slides: {len(visible) - len(to_render)}, to render: {len(to_render)}"
     )
-    if result.returncode != 0:
-        raise RuntimeError("Image conversion failed")
+    if to_render:
+        render_set = set(to_render)
+        for num, slide in enumerate(prs.slides, start=1):
+            if num not in render_set:
+                slide.element.set("show", "0")
+        render_dir = temp_dir / "render"
+        render_dir.mkdir()
+        render_path = render_dir / pptx_path.name
+        prs.save(str(render_path))
+
+        rendered = render_slides(render_path, render_dir, dpi, workers)
+        if len(rendered) != len(to_render):
+            raise RuntimeError(
+                f"Expected {len(to_render)} rendered slides, got {len(rendered)}"
+            )
+        for num, image_path in zip(to_render, rendered):
+            cache.put_image(keys[num - 1], image_path)
+
+    images = [cache.get_image(keys[num - 1]) for num in visible]
+    if on_ready:
+        on_ready(images)
+    return images
 
-    visible_images = sorted(temp_dir.glob("slide-*.jpg"))
+
+def convert_to_images(
+    pptx_path, temp_dir, dpi, cache=None, workers=1, loader=None, geometry=None
+):
+    """Convert PowerPoint to images via PDF, handling hidden slides.
+
+    With a cache, only slides that changed since the last run are rendered and
+    the returned paths point into the cache directory. With a loader, pages
+    start decoding into thumbnails as soon as they are rasterized. Hidden
+    slides are taken from geometry (read_slide_geometry) when given.
+    """
+    # Detect hidden slides
+    print("Analyzing presentation...")
+    if geometry is None:
+        geometry = read_slide_geometry(pptx_path)
+
+    # Hidden slides use 1-based indexing for display
+    hidden_slides = geometry.hidden_slides
+    total_slides = geometry.slide_count
+
+    print(f"Total slides: {total_slides}")
+    if hidden_slides:
+        print(f"Hidden slides: {sorted(hidden_slides)}")
+
+    on_ready = loader.prefetch if loader else None
+    if cache:
+        from pptx import Presentation
+
+        prs = Presentation(str(pptx_path))
+        visible_images = render_slides_cached(
+            prs, pptx_path, temp_dir, dpi, hidden_slides, cache, workers, on_ready
+        )
+    else:
+        visible_images = render_slides(pptx_path, temp_dir, dpi, workers, on_ready)
 
     # Create full list with placeholders for hidden slides
     all_images = []
@@ -261,6 +790,9 @@ def convert_to_images(pptx_path, temp_dir, dpi):
             placeholder_path = temp_dir / f"hidden-{slide_num:03d}.jpg"
             placeholder_img = create_hidden_slide_placeholder(placeholder_size)
             placeholder_img.save(placeholder_path, "JPEG")
+            if cache:
+                placeholder_key = f"hidden-{placeholder_size[0]}x{placeholder_size[1]}"
+                placeholder_path = cache.put_image(placeholder_key, placeholder_path)
             all_images.append(placeholder_path)
         else:
             # Use the actual visible slide image
@@ -278,8 +810,14 @@ def create_grids(
     output_path,
     placeholder_regions=None,
     slide_dimensions=None,
+    cache=None,
+    loader=None,
 ):
-    """Create multiple thumbnail grids from slide images, max cols×(cols+1) images per grid."""
+    """Create multiple thumbnail grids from slide images, max cols×(cols+1) images per grid.
+
+    With a cache (and images taken from it), grids whose slides and layout
+    are unchanged since the last run are left as they are.
+    """
     # Maximum images per grid is cols × (cols + 1) for better proportions
     max_images_per_grid = cols * (cols + 1)
     grid_files = []
@@ -295,11 +833,6 @@ def create_grids(
         end_idx = min(start_idx + max_images_per_grid, len(image_paths))
         chunk_images = image_paths[start_idx:end_idx]
 
-        # Create grid for this chunk
-        grid = create_grid(
-            chunk_images, cols, width, start_idx, placeholder_regions, slide_dimensions
-        )
-
         # Generate output filename
         if len(image_paths) <= max_images_per_grid:
             # Single grid - use base filename without suffix
@@ -310,10 +843,46 @@ def create_grids(
             suffix = output_path.suffix
             grid_filename = output_path.parent / f"{stem}-{chunk_idx + 1}{suffix}"
 
+        # Skip grids whose inputs are unchanged (cached image names are content keys)
+        fingerprint = None
+        if cache:
+            fingerprint = hashlib.sha256(
+                json.dumps(
+                    {
+                        "slides": [Path(p).stem for p in chunk_images],
+                        "cols": cols,
+                        "width": width,
+                        "start": start_idx,
+                        "regions": [
+                            (placeholder_regions or {}).get(i)
+                            for i in range(start_idx, end_idx)
+                        ],
+                        "slide_dimensions": slide_dimensions,
+                    },
+                    sort_keys=True,
+                ).encode()
+            ).hexdigest()
+            if cache.grid_is_current(grid_filename, fingerprint):
+                grid_files.append(str(grid_filename))
+                continue
+
+        # Create grid for this chunk
+        grid = create_grid(
+            chunk_images,
+            cols,
+            width,
+            start_idx,
+            placeholder_regions,
+            slide_dimensions,
+            loader,
+        )
+
         # Save grid
         grid_filename.parent.mkdir(parents=True, exist_ok=True)
         grid.save(str(grid_filename), quality=JPEG_QUALITY)
         grid_files.append(str(grid_filename))
+        if cache:
+            cache.record_grid(grid_filename, fingerprint)
 
     return grid_files
 
@@ -325,6 +894,7 @@ def create_grid(
     start_slide_num=0,
     placeholder_regions=None,
     slide_dimensions=None,
+    loader=None,
 ):
     """Create thumbnail grid from slide images with optional placeholder outlining."""
     font_size = int(width * FONT_SIZE_RATIO)
@@ -374,9 +944,14 @@ def create_grid(
         # Add thumbnail below label with proportional spacing
         y_thumbnail = y_base + label_padding + font_size + label_padding
 
-        with Image.open(img_path) as img:
-            # Get original dimensions before thumbnail
-            orig_w, orig_h = img.size
+        if loader:
+            img, (orig_w, orig_h) = loader.load(img_path)
+        else:
+            img, (orig_w, orig_h) = load_slide_image(img_path, width)
+
+        with img:
+            # Image may already be reduced on decode; outlines are drawn at its size
+            draft_scale = img.width / orig_w
 
             # Apply placeholder outlines if enabled
             if placeholder_regions and (start_slide_num + i) in placeholder_regions:
@@ -395,8 +970,8 @@ def create_grid(
                     slide_width_inches = orig_w / CONVERSION_DPI
                     slide_height_inches = orig_h / CONVERSION_DPI
 
-                x_scale = orig_w / slide_width_inches
-                y_scale = orig_h / slide_height_inches
+                x_scale = img.width / slide_width_inches
+                y_scale = img.height / slide_height_inches
 
                 # Create a highlight overlay
                 overlay = Image.new("RGBA", img.size, (255, 255, 255, 0))
@@ -404,7 +979,7 @@ def create_grid(
 
                 # Highlight each placeholder region
                 for region in regions:
-                    # Convert from inches to pixels in the original image
+                    # Convert from inches to pixels in the decoded image
                     px_left = int(region["left"] * x_scale)
                     px_top = int(region["top"] * y_scale)
                     px_width = int(region["width"] * x_scale)
@@ -413,8 +988,8 @@ def create_grid(
                     # Draw highlight outline with red color and thick stroke
                     # Using a bright red outline instead of fill
                     stroke_width = max(
-                        5, min(orig_w, orig_h) // 150
-                    )  # Thicker proportional stroke width
+                        1, round(max(5, min(orig_w, orig_h) // 150) * draft_scale)
+                    )  # Thicker proportional stroke width, relative to the full-size page
                     overlay_draw.rectangle(
                         [(px_left, px_top), (px_left + px_width, px_top + px_height)],
                         outline=(255, 0, 0, 255),  # Bright red, fully opaque
@@ -4,26 +4,69 @@ Easing Functions - Timing functions for smooth animations.
 
 Provides various easing functions for natural motion and timing.
 All functions take a value t (0.0 to 1.0) and return eased value (0.0 to 1.0).
+
+Every easing and motion function also accepts a numpy array (or list) of t
+values and returns an array, so a whole timeline can be evaluated in one call
+instead of once per frame. KeyframeTrack builds on this to precompute
+per-frame positions, scales and colors.
 """
 
 import math
+from functools import wraps
+from typing import Optional
+
+import numpy as np
+
+
+def _as_array(t) -> np.ndarray:
+    return np.asarray(t, dtype=np.float64)
+
+
+def _accepts_arrays(array_form=None):
+    """
+    Let an easing function written for a scalar t also take arrays.
+
+    Scalars still run the plain Python version. Arrays run array_form, or the
+    scalar version itself when it has no branches and so works on arrays as is.
+    """
+
+    def decorate(scalar_form):
+        vector_form = array_form or scalar_form
 
+        @wraps(scalar_form)
+        def ease(t):
+            if isinstance(t, (int, float)):
+                return scalar_form(t)
+            return vector_form(_as_array(t))
 
+        return ease
+
+    return decorate
+
+
+@_accepts_arrays()
 def linear(t: float) -> float:
     """Linear interpolation (no easing)."""
     return t
 
 
+@_accepts_arrays()
 def ease_in_quad(t: float) -> float:
     """Quadratic ease-in (slow start, accelerating)."""
     return t * t
 
 
+@_accepts_arrays()
 def ease_out_quad(t: float) -> float:
     """Quadratic ease-out (fast start, decelerating)."""
     return t * (2 - t)
 
 
+def _ease_in_out_quad_array(t):
+    return np.where(t < 0.5, 2 * t * t, -1 + (4 - 2 * t) * t)
+
+
+@_accepts_arrays(_ease_in_out_quad_array)
 def ease_in_out_quad(t: float) -> float:
     """Quadratic ease-in-out (slow start and end)."""
     if t < 0.5:
@@ -31,16 +74,23 @@ def ease_in_out_quad(t: float) -> float:
     return -1 + (4 - 2 * t) * t
 
 
+@_accepts_arrays()
 def ease_in_cubic(t: float) -> float:
     """Cubic ease-in (slow start)."""
     return t * t * t
 
 
+@_accepts_arrays()
 def ease_out_cubic(t: float) -> float:
     """Cubic ease-out (fast start)."""
     return (t - 1) * (t - 1) * (t - 1) + 1
 
 
+def _ease_in_out_cubic_array(t):
+    return np.where(t < 0.5, 4 * t * t * t, (t - 1) * (2 * t - 2) * (2 * t - 2) + 1)
+
+
+@_accepts_arrays(_ease_in_out_cubic_array)
 def ease_in_out_cubic(t: float) -> float:
     """Cubic ease-in-out."""
     if t < 0.5:
@@ -48,11 +98,24 @@ def ease_in_out_cubic(t: float) -> float:
     return (t - 1) * (2 * t - 2) * (2 * t - 2) + 1
 
 
+@_accepts_arrays()
 def ease_in_bounce(t: float) -> float:
     """Bounce ease-in (bouncy start)."""
     return 1 - ease_out_bounce(1 - t)
 
 
+def _ease_out_bounce_array(t):
+    d1 = t - 1.5 / 2.75
+    d2 = t - 2.25 / 2.75
+    d3 = t - 2.625 / 2.75
+    return np.select(
+        [t < 1 / 2.75, t < 2 / 2.75, t < 2.5 / 2.75],
+        [7.5625 * t * t, 7.5625 * d1 * d1 + 0.75, 7.5625 * d2 * d2 + 0.9375],
+        default=7.5625 * d3 * d3 + 0.984375,
+    )
+
+
+@_accepts_arrays(_ease_out_bounce_array)
 def ease_out_bounce(t: float) -> float:
     """Bounce ease-out (bouncy end)."""
     if t < 1 / 2.75:
@@ -68,6 +131,13 @@ def ease_out_bounce(t: float) -> float:
         return 7.5625 * t * t + 0.984375
 
 
+def _ease_in_out_bounce_array(t):
+    return np.where(
+        t < 0.5, ease_in_bounce(t * 2) * 0.5, ease_out_bounce(t * 2 - 1) * 0.5 + 0.5
+    )
+
+
+@_accepts_arrays(_ease_in_out_bounce_array)
 def ease_in_out_bounce(t: float) -> float:
     """Bounce ease-in-out."""
     if t < 0.5:
@@ -75,6 +145,12 @@ def ease_in_out_bounce(t: float) -> float:
     return ease_out_bounce(t * 2 - 1) * 0.5 + 0.5
 
 
+def _ease_in_elastic_array(t):
+    eased = -np.power(2, 10 * (t - 1)) * np.sin((t - 1.1) * 5 * math.pi)
+    return np.where((t == 0) | (t == 1), t, eased)
+
+
+@_accepts_arrays(_ease_in_elastic_array)
 def ease_in_elastic(t: float) -> float:
     """Elastic ease-in (spring effect)."""
     if t == 0 or t == 1:
@@ -82,6 +158,12 @@ def ease_in_elastic(t: float) -> float:
     return -math.pow(2, 10 * (t - 1)) * math.sin((t - 1.1) * 5 * math.pi)
 
 
+def _ease_out_elastic_array(t):
+    eased = np.power(2, -10 * t) * np.sin((t - 0.1) * 5 * math.pi) + 1
+    return np.where((t == 0) | (t == 1), t, eased)
+
+
+@_accepts_arrays(_ease_out_elastic_array)
 def ease_out_elastic(t: float) -> float:
     """Elastic ease-out (spring effect)."""
     if t == 0 or t == 1:
@@ -89,6 +171,18 @@ def ease_out_elastic(t: float) -> float:
     return math.pow(2, -10 * t) * math.sin((t - 0.1) * 5 * math.pi) + 1
 
 
+def _ease_in_out_elastic_array(t):
+    u = t * 2 - 1
+    wave = np.sin((u - 0.1) * 5 * math.pi)
+    eased = np.where(
+        u < 0,
+        -0.5 * np.power(2, 10 * u) * wave,
+        np.power(2, -10 * u) * wave * 0.5 + 1,
+    )
+    return np.where((t == 0) | (t == 1), t, eased)
+
+
+@_accepts_arrays(_ease_in_out_elastic_array)
 def ease_in_out_elastic(t: float) -> float:
     """Elastic ease-in-out."""
     if t == 0 or t == 1:
@@ -123,6 +217,10 @@ def interpolate(start: float, end: float, t: float, easing: str = "linear") -> f
     """
     Interpolate between two values with easing.
 
+    start, end and t may be arrays and broadcast against each other: e.g. t
+    of shape (frames, 1) with start/end of shape (properties,) gives a
+    (frames, properties) timeline.
+
     Args:
         start: Start value
         end: End value
@@ -134,9 +232,13 @@ def interpolate(start: float, end: float, t: float, easing: str = "linear") -> f
     """
     ease_func = get_easing(easing)
     eased_t = ease_func(t)
+    if not isinstance(start, (int, float)) or not isinstance(end, (int, float)):
+        start = _as_array(start)
+        end = _as_array(end)
     return start + (end - start) * eased_t
 
 
+@_accepts_arrays()
 def ease_back_in(t: float) -> float:
     """Back ease-in (slight overshoot backward before forward motion)."""
     c1 = 1.70158
@@ -144,6 +246,7 @@ def ease_back_in(t: float) -> float:
     return c3 * t * t * t - c1 * t * t
 
 
+@_accepts_arrays()
 def ease_back_out(t: float) -> float:
     """Back ease-out (overshoot forward then settle back)."""
     c1 = 1.70158
@@ -151,6 +254,17 @@ def ease_back_out(t: float) -> float:
     return 1 + c3 * pow(t - 1, 3) + c1 * pow(t - 1, 2)
 
 
+def _ease_back_in_out_array(t):
+    c1 = 1.70158
+    c2 = c1 * 1.525
+    return np.where(
+        t < 0.5,
+        (np.power(2 * t, 2) * ((c2 + 1) * 2 * t - c2)) / 2,
+        (np.power(2 * t - 2, 2) * ((c2 + 1) * (t * 2 - 2) + c2) + 2) / 2,
+    )
+
+
+@_accepts_arrays(_ease_back_in_out_array)
 def ease_back_in_out(t: float) -> float:
     """Back ease-in-out (overshoot at both ends)."""
     c1 = 1.70158
@@ -168,13 +282,15 @@ def apply_squash_stretch(
 
     Args:
         base_scale: (width_scale, height_scale) base scales
-        intensity: Squash/stretch intensity (0.0-1.0)
+        intensity: Squash/stretch intensity (0.0-1.0), or an array of them
         direction: 'vertical', 'horizontal', or 'both'
 
     Returns:
         (width_scale, height_scale) with squash/stretch applied
     """
     width_scale, height_scale = base_scale
+    if not isinstance(intensity, (int, float)):
+        intensity = _as_array(intensity)
 
     if direction == "vertical":
         # Compress vertically, expand horizontally (preserve volume)
@@ -202,13 +318,15 @@ def calculate_arc_motion(
         start: (x, y) starting position
         end: (x, y) ending position
         height: Arc height at midpoint (positive = upward)
-        t: Progress (0.0-1.0)
+        t: Progress (0.0-1.0), or an array of them
 
     Returns:
-        (x, y) position along arc
+        (x, y) position along arc (arrays of positions if t is an array)
     """
     x1, y1 = start
     x2, y2 = end
+    if not isinstance(t, (int, float)):
+        t = _as_array(t)
 
     # Linear interpolation for x
     x = x1 + (x2 - x1) * t
@@ -232,3 +350,121 @@ EASING_FUNCTIONS.update(
         "overshoot": ease_back_out,  # Alias
     }
 )
+
+
+class KeyframeTrack:
+    """
+    Animated properties defined by keyframes, precomputed for every frame.
+
+    Each property is a number or a tuple (a position, a scale pair, an RGB
+    color, ...) with values at some keyframes; the frames in between are
+    eased. Before the first keyframe and after the last one, the value holds.
+    All frames of a property are computed in one vectorized pass.
+
+    Example:
+        track = KeyframeTrack(num_frames=30)
+        track.add("position", [(0, (20, 200)), (29, (220, 60))], easing="ease_out")
+        track.add("color", [(0, (255, 0, 0)), (15, (255, 200, 0))], as_int=True)
+        for i in range(30):
+            state = track.frame(i)  # {"position": (x, y), "color": (r, g, b)}
+    """
+
+    def __init__(self, num_frames: int):
+        """
+        Initialize keyframe track.
+
+        Args:
+            num_frames: Number of frames in the animation
+        """
+        self.num_frames = num_frames
+        self._values: dict[str, np.ndarray] = {}
+        self._frames: dict[str, list] = {}
+
+    def add(
+        self,
+        name: str,
+        keyframes: list[tuple],
+        easing: str = "linear",
+        as_int: bool = False,
+    ) -> "KeyframeTrack":
+        """
+        Add an animated property.
+
+        Args:
+            name: Property name
+            keyframes: (frame_index, value) pairs, or (frame_index, value, easing)
+                       to set the easing of the segment starting at that keyframe
+            easing: Easing for segments that don't set their own
+            as_int: Round values to integers (e.g. for pixel positions and colors)
+
+        Returns:
+            self, so calls can be chained
+        """
+        if not keyframes:
+            raise ValueError(f"Property '{name}' needs at least one keyframe")
+        keyframes = sorted(keyframes, key=lambda keyframe: keyframe[0])
+        key_frames = np.array([keyframe[0] for keyframe in keyframes], dtype=np.float64)
+        key_values = _as_array([keyframe[1] for keyframe in keyframes])
+        scalar = key_values.ndim == 1
+        key_values = key_values.reshape(len(keyframes), -1)
+        segment_easings = [
+            keyframe[2] if len(keyframe) > 2 else easing for keyframe in keyframes[:-1]
+        ]
+
+        frames = np.arange(self.num_frames, dtype=np.float64)
+        if len(keyframes) == 1:
+            values = np.repeat(key_values, self.num_frames, axis=0)
+        else:
+            # Segment i runs from keyframe i to keyframe i + 1
+            segment = np.clip(
+                np.searchsorted(key_frames, frames, side="right") - 1,
+                0,
+                len(keyframes) - 2,
+            )
+            start, end = key_frames[segment], key_frames[segment + 1]
+            span = np.where(end > start, end - start, 1)
+            t = np.clip((frames - start) / span, 0.0, 1.0)
+
+            # One vectorized call per distinct easing
+            eased = np.empty_like(t)
+            for segment_easing in set(segment_easings):
+                uses_easing = [e == segment_easing for e in segment_easings]
+                mask = np.array(uses_easing)[segment]
+                eased[mask] = get_easing(segment_easing)(t[mask])
+
+            values = interpolate(
+                key_values[segment], key_values[segment + 1], eased[:, None]
+            )
+
+        if as_int:
+            values = np.rint(values).astype(np.int64)
+        if scalar:
+            values = values[:, 0]
+        self._values[name] = values
+        self._frames[name] = [
+            value if scalar else tuple(value) for value in values.tolist()
+        ]
+        return self
+
+    @property
+    def names(self) -> list[str]:
+        """Names of the animated properties."""
+        return list(self._values)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """All frames of a property: (num_frames,) for numbers, (num_frames, D) for tuples."""
+        return self._values[name]
+
+    def frame(self, index: int, names: Optional[list[str]] = None) -> dict:
+        """
+        Property values at one frame, as Python numbers and tuples.
+
+        Args:
+            index: Frame index
+            names: Properties to include (default: all)
+
+        Returns:
+            {name: value} for the frame
+        """
+        names = self._frames if names is None else names
+        return {name: self._frames[name][index] for name in names}
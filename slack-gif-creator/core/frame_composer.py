@@ -4,13 +4,37 @@ Frame Composer - Utilities for composing visual elements into frames.
 
 Provides functions for drawing shapes, text, emojis, and compositing elements
 together to create animation frames.
+
+Static elements can also be rendered once and reused across frames: gradients
+and sprites (shapes and text on a transparent background) are cached by their
+parameters, and compose() alpha-blends sprites onto a background as numpy
+arrays instead of redrawing everything for every frame.
 """
 
-from typing import Optional
+import math
+from functools import lru_cache
+from typing import NamedTuple, Optional
 
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
+# Cached layers are kept for this many distinct parameter combinations
+LAYER_CACHE_SIZE = 256
+
+# Star outline as (angle, radius factor) pairs: 10 points, 36 degrees apart,
+# starting at the top and alternating between outer and inner radius
+_STAR_ANGLES = np.array([(i * 36 - 90) * math.pi / 180 for i in range(10)])
+_STAR_COS = np.cos(_STAR_ANGLES)
+_STAR_SIN = np.sin(_STAR_ANGLES)
+_STAR_RADII = np.array([1.0 if i % 2 == 0 else 0.4 for i in range(10)])
+
+
+class Sprite(NamedTuple):
+    """A pre-rendered RGBA layer and the pixel in it that is placed at the draw position."""
+
+    pixels: np.ndarray  # (H, W, 4) uint8 RGBA, read-only
+    origin: tuple[int, int]
+
 
 def create_blank_frame(
     width: int, height: int, color: tuple[int, int, int] = (255, 255, 255)
@@ -82,7 +106,7 @@ def draw_text(
 
     # Uses Pillow's default font.
     # If the font should be changed for the emoji, add additional logic here.
-    font = ImageFont.load_default()
+    font = _default_font()
 
     if centered:
         bbox = draw.textbbox((0, 0), text, font=font)
@@ -114,24 +138,32 @@ def create_gradient_background(
     Returns:
         PIL Image with gradient
     """
-    frame = Image.new("RGB", (width, height))
-    draw = ImageDraw.Draw(frame)
+    return Image.fromarray(gradient_array(width, height, top_color, bottom_color))
 
-    # Calculate color step for each row
-    r1, g1, b1 = top_color
-    r2, g2, b2 = bottom_color
 
-    for y in range(height):
-        # Interpolate color
-        ratio = y / height
-        r = int(r1 * (1 - ratio) + r2 * ratio)
-        g = int(g1 * (1 - ratio) + g2 * ratio)
-        b = int(b1 * (1 - ratio) + b2 * ratio)
+def gradient_array(
+    width: int,
+    height: int,
+    top_color: tuple[int, int, int],
+    bottom_color: tuple[int, int, int],
+) -> np.ndarray:
+    """
+    Vertical gradient as a (height, width, 3) uint8 array.
 
-        # Draw horizontal line
-        draw.line([(0, y), (width, y)], fill=(r, g, b))
+    Results are cached and read-only; copy before drawing on them, or use
+    compose() which copies the background.
+    """
+    return _gradient_array(width, height, _color(top_color), _color(bottom_color))
 
-    return frame
+
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _gradient_array(width, height, top_color, bottom_color):
+    # Row colors interpolated in one broadcast, then repeated across the width
+    ratio = (np.arange(height) / height)[:, None]
+    rows = np.array(top_color) * (1 - ratio) + np.array(bottom_color) * ratio
+    gradient = np.repeat(rows.astype(np.uint8)[:, None, :], width, axis=1)
+    gradient.flags.writeable = False
+    return gradient
 
 
 def draw_star(
@@ -156,21 +188,189 @@ def draw_star(
     Returns:
         Modified frame
     """
-    import math
-
     draw = ImageDraw.Draw(frame)
+    draw.polygon(
+        _star_points(center, size),
+        fill=fill_color,
+        outline=outline_color,
+        width=outline_width,
+    )
+    return frame
+
+
+def _star_points(center, size) -> list[tuple[float, float]]:
     x, y = center
+    radii = size * _STAR_RADII
+    return list(zip((x + radii * _STAR_COS).tolist(), (y + radii * _STAR_SIN).tolist()))
+
+
+@lru_cache(maxsize=1)
+def _default_font():
+    return ImageFont.load_default()
+
+
+def _sprite(image: Image.Image, origin: tuple[int, int]) -> Sprite:
+    pixels = np.asarray(image.convert("RGBA")).copy()
+    pixels.flags.writeable = False
+    return Sprite(pixels, origin)
+
+
+def sprite_from_image(image: Image.Image, origin: tuple[int, int] = (0, 0)) -> Sprite:
+    """
+    Wrap any image (e.g. an emoji or a shape drawn by hand) as a sprite for compose().
+
+    Args:
+        image: Image to use; transparency is kept
+        origin: Pixel of the image to place at the draw position (default: top-left)
+
+    Returns:
+        Sprite
+    """
+    return _sprite(image, origin)
+
+
+def _color(color):
+    # Colors are cache keys, so lists are turned into tuples
+    return None if color is None else tuple(color)
+
+
+def circle_sprite(
+    radius: int,
+    fill_color: Optional[tuple[int, int, int]] = None,
+    outline_color: Optional[tuple[int, int, int]] = None,
+    outline_width: int = 1,
+) -> Sprite:
+    """
+    Circle on a transparent background, drawn like draw_circle(). Cached.
+
+    The sprite's origin is the circle's center.
+    """
+    return _circle_sprite(
+        radius, _color(fill_color), _color(outline_color), outline_width
+    )
 
-    # Calculate star points
-    points = []
-    for i in range(10):
-        angle = (i * 36 - 90) * math.pi / 180  # 36 degrees per point, start at top
-        radius = size if i % 2 == 0 else size * 0.4  # Alternate between outer and inner
-        px = x + radius * math.cos(angle)
-        py = y + radius * math.sin(angle)
-        points.append((px, py))
 
-    # Draw star
-    draw.polygon(points, fill=fill_color, outline=outline_color, width=outline_width)
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _circle_sprite(radius, fill_color, outline_color, outline_width):
+    image = Image.new("RGBA", (2 * radius + 1, 2 * radius + 1), (0, 0, 0, 0))
+    draw_circle(
+        image, (radius, radius), radius, fill_color, outline_color, outline_width
+    )
+    return _sprite(image, (radius, radius))
+
+
+def star_sprite(
+    size: int,
+    fill_color: tuple[int, int, int],
+    outline_color: Optional[tuple[int, int, int]] = None,
+    outline_width: int = 1,
+) -> Sprite:
+    """
+    5-pointed star on a transparent background, drawn like draw_star(). Cached.
+
+    The sprite's origin is the star's center.
+    """
+    return _star_sprite(size, _color(fill_color), _color(outline_color), outline_width)
+
+
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _star_sprite(size, fill_color, outline_color, outline_width):
+    margin = size + outline_width
+    image = Image.new("RGBA", (2 * margin + 1, 2 * margin + 1), (0, 0, 0, 0))
+    draw_star(image, (margin, margin), size, fill_color, outline_color, outline_width)
+    return _sprite(image, (margin, margin))
+
+
+def text_sprite(
+    text: str, color: tuple[int, int, int] = (0, 0, 0), centered: bool = False
+) -> Sprite:
+    """
+    Text on a transparent background, drawn like draw_text(). Cached.
 
+    The sprite's origin is the text position: its top-left, or its center if
+    centered=True.
+    """
+    return _text_sprite(text, _color(color), centered)
+
+
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _text_sprite(text, color, centered):
+    font = _default_font()
+    left, top, right, bottom = ImageDraw.Draw(Image.new("L", (1, 1))).textbbox(
+        (0, 0), text, font=font
+    )
+    width, height = max(1, right - left), max(1, bottom - top)
+    mask = Image.new("L", (width, height), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=font)
+
+    # The glyph coverage becomes the alpha channel, so anti-aliased edges blend
+    # with whatever is underneath
+    pixels = np.empty((height, width, 4), dtype=np.uint8)
+    pixels[..., :3] = color
+    pixels[..., 3] = np.asarray(mask)
+    pixels.flags.writeable = False
+
+    if centered:
+        origin = ((right - left) // 2 - left, (bottom - top) // 2 - top)
+    else:
+        origin = (-left, -top)
+    return Sprite(pixels, origin)
+
+
+def composite(
+    base: np.ndarray, sprite: Sprite, position: tuple[int, int]
+) -> np.ndarray:
+    """
+    Alpha-blend a sprite onto an RGB frame array, in place.
+
+    Args:
+        base: (H, W, 3) uint8 frame array to draw on
+        sprite: Sprite to draw
+        position: (x, y) where the sprite's origin goes; parts outside the
+                  frame are clipped
+
+    Returns:
+        base
+    """
+    height, width = base.shape[:2]
+    sprite_height, sprite_width = sprite.pixels.shape[:2]
+    left = int(round(position[0])) - sprite.origin[0]
+    top = int(round(position[1])) - sprite.origin[1]
+
+    x0, y0 = max(left, 0), max(top, 0)
+    x1, y1 = min(left + sprite_width, width), min(top + sprite_height, height)
+    if x0 >= x1 or y0 >= y1:
+        return base
+
+    pixels = sprite.pixels[y0 - top : y1 - top, x0 - left : x1 - left]
+    region = base[y0:y1, x0:x1]
+    alpha = pixels[..., 3:].astype(np.uint16)
+    blended = pixels[..., :3] * alpha + region * (255 - alpha) + 127
+    region[:] = blended // 255
+    return base
+
+
+def compose(
+    background: np.ndarray | Image.Image,
+    layers: list[tuple[Sprite, tuple[int, int]]],
+) -> np.ndarray:
+    """
+    Build a frame from a background and sprites drawn on top of it in order.
+
+    The background is copied, so a cached background (e.g. from
+    gradient_array()) can be shared by every frame.
+
+    Args:
+        background: (H, W, 3) uint8 array or RGB image
+        layers: (sprite, (x, y)) pairs, bottom layer first
+
+    Returns:
+        (H, W, 3) uint8 frame array, ready for GIFBuilder.add_frame()
+    """
+    if isinstance(background, Image.Image):
+        frame = np.array(background.convert("RGB"))
+    else:
+        frame = background.copy()
+    for sprite, position in layers:
+        composite(frame, sprite, position)
     return frame
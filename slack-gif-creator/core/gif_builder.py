@@ -6,18 +6,499 @@ This module provides the main interface for creating GIFs from programmatically
 generated frames, with automatic optimization for Slack's requirements.
 """
 
+import io
+import multiprocessing
+import os
+import struct
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from multiprocessing.context import BaseContext
+from multiprocessing.reduction import ForkingPickler
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Optional
 
-import imageio.v3 as imageio
 import numpy as np
-from PIL import Image
+from PIL import GifImagePlugin, Image
+
+
+class FrameBuffer:
+    """
+    Contiguous (N, H, W, 3) uint8 storage for frames.
+
+    Frames live in one preallocated array instead of a list of separate arrays.
+    Indexing and iteration return views, and dropping or resizing frames
+    happens in place, so the frames never need to be held twice.
+
+    Each frame also has a hold: how many frame intervals (1/fps) it stays on
+    screen. Frames start with a hold of 1; merging dropped frames into the
+    frame before them adds up their holds so the timing is preserved.
+    """
+
+    GROWTH_FACTOR = 1.5
+
+    def __init__(self, width: int, height: int, capacity: int = 0):
+        """
+        Initialize frame buffer.
+
+        Args:
+            width: Frame width in pixels
+            height: Frame height in pixels
+            capacity: Number of frames to preallocate (grows automatically if exceeded)
+        """
+        self._data = np.empty((capacity, height, width, 3), dtype=np.uint8)
+        self._holds = np.ones(capacity, dtype=np.float64)
+        self._count = 0
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever frames are added, replaced, dropped or resized."""
+        return self._version
+
+    @property
+    def width(self) -> int:
+        return self._data.shape[2]
+
+    @property
+    def height(self) -> int:
+        return self._data.shape[1]
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def array(self) -> np.ndarray:
+        """View of the stored frames as one (N, H, W, 3) array."""
+        return self._data[: self._count]
+
+    @property
+    def holds(self) -> np.ndarray:
+        """View of each frame's hold, in frame intervals."""
+        return self._holds[: self._count]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+    def __setitem__(self, index, frame):
+        self.array[index] = frame
+        self._version += 1
+
+    def __iter__(self):
+        return iter(self.array)
+
+    def reserve(self, capacity: int):
+        """Make room for at least `capacity` frames."""
+        if capacity <= self.capacity:
+            return
+        data = np.empty((capacity, self.height, self.width, 3), dtype=np.uint8)
+        data[: self._count] = self.array
+        holds = np.ones(capacity, dtype=np.float64)
+        holds[: self._count] = self.holds
+        self._data = data
+        self._holds = holds
+
+    def append(self, frame: np.ndarray, hold: float = 1.0):
+        """Copy a (H, W, 3) frame into the buffer."""
+        if self._count == self.capacity:
+            self.reserve(max(8, int(self.capacity * self.GROWTH_FACTOR) + 1))
+        self._data[self._count] = frame
+        self._holds[self._count] = hold
+        self._count += 1
+        self._version += 1
+
+    def keep(self, indices: Iterable[int], holds: Optional[Iterable[float]] = None):
+        """
+        Keep only the frames at the given ascending indices, compacting in place.
+
+        Args:
+            indices: Ascending frame indices to keep
+            holds: New hold for each kept frame (default: keep their current holds)
+        """
+        count = 0
+        for index in indices:
+            if index != count:
+                self._data[count] = self._data[index]
+                self._holds[count] = self._holds[index]
+            count += 1
+        self._count = count
+        self._version += 1
+        if holds is not None:
+            self._holds[:count] = np.fromiter(holds, dtype=np.float64, count=count)
+
+    def resize(self, width: int, height: int):
+        """
+        Resize every frame with LANCZOS resampling.
+
+        When shrinking, resized frames are written back into the same memory:
+        frame i's new data ends before frame i+1's old data begins, so frames
+        can be processed in order without overwriting unread ones.
+        """
+        if (width, height) == (self.width, self.height):
+            return
+        if width * height <= self.width * self.height:
+            flat = self._data.reshape(-1)
+            target = flat[: self.capacity * height * width * 3].reshape(
+                self.capacity, height, width, 3
+            )
+        else:
+            target = np.empty((self.capacity, height, width, 3), dtype=np.uint8)
+        for i in range(self._count):
+            pil_frame = Image.fromarray(self._data[i])
+            target[i] = np.asarray(
+                pil_frame.resize((width, height), Image.Resampling.LANCZOS)
+            )
+        self._data = target
+        self._version += 1
+
+    def clear(self):
+        """Drop all frames and release their memory."""
+        self._data = np.empty((0, self.height, self.width, 3), dtype=np.uint8)
+        self._holds = np.ones(0, dtype=np.float64)
+        self._count = 0
+        self._version += 1
+
+
+def frame_signatures(frames: np.ndarray, grid: int = 16) -> np.ndarray:
+    """
+    Compute low-resolution signatures for a batch of frames in one pass.
+
+    Each frame is split into a grid x grid array of blocks, and the signature
+    is the mean color of each block. Rows and columns that don't fill a whole
+    block are left out. The mean absolute difference between two signatures
+    never exceeds the mean absolute difference over the pixels the blocks
+    cover, so a large signature difference proves two frames differ.
+
+    Args:
+        frames: (N, H, W, 3) uint8 frames
+        grid: Blocks per side
+
+    Returns:
+        (N, grid, grid, 3) float32 block means
+    """
+    n, height, width, channels = frames.shape
+    grid_y, grid_x = min(grid, height), min(grid, width)
+    block_h, block_w = height // grid_y, width // grid_x
+    # Crop to whole blocks; this is a view, and so is the reshape below
+    blocks = frames[:, : grid_y * block_h, : grid_x * block_w].reshape(
+        n, grid_y, block_h, grid_x, block_w, channels
+    )
+    # Reducing one axis at a time is much faster than a joint (2, 4) reduction
+    sums = blocks.sum(axis=2, dtype=np.uint32).sum(axis=3)
+    return sums.astype(np.float32) / (block_h * block_w)
+
+
+# Pixels sampled across all frames to build the global palette
+PALETTE_SAMPLE_PIXELS = 1 << 18
+# Bits per channel of the RGB -> palette lookup table (32 x 32 x 32 cells)
+LUT_BITS = 5
+
+# Settings tried by GIFBuilder.fit_to_size, best quality first
+SIZE_SEARCH_SCALES = (1.0, 0.75, 0.5, 0.375, 0.25)
+SIZE_SEARCH_FRAME_STEPS = (1, 2, 3, 4)
+SIZE_SEARCH_COLORS = (8, 12, 16, 24, 32, 48, 64, 96, 128, 192, 256)
+SIZE_SEARCH_MIN_DIMENSION = 32
+
+
+def palette_sample_step(pixel_count: int) -> int:
+    """Stride between the pixels sampled by build_global_palette."""
+    # An odd stride avoids sampling the same columns of every row
+    return max(1, pixel_count // PALETTE_SAMPLE_PIXELS) | 1
+
+
+def build_global_palette(
+    frames: np.ndarray, num_colors: int, sample: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Build one palette for all frames from a strided sample of their pixels.
+
+    Args:
+        frames: (N, H, W, 3) uint8 frames
+        num_colors: Maximum palette size (8-256)
+        sample: The (M, 3) pixel sample, if already taken (e.g. while the
+                frames were rendered); otherwise it is taken from frames
+
+    Returns:
+        (K, 3) uint8 palette, K <= num_colors
+    """
+    if sample is None:
+        pixels = frames.reshape(-1, 3)
+        sample = pixels[:: palette_sample_step(len(pixels))]
+
+    width = min(512, max(1, int(np.sqrt(len(sample)))))
+    height = -(-len(sample) // width)
+    padded = np.empty((height * width, 3), dtype=np.uint8)
+    padded[: len(sample)] = sample
+    # Pad with a sampled color so padding doesn't add a color of its own
+    padded[len(sample) :] = sample[0]
+
+    image = Image.fromarray(padded.reshape(height, width, 3), mode="RGB")
+    quantized = image.quantize(colors=num_colors, method=2)
+    used = int(np.asarray(quantized).max()) + 1
+    return np.array(quantized.getpalette()[: used * 3], dtype=np.uint8).reshape(-1, 3)
+
+
+def build_palette_lut(palette: np.ndarray) -> np.ndarray:
+    """
+    Precompute the nearest palette entry for every cell of a 32x32x32 RGB grid.
+
+    Returns:
+        (32768,) uint8 palette indices, addressed by (r >> 3) << 10 | (g >> 3) << 5 | (b >> 3)
+    """
+    levels = 1 << LUT_BITS
+    step = 256 // levels
+    centers = np.arange(levels, dtype=np.float32) * step + (step - 1) / 2
+    grid = np.stack(np.meshgrid(centers, centers, centers, indexing="ij"), axis=-1)
+    grid = grid.reshape(-1, 3)
+
+    palette = palette.astype(np.float32)
+    lut = np.empty(len(grid), dtype=np.uint8)
+    chunk = 4096
+    for start in range(0, len(grid), chunk):
+        cells = grid[start : start + chunk]
+        distances = ((cells[:, None, :] - palette[None, :, :]) ** 2).sum(axis=2)
+        lut[start : start + chunk] = distances.argmin(axis=1)
+    return lut
+
+
+def map_to_palette(frames: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """
+    Map RGB frames to palette indices through a lookup table from build_palette_lut.
+
+    Returns:
+        (N, H, W) uint8 palette indices
+    """
+    shift = 8 - LUT_BITS
+    indices = np.empty(frames.shape[:3], dtype=np.uint8)
+    # One frame at a time keeps the uint16 temporaries small
+    for i, frame in enumerate(frames):
+        codes = (frame[..., 0] >> shift).astype(np.uint16) << (2 * LUT_BITS)
+        codes |= (frame[..., 1] >> shift).astype(np.uint16) << LUT_BITS
+        codes |= frame[..., 2] >> shift
+        indices[i] = lut[codes]
+    return indices
+
+
+def dither_to_palette(frames: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """
+    Map RGB frames to palette indices with Floyd-Steinberg dithering.
+
+    Returns:
+        (N, H, W) uint8 palette indices
+    """
+    palette_image = Image.new("P", (1, 1))
+    palette_image.putpalette(palette.reshape(-1).tolist())
+    indices = np.empty(frames.shape[:3], dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        quantized = Image.fromarray(frame).quantize(
+            palette=palette_image, dither=Image.Dither.FLOYDSTEINBERG
+        )
+        indices[i] = np.asarray(quantized)
+    return indices
+
+
+def changed_regions(indices: np.ndarray) -> list[Optional[tuple[int, int, int, int]]]:
+    """
+    Find the rectangle of pixels that changed since the previous frame.
+
+    Args:
+        indices: (N, H, W) uint8 palette indices
+
+    Returns:
+        One (left, top, right, bottom) box per frame, or None if the frame is
+        identical to the previous one. The first frame's box covers the whole frame.
+    """
+    height, width = indices.shape[1:]
+    regions = [(0, 0, width, height)]
+    for previous, frame in zip(indices[:-1], indices[1:]):
+        changed = previous != frame
+        rows = np.flatnonzero(changed.any(axis=1))
+        if len(rows) == 0:
+            regions.append(None)
+            continue
+        columns = np.flatnonzero(changed[rows[0] : rows[-1] + 1].any(axis=0))
+        regions.append(
+            (int(columns[0]), int(rows[0]), int(columns[-1]) + 1, int(rows[-1]) + 1)
+        )
+    return regions
+
+
+def _encode_frame(sub, offset, duration, **params) -> bytes:
+    image = Image.fromarray(np.ascontiguousarray(sub), mode="P")
+    chunks = GifImagePlugin.getdata(
+        image, offset=offset, duration=duration, disposal=1, **params
+    )
+    return b"".join(chunks)
+
+
+def _write_delta_gif(fp, indices, palette, durations, loop):
+    # Every frame after the first is cropped to its changed rectangle and drawn
+    # over the previous one (disposal 1, "do not dispose"); pixels inside the
+    # rectangle that didn't change can use a reserved transparent palette index.
+    count = len(palette)
+    if count >= 256:
+        raise ValueError(
+            "Delta encoding needs a free palette index; use at most 255 colors"
+        )
+    transparent = count
+    # The color table holds a power of two entries, at least 2
+    table_bits = max(1, int(count).bit_length())
+    table = np.zeros((1 << table_bits, 3), dtype=np.uint8)
+    table[:count] = palette
+
+    height, width = indices.shape[1:]
+    regions = changed_regions(indices)
+    if not isinstance(durations, (list, tuple)):
+        durations = [durations] * len(indices)
+
+    # Identical frames are merged into the frame before them
+    frames = []
+    for i, region in enumerate(regions):
+        if region is None:
+            frames[-1][1] += durations[i]
+        else:
+            frames.append([i, durations[i], region])
+
+    fp.write(b"GIF89a")
+    fp.write(struct.pack("<HHBBB", width, height, 0xF0 | (table_bits - 1), 0, 0))
+    fp.write(table.tobytes())
+    fp.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00")
+
+    for i, duration, (left, top, right, bottom) in frames:
+        sub = indices[i, top:bottom, left:right]
+        # GifImagePlugin.getdata writes the graphic control extension, the
+        # image descriptor and the LZW-compressed pixels for one frame
+        encoded = _encode_frame(sub, (left, top), duration)
+        if i > 0:
+            unchanged = sub == indices[i - 1, top:bottom, left:right]
+            masked = np.where(unchanged, np.uint8(transparent), sub)
+            # Transparency usually compresses better, but not always (e.g. on
+            # flat backgrounds), so keep whichever encoding is smaller
+            encoded = min(
+                encoded,
+                _encode_frame(masked, (left, top), duration, transparency=transparent),
+                key=len,
+            )
+        fp.write(encoded)
+    fp.write(b";")
+
+
+def write_indexed_gif(
+    fp,
+    indices: np.ndarray,
+    palette: np.ndarray,
+    durations: float | list[float],
+    loop: int = 0,
+    delta: bool = False,
+):
+    """
+    Write palette-indexed frames as a looping GIF, without converting back to RGB.
+
+    Args:
+        fp: Output path or binary file object
+        indices: (N, H, W) uint8 palette indices
+        palette: (K, 3) uint8 palette shared by all frames
+        durations: Frame duration in milliseconds, or one per frame
+        loop: Number of loops (0 = forever)
+        delta: Write each frame as only the rectangle that changed since the
+               previous frame, with unchanged pixels transparent. Needs a free
+               palette index (K <= 255). Identical frames are merged.
+    """
+    if delta:
+        if isinstance(fp, (str, Path)):
+            with open(fp, "wb") as f:
+                _write_delta_gif(f, indices, palette, durations, loop)
+        else:
+            _write_delta_gif(fp, indices, palette, durations, loop)
+        return
+
+    flat_palette = palette.reshape(-1).tolist()
+    images = []
+    for frame_indices in indices:
+        image = Image.fromarray(frame_indices, mode="P")
+        image.putpalette(flat_palette)
+        images.append(image)
+    images[0].save(
+        fp,
+        format="GIF",
+        save_all=True,
+        append_images=images[1:],
+        duration=durations,
+        loop=loop,
+        optimize=False,
+        # Frames whose palette matches the global one get no local color table
+        palette=palette.tobytes(),
+    )
+
+
+def _as_frame(frame: np.ndarray | Image.Image, width: int, height: int) -> np.ndarray:
+    # Convert to an RGB array of the builder's size
+    if isinstance(frame, Image.Image):
+        frame = np.array(frame.convert("RGB"))
+
+    # Ensure frame is correct size
+    if frame.shape[:2] != (height, width):
+        pil_frame = Image.fromarray(frame)
+        pil_frame = pil_frame.resize((width, height), Image.Resampling.LANCZOS)
+        frame = np.array(pil_frame)
+
+    return frame
+
+
+# Per-worker state for GIFBuilder.render_frames, set up once by _init_render_worker
+_render = None
+_render_memory = None
+_render_slots = None
+
+
+def _init_render_worker(render, memory_name, slots_shape):
+    global _render, _render_memory, _render_slots
+    _render = render
+    _render_memory = shared_memory.SharedMemory(name=memory_name)
+    _render_slots = np.ndarray(slots_shape, dtype=np.uint8, buffer=_render_memory.buf)
+
+
+def _render_into_slot(frame_index: int, slot: int) -> tuple[int, int]:
+    height, width = _render_slots.shape[1:3]
+    _render_slots[slot] = _as_frame(_render(frame_index), width, height)
+    return frame_index, slot
+
+
+def _start_method(mp_context: Optional[BaseContext]) -> str:
+    if mp_context is not None:
+        return mp_context.get_start_method()
+    # Without fixing the default start method, which get_context() would do
+    return (
+        multiprocessing.get_start_method(allow_none=True)
+        or multiprocessing.get_all_start_methods()[0]
+    )
+
+
+def _can_send_to_workers(render, start_method: str) -> bool:
+    """Whether render reaches worker processes started this way intact."""
+    # Forked workers inherit render; other start methods pickle it
+    if start_method == "fork":
+        return True
+    try:
+        ForkingPickler.dumps(render)
+    except Exception:  # PicklingError, or AttributeError for local objects
+        return False
+    return True
 
 
 class GIFBuilder:
     """Builder for creating optimized GIFs from frames."""
 
-    def __init__(self, width: int = 480, height: int = 480, fps: int = 15):
+    def __init__(
+        self,
+        width: int = 480,
+        height: int = 480,
+        fps: int = 15,
+        max_frames: Optional[int] = None,
+    ):
         """
         Initialize GIF builder.
 
@@ -25,11 +506,15 @@ class GIFBuilder:
             width: Frame width in pixels
             height: Frame height in pixels
             fps: Frames per second
+            max_frames: Expected number of frames; preallocates the frame buffer
+                so it never has to grow
         """
         self.width = width
         self.height = height
         self.fps = fps
-        self.frames: list[np.ndarray] = []
+        self.frames = FrameBuffer(width, height, capacity=max_frames or 0)
+        # (frames.version, pixel sample) taken by render_frames
+        self._palette_sample = None
 
     def add_frame(self, frame: np.ndarray | Image.Image):
         """
@@ -38,93 +523,199 @@ class GIFBuilder:
         Args:
             frame: Frame as numpy array or PIL Image (will be converted to RGB)
         """
-        if isinstance(frame, Image.Image):
-            frame = np.array(frame.convert("RGB"))
-
-        # Ensure frame is correct size
-        if frame.shape[:2] != (self.height, self.width):
-            pil_frame = Image.fromarray(frame)
-            pil_frame = pil_frame.resize(
-                (self.width, self.height), Image.Resampling.LANCZOS
-            )
-            frame = np.array(pil_frame)
-
-        self.frames.append(frame)
+        self.frames.append(_as_frame(frame, self.width, self.height))
 
     def add_frames(self, frames: list[np.ndarray | Image.Image]):
         """Add multiple frames at once."""
         for frame in frames:
             self.add_frame(frame)
 
+    def render_frames(
+        self,
+        render: Callable[[int], np.ndarray | Image.Image],
+        num_frames: int,
+        workers: Optional[int] = None,
+        mp_context: Optional[BaseContext] = None,
+    ):
+        """
+        Render frames in parallel and add them in order.
+
+        render(i) is called for i in range(num_frames) in a pool of worker
+        processes, so it must not depend on state changed by earlier calls.
+        Workers write frames into a ring of shared-memory slots, and the frames
+        are added here in order as they complete. The palette sample used by
+        save() is taken from each frame as it arrives, overlapping with the
+        rendering of the next ones.
+
+        Under the "spawn" and "forkserver" start methods (the defaults on
+        macOS and Windows, and on Linux from Python 3.14) render is pickled
+        to the workers, so it must be a module-level function, and the
+        calling script needs an `if __name__ == "__main__":` guard. A render
+        that can't be pickled (a lambda or closure) is run in this process
+        instead, with a note.
+
+        Args:
+            render: Function returning frame i as a numpy array or PIL Image
+                    (converted and resized like add_frame)
+            num_frames: Number of frames to render
+            workers: Number of worker processes (default: CPU count; 1 renders
+                     in this process)
+            mp_context: multiprocessing context for the workers (default: the
+                        current default start method)
+        """
+        existing = len(self.frames)
+        self.frames.reserve(existing + num_frames)
+        frame_pixels = self.width * self.height
+        step = palette_sample_step((existing + num_frames) * frame_pixels)
+        sample = [self.frames.array.reshape(-1, 3)[::step]]
+
+        def add(frame):
+            # Pixels of this frame that the strided sample over all frames hits
+            offset = -len(self.frames) * frame_pixels % step
+            sample.append(frame.reshape(-1, 3)[offset::step].copy())
+            self.frames.append(frame)
+
+        workers = workers or os.cpu_count() or 1
+        start_method = _start_method(mp_context)
+        if (
+            workers > 1
+            and num_frames > 1
+            and not _can_send_to_workers(render, start_method)
+        ):
+            print(
+                f"  render can't be pickled for '{start_method}' worker processes; "
+                "rendering in this process instead "
+                "(define it at module level to render in parallel)"
+            )
+            workers = 1
+
+        if workers == 1 or num_frames < 2:
+            for frame_index in range(num_frames):
+                add(_as_frame(render(frame_index), self.width, self.height))
+        else:
+            self._render_in_pool(render, num_frames, workers, mp_context, add)
+
+        self._palette_sample = (self.frames.version, np.concatenate(sample))
+
+    def _render_in_pool(self, render, num_frames, workers, mp_context, add):
+        slots_shape = (workers * 4, self.height, self.width, 3)
+        memory = shared_memory.SharedMemory(create=True, size=int(np.prod(slots_shape)))
+        slots = np.ndarray(slots_shape, dtype=np.uint8, buffer=memory.buf)
+        try:
+            free_slots = list(range(len(slots)))
+            rendered = {}  # frame index -> slot, for frames that finished early
+            pending = set()
+            next_to_render = 0
+            next_to_add = 0
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp_context,
+                initializer=_init_render_worker,
+                initargs=(render, memory.name, slots_shape),
+            ) as executor:
+                while next_to_add < num_frames:
+                    # Slots are freed in frame order, so the next frame to add
+                    # always holds one and this can't stall
+                    while free_slots and next_to_render < num_frames:
+                        pending.add(
+                            executor.submit(
+                                _render_into_slot, next_to_render, free_slots.pop()
+                            )
+                        )
+                        next_to_render += 1
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        frame_index, slot = future.result()
+                        rendered[frame_index] = slot
+                    while next_to_add in rendered:
+                        slot = rendered.pop(next_to_add)
+                        add(slots[slot])
+                        free_slots.append(slot)
+                        next_to_add += 1
+        finally:
+            # The array view must go before the shared memory can be closed
+            del slots
+            memory.close()
+            memory.unlink()
+
+    def _rendered_palette_sample(self) -> Optional[np.ndarray]:
+        # The sample taken by render_frames, if the frames haven't changed since
+        if self._palette_sample and self._palette_sample[0] == self.frames.version:
+            return self._palette_sample[1]
+        return None
+
+    def quantize(
+        self, num_colors: int = 128, dither: bool = False
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Map all frames onto one global palette.
+
+        Args:
+            num_colors: Target number of colors (8-256)
+            dither: Use Floyd-Steinberg dithering (smoother gradients, slower,
+                    larger files) instead of the nearest-color lookup table
+
+        Returns:
+            (palette, indices): (K, 3) uint8 palette and (N, H, W) uint8 palette indices
+        """
+        frames = self.frames.array
+        palette = build_global_palette(
+            frames, num_colors, sample=self._rendered_palette_sample()
+        )
+        if dither:
+            indices = dither_to_palette(frames, palette)
+        else:
+            indices = map_to_palette(frames, build_palette_lut(palette))
+        return palette, indices
+
     def optimize_colors(
-        self, num_colors: int = 128, use_global_palette: bool = True
-    ) -> list[np.ndarray]:
+        self,
+        num_colors: int = 128,
+        use_global_palette: bool = True,
+        in_place: bool = False,
+        dither: bool = True,
+    ) -> list[np.ndarray] | np.ndarray:
         """
         Reduce colors in all frames using quantization.
 
+        save() writes palette indices from quantize() directly; this returns
+        the quantized frames as RGB, e.g. for previewing.
+
         Args:
             num_colors: Target number of colors (8-256)
             use_global_palette: Use a single palette for all frames (better compression)
+            in_place: Overwrite the stored frames instead of returning copies
+            dither: Use Floyd-Steinberg dithering
 
         Returns:
-            List of color-optimized frames
+            List of color-optimized frames, or the (N, H, W, 3) frame array if in_place
         """
-        optimized = []
+        optimized = self.frames if in_place else [None] * len(self.frames)
 
         if use_global_palette and len(self.frames) > 1:
-            # Create a global palette from all frames
-            # Sample frames to build palette
-            sample_size = min(5, len(self.frames))
-            sample_indices = [
-                int(i * len(self.frames) / sample_size) for i in range(sample_size)
-            ]
-            sample_frames = [self.frames[i] for i in sample_indices]
-
-            # Combine sample frames into a single image for palette generation
-            # Flatten each frame to get all pixels, then stack them
-            all_pixels = np.vstack(
-                [f.reshape(-1, 3) for f in sample_frames]
-            )  # (total_pixels, 3)
-
-            # Create a properly-shaped RGB image from the pixel data
-            # We'll make a roughly square image from all the pixels
-            total_pixels = len(all_pixels)
-            width = min(512, int(np.sqrt(total_pixels)))  # Reasonable width, max 512
-            height = (total_pixels + width - 1) // width  # Ceiling division
-
-            # Pad if necessary to fill the rectangle
-            pixels_needed = width * height
-            if pixels_needed > total_pixels:
-                padding = np.zeros((pixels_needed - total_pixels, 3), dtype=np.uint8)
-                all_pixels = np.vstack([all_pixels, padding])
-
-            # Reshape to proper RGB image format (H, W, 3)
-            img_array = (
-                all_pixels[:pixels_needed].reshape(height, width, 3).astype(np.uint8)
-            )
-            combined_img = Image.fromarray(img_array, mode="RGB")
-
-            # Generate global palette
-            global_palette = combined_img.quantize(colors=num_colors, method=2)
-
-            # Apply global palette to all frames
-            for frame in self.frames:
-                pil_frame = Image.fromarray(frame)
-                quantized = pil_frame.quantize(palette=global_palette, dither=1)
-                optimized.append(np.array(quantized.convert("RGB")))
+            palette, indices = self.quantize(num_colors, dither=dither)
+            for i, frame_indices in enumerate(indices):
+                optimized[i] = palette[frame_indices]
         else:
             # Use per-frame quantization
-            for frame in self.frames:
+            for i, frame in enumerate(self.frames):
                 pil_frame = Image.fromarray(frame)
-                quantized = pil_frame.quantize(colors=num_colors, method=2, dither=1)
-                optimized.append(np.array(quantized.convert("RGB")))
+                quantized = pil_frame.quantize(
+                    colors=num_colors, method=2, dither=1 if dither else 0
+                )
+                optimized[i] = np.asarray(quantized.convert("RGB"))
 
-        return optimized
+        return self.frames.array if in_place else optimized
 
     def deduplicate_frames(self, threshold: float = 0.9995) -> int:
         """
         Remove duplicate or near-duplicate consecutive frames.
 
+        Each frame is compared with the last frame that was kept. A dropped
+        frame's display time is added to the kept frame, so the animation
+        keeps its timing.
+
         Args:
             threshold: Similarity threshold (0.0-1.0). Higher = more strict (0.9995 = nearly identical).
                       Use 0.9995+ to preserve subtle animations, 0.98 for aggressive removal.
@@ -135,27 +726,176 @@ class GIFBuilder:
         if len(self.frames) < 2:
             return 0
 
-        deduplicated = [self.frames[0]]
-        removed_count = 0
+        frames = self.frames.array
+        # Similarity = 1 - mean(|diff|) / 255, so frames are duplicates when the
+        # mean absolute difference is at most this tolerance
+        tolerance = (1.0 - threshold) * 255.0
+        max_total_diff = tolerance * frames[0].size
+
+        signatures = frame_signatures(frames)
+        # The signatures only cover whole blocks, which can leave out a few
+        # rows and columns. A difference confined to the covered pixels is
+        # spread over fewer pixels there, so scale the tolerance to keep the
+        # shortlist a lower bound (with a little slack for float32 rounding).
+        height, width = frames.shape[1:3]
+        grid_y, grid_x = signatures.shape[1:3]
+        covered = (height // grid_y * grid_y) * (width // grid_x * grid_x)
+        shortlist_tolerance = tolerance * (height * width / covered) * (1 + 1e-5)
+
+        kept = [0]
+        holds = [float(self.frames.holds[0])]
+
+        for i in range(1, len(frames)):
+            last = kept[-1]
+            # Cheap shortlist: the signature difference is a lower bound on the
+            # full-resolution difference
+            is_duplicate = (
+                np.mean(np.abs(signatures[i] - signatures[last])) <= shortlist_tolerance
+            )
+            if is_duplicate:
+                # Confirm with an exact integer difference (no float copies)
+                a, b = frames[last], frames[i]
+                total_diff = (np.maximum(a, b) - np.minimum(a, b)).sum(dtype=np.uint64)
+                is_duplicate = total_diff <= max_total_diff
+
+            if is_duplicate:
+                holds[-1] += self.frames.holds[i]
+            else:
+                kept.append(i)
+                holds.append(float(self.frames.holds[i]))
+
+        self.frames.keep(kept, holds)
+        return len(frames) - len(kept)
+
+    def _frame_durations(self, holds: np.ndarray) -> float | list[float]:
+        # Frame durations in milliseconds; frames merged by deduplication or
+        # decimation are shown for longer
+        frame_duration = 1000 / self.fps
+        if np.all(holds == holds[0]):
+            return frame_duration * float(holds[0])
+        return [frame_duration * float(hold) for hold in holds]
+
+    def fit_to_size(
+        self,
+        target_bytes: int,
+        max_colors: int = 256,
+        dither: bool = False,
+        delta: bool = False,
+    ) -> tuple[bytes, dict, list[dict]]:
+        """
+        Find the highest-quality encoding of the frames that fits in target_bytes.
+
+        Candidates are tried from best to worst quality: full scale before
+        smaller scales, then all frames before keeping every 2nd, 3rd or 4th
+        frame. For each, the number of colors is binary-searched (file size
+        grows with the palette), and dithering is kept if it still fits.
+        Candidates are encoded in memory, and each palette and quantization is
+        computed once and shared by all frame decimations.
+
+        Args:
+            target_bytes: Maximum file size in bytes
+            max_colors: Largest palette to consider (8-256)
+            dither: Also try Floyd-Steinberg dithering on the best fit
+            delta: Encode with delta frames (see write_indexed_gif)
+
+        Returns:
+            (data, best, table): the encoded GIF, the settings it was encoded
+            with, and one row per candidate tried. If nothing fits, the
+            smallest candidate is returned and best["fits"] is False.
+        """
+        if delta:
+            # One palette index is reserved for transparency
+            max_colors = min(max_colors, 255)
+        colors = [c for c in SIZE_SEARCH_COLORS if c < max_colors] + [max_colors]
+        frame_count = len(self.frames)
+        frame_steps = [
+            step for step in SIZE_SEARCH_FRAME_STEPS if step == 1 or step < frame_count
+        ]
+
+        table = []
+        smallest = None
+        # Palettes and quantized frames for the current scale, shared by every
+        # frame step
+        palettes = {}
+        quantized = {}
 
-        for i in range(1, len(self.frames)):
-            # Compare with previous frame
-            prev_frame = np.array(deduplicated[-1], dtype=np.float32)
-            curr_frame = np.array(self.frames[i], dtype=np.float32)
+        def encode(frames, scale, step, num_colors, use_dither):
+            if num_colors not in palettes:
+                sample = self._rendered_palette_sample() if scale == 1.0 else None
+                palettes[num_colors] = build_global_palette(
+                    frames, num_colors, sample=sample
+                )
+            palette = palettes[num_colors]
+            quantize_key = (num_colors, use_dither)
+            if quantize_key not in quantized:
+                if use_dither:
+                    quantized[quantize_key] = dither_to_palette(frames, palette)
+                else:
+                    quantized[quantize_key] = map_to_palette(
+                        frames, build_palette_lut(palette)
+                    )
+            indices = quantized[quantize_key][::step]
+            holds = np.add.reduceat(self.frames.holds, np.arange(0, frame_count, step))
 
-            # Calculate similarity (normalized)
-            diff = np.abs(prev_frame - curr_frame)
-            similarity = 1.0 - (np.mean(diff) / 255.0)
+            buffer = io.BytesIO()
+            write_indexed_gif(
+                buffer, indices, palette, self._frame_durations(holds), delta=delta
+            )
+            row = {
+                "scale": scale,
+                "width": frames.shape[2],
+                "height": frames.shape[1],
+                "frame_step": step,
+                "frames": len(indices),
+                "colors": num_colors,
+                "dither": use_dither,
+                "bytes": buffer.tell(),
+                "fits": buffer.tell() <= target_bytes,
+            }
+            table.append(row)
+            nonlocal smallest
+            if smallest is None or row["bytes"] < smallest[1]["bytes"]:
+                smallest = (buffer.getvalue(), row)
+            return buffer.getvalue(), row
 
-            # Keep frame if sufficiently different
-            # High threshold (0.9995+) means only remove nearly identical frames
-            if similarity < threshold:
-                deduplicated.append(self.frames[i])
+        for scale in SIZE_SEARCH_SCALES:
+            width = round(self.width * scale)
+            height = round(self.height * scale)
+            if min(width, height) < SIZE_SEARCH_MIN_DIMENSION and scale != 1.0:
+                break
+            if scale == 1.0:
+                frames = self.frames.array
             else:
-                removed_count += 1
+                frames = np.empty((frame_count, height, width, 3), dtype=np.uint8)
+                for i, frame in enumerate(self.frames):
+                    frames[i] = np.asarray(
+                        Image.fromarray(frame).resize(
+                            (width, height), Image.Resampling.LANCZOS
+                        )
+                    )
+            palettes.clear()
+            quantized.clear()
+
+            for step in frame_steps:
+                best = encode(frames, scale, step, colors[0], False)
+                if not best[1]["fits"]:
+                    continue
+                low, high = 0, len(colors) - 1
+                while low < high:
+                    middle = (low + high + 1) // 2
+                    candidate = encode(frames, scale, step, colors[middle], False)
+                    if candidate[1]["fits"]:
+                        low = middle
+                        best = candidate
+                    else:
+                        high = middle - 1
+                if dither:
+                    candidate = encode(frames, scale, step, colors[low], True)
+                    if candidate[1]["fits"]:
+                        best = candidate
+                return best[0], best[1], table
 
-        self.frames = deduplicated
-        return removed_count
+        return smallest[0], smallest[1], table
 
     def save(
         self,
@@ -163,6 +903,9 @@ class GIFBuilder:
         num_colors: int = 128,
         optimize_for_emoji: bool = False,
         remove_duplicates: bool = False,
+        dither: bool = False,
+        delta: bool = False,
+        target_bytes: Optional[int] = None,
     ) -> dict:
         """
         Save frames as optimized GIF for Slack.
@@ -172,6 +915,14 @@ class GIFBuilder:
             num_colors: Number of colors to use (fewer = smaller file)
             optimize_for_emoji: If True, optimize for emoji size (128x128, fewer colors)
             remove_duplicates: If True, remove duplicate consecutive frames (opt-in)
+            dither: If True, dither colors (smoother gradients, larger file)
+            delta: If True, write each frame as only the region that changed
+                   since the previous frame (much smaller for animations on a
+                   static background; at most 255 colors)
+            target_bytes: If set, search for the best quality that fits in this
+                   many bytes (see fit_to_size). num_colors is the largest
+                   palette tried, and the emoji color and frame limits are
+                   left to the search.
 
         Returns:
             Dictionary with file info (path, size, dimensions, frame_count)
@@ -197,39 +948,68 @@ class GIFBuilder:
                 )
                 self.width = 128
                 self.height = 128
-                # Resize all frames
-                resized_frames = []
-                for frame in self.frames:
-                    pil_frame = Image.fromarray(frame)
-                    pil_frame = pil_frame.resize((128, 128), Image.Resampling.LANCZOS)
-                    resized_frames.append(np.array(pil_frame))
-                self.frames = resized_frames
-            num_colors = min(num_colors, 48)  # More aggressive color limit for emoji
-
-            # More aggressive FPS reduction for emoji
-            if len(self.frames) > 12:
-                print(
-                    f"  Reducing frames from {len(self.frames)} to ~12 for emoji size"
-                )
-                # Keep every nth frame to get close to 12 frames
-                keep_every = max(1, len(self.frames) // 12)
-                self.frames = [
-                    self.frames[i] for i in range(0, len(self.frames), keep_every)
-                ]
+                # Resize all frames (in place)
+                self.frames.resize(128, 128)
 
-        # Optimize colors with global palette
-        optimized_frames = self.optimize_colors(num_colors, use_global_palette=True)
+            if target_bytes is None:
+                # More aggressive color limit for emoji
+                num_colors = min(num_colors, 48)
 
-        # Calculate frame duration in milliseconds
-        frame_duration = 1000 / self.fps
+                # More aggressive FPS reduction for emoji
+                if len(self.frames) > 12:
+                    print(
+                        f"  Reducing frames from {len(self.frames)} to ~12 for emoji size"
+                    )
+                    # Keep every nth frame to get close to 12 frames
+                    keep_every = max(1, len(self.frames) // 12)
+                    self.frames.keep(range(0, len(self.frames), keep_every))
 
-        # Save GIF
-        imageio.imwrite(
-            output_path,
-            optimized_frames,
-            duration=frame_duration,
-            loop=0,  # Infinite loop
-        )
+        total_seconds = float(self.frames.holds.sum()) / self.fps
+
+        if target_bytes is not None:
+            data, best, table = self.fit_to_size(
+                target_bytes, max_colors=num_colors, dither=dither, delta=delta
+            )
+            output_path.write_bytes(data)
+            width, height = best["width"], best["height"]
+            frame_count = best["frames"]
+            num_colors = best["colors"]
+        else:
+            if delta:
+                # One palette index is reserved for transparency
+                num_colors = min(num_colors, 255)
+
+            # Map frames onto a global palette; the indices go straight to the encoder
+            palette, optimized_frames = self.quantize(num_colors, dither=dither)
+            durations = self._frame_durations(self.frames.holds)
+            width, height = self.width, self.height
+            frame_count = len(optimized_frames)
+
+            # Save GIF
+            if delta:
+                # Encode both ways in memory: the fixed cost of the larger color
+                # table can outweigh the savings on very small GIFs
+                opaque = io.BytesIO()
+                write_indexed_gif(opaque, optimized_frames, palette, durations, loop=0)
+                transparent = io.BytesIO()
+                write_indexed_gif(
+                    transparent,
+                    optimized_frames,
+                    palette,
+                    durations,
+                    loop=0,
+                    delta=True,
+                )
+                best = min(opaque, transparent, key=lambda buffer: buffer.tell())
+                output_path.write_bytes(best.getvalue())
+            else:
+                write_indexed_gif(
+                    output_path,
+                    optimized_frames,
+                    palette,
+                    durations,
+                    loop=0,  # Infinite loop
+                )
 
         # Get file info
         file_size_kb = output_path.stat().st_size / 1024
@@ -239,21 +1019,50 @@ class GIFBuilder:
             "path": str(output_path),
             "size_kb": file_size_kb,
             "size_mb": file_size_mb,
-            "dimensions": f"{self.width}x{self.height}",
-            "frame_count": len(optimized_frames),
+            "dimensions": f"{width}x{height}",
+            "frame_count": frame_count,
             "fps": self.fps,
-            "duration_seconds": len(optimized_frames) / self.fps,
+            "duration_seconds": total_seconds,
             "colors": num_colors,
         }
 
+        if target_bytes is not None:
+            info["target_bytes"] = target_bytes
+            info["fits_target"] = best["fits"]
+            info["dither"] = best["dither"]
+            info["search"] = table
+        elif delta:
+            opaque_size_kb = opaque.tell() / 1024
+            info["opaque_size_kb"] = opaque_size_kb
+            info["delta_savings_kb"] = opaque_size_kb - file_size_kb
+
         # Print info
         print(f"\n✓ GIF created successfully!")
         print(f"  Path: {output_path}")
         print(f"  Size: {file_size_kb:.1f} KB ({file_size_mb:.2f} MB)")
-        print(f"  Dimensions: {self.width}x{self.height}")
-        print(f"  Frames: {len(optimized_frames)} @ {self.fps} fps")
+        print(f"  Dimensions: {width}x{height}")
+        print(f"  Frames: {frame_count} @ {self.fps} fps")
         print(f"  Duration: {info['duration_seconds']:.1f}s")
         print(f"  Colors: {num_colors}")
+        if target_bytes is not None:
+            verdict = "fits" if best["fits"] else "DOES NOT FIT"
+            print(
+                f"  Target: {target_bytes / 1024:.1f} KB ({verdict}, "
+                f"{len(table)} candidates tried)"
+            )
+            for row in table:
+                print(
+                    f"    {row['width']}x{row['height']}, every {row['frame_step']} "
+                    f"frame(s), {row['colors']} colors"
+                    f"{', dithered' if row['dither'] else ''}: "
+                    f"{row['bytes'] / 1024:.1f} KB{'' if row['fits'] else ' (too big)'}"
+                )
+        elif delta:
+            saved_percent = 100 * info["delta_savings_kb"] / opaque_size_kb
+            print(
+                f"  Delta frames: saved {info['delta_savings_kb']:.1f} KB "
+                f"({saved_percent:.0f}%) vs opaque frames ({opaque_size_kb:.1f} KB)"
+            )
 
         # Size info
         if optimize_for_emoji:
@@ -266,4 +1075,5 @@ class GIFBuilder:
 
     def clear(self):
         """Clear all frames (useful for creating multiple GIFs)."""
-        self.frames = []
+        self.frames = FrameBuffer(self.width, self.height)
+        self._palette_sample = None
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from gif_builder import GIFBuilder, write_indexed_gif
+from validators import read_gif_info
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestDeduplicateFrames(unittest.TestCase):
+    def frame_with_changes(self, base, changed_pixels):
+        """Copy of base with the first changed_pixels pixels (row-major) brightened by 1"""
+        frame = base.copy()
+        frame.reshape(-1, 3)[:changed_pixels] += 1
+        return frame
+
+    def builder_with(self, frames):
+        height, width = frames[0].shape[:2]
+        builder = GIFBuilder(width=width, height=height, fps=10)
+        builder.add_frames(frames)
+        return builder
+
+    def test_size_not_divisible_by_grid(self):
+        """Changes only in the covered rows must still be compared against the full frame size"""
+        base = np.full((100, 100, 3), 100, dtype=np.uint8)
+        # Mean difference 1267 * 3 / 30000 = 0.1267, within (1 - 0.9995) * 255 = 0.1275
+        near = self.frame_with_changes(base, 1267)
+        # Mean difference 0.13, beyond the tolerance
+        far = self.frame_with_changes(base, 1300)
+
+        builder = self.builder_with([base, near])
+        self.assertEqual(builder.deduplicate_frames(threshold=0.9995), 1)
+        self.assertEqual(len(builder.frames), 1)
+
+        builder = self.builder_with([base, far])
+        self.assertEqual(builder.deduplicate_frames(threshold=0.9995), 0)
+        self.assertEqual(len(builder.frames), 2)
+
+    def test_dropped_frames_extend_the_kept_frame(self):
+        base = np.zeros((48, 64, 3), dtype=np.uint8)
+        other = np.full((48, 64, 3), 200, dtype=np.uint8)
+        builder = self.builder_with([base, base, base, other, other])
+
+        self.assertEqual(builder.deduplicate_frames(), 3)
+        self.assertEqual(list(builder.frames.holds), [3, 2])
+
+
+class TestWriteIndexedGif(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        rng = np.random.default_rng(0)
+        self.palette = rng.integers(0, 256, (100, 3), dtype=np.uint8)
+        columns = np.arange(64)[None, :]
+        self.indices = np.stack(
+            [np.broadcast_to((columns + i) % 100, (48, 64)) for i in range(10)]
+        ).astype(np.uint8)
+
+    def test_frames_use_the_global_palette(self):
+        """Only the global color table is written, not one per frame"""
+        for delta in (False, True):
+            path = os.path.join(self.tmp.name, f"delta_{delta}.gif")
+            write_indexed_gif(path, self.indices, self.palette, 100, delta=delta)
+
+            info = read_gif_info(path)
+            self.assertEqual(info["frame_count"], 10)
+            self.assertGreaterEqual(info["global_palette_size"], 100)
+            self.assertEqual(info["local_palette_sizes"], [0] * 10)
+
+            with Image.open(path) as image:
+                for i, expected in enumerate(self.indices):
+                    image.seek(i)
+                    decoded = np.array(image.convert("RGB"))
+                    np.testing.assert_array_equal(decoded, self.palette[expected])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,10 +3,115 @@
 Validators - Check if GIFs meet Slack's requirements.
 
 These validators help ensure your GIFs meet Slack's size and dimension constraints.
+
+GIFs are inspected by walking their block structure (read_gif_info) without
+decoding any image data, so checking many files is fast. Run this module with
+files or directories to check them in bulk:
+
+    python -m core.validators emoji/ more.gif [--message] [--json]
 """
 
+import argparse
+import json
+import struct
+import sys
 from pathlib import Path
 
+# Display time of frames with no delay, as browsers show them
+DEFAULT_FRAME_DELAY_MS = 100
+
+
+def _color_table_size(packed: int) -> int:
+    # Entries in the color table announced by a packed flags byte (0 if none)
+    return 2 << (packed & 0x07) if packed & 0x80 else 0
+
+
+def _skip_sub_blocks(data: bytes, pos: int) -> int:
+    # Data sub-blocks are length-prefixed and end with a zero-length block
+    length = data[pos]
+    while length:
+        pos += length + 1
+        length = data[pos]
+    return pos + 1
+
+
+def read_gif_info(gif_path: str | Path) -> dict:
+    """
+    Read a GIF's frame structure from its blocks, without decoding any pixels.
+
+    Walks the header, logical screen descriptor, extensions and image
+    descriptors, and skips over the compressed image data. A missing trailer
+    is accepted: the stream ends at the end of the file, or at the first
+    unknown byte once a frame has been read (e.g. zero padding).
+
+    Args:
+        gif_path: Path to GIF file
+
+    Returns:
+        Dictionary with width, height, frame_count, frame_delays_ms (one per
+        frame, from its graphic control extension; 0 if it has none),
+        duration_seconds (frames with a delay of 0 count as
+        DEFAULT_FRAME_DELAY_MS), global_palette_size, local_palette_sizes
+        (one per frame, 0 for frames using the global palette) and loop (None
+        if the GIF has no looping extension, 0 = forever)
+
+    Raises:
+        ValueError: If the file is not a GIF or is truncated
+    """
+    data = Path(gif_path).read_bytes()
+    if data[:6] not in (b"GIF87a", b"GIF89a"):
+        raise ValueError("Not a GIF file")
+
+    try:
+        width, height, packed = struct.unpack_from("<HHB", data, 6)
+        global_palette_size = _color_table_size(packed)
+        pos = 13 + 3 * global_palette_size
+
+        delays = []
+        local_palette_sizes = []
+        loop = None
+        delay = 0
+        # Some encoders leave out the trailer, so the end of the file also ends it
+        while pos < len(data):
+            block = data[pos]
+            if block == 0x2C:  # Image descriptor
+                packed = data[pos + 9]
+                local_palette_size = _color_table_size(packed)
+                # Descriptor, local color table, LZW minimum code size byte
+                pos = _skip_sub_blocks(data, pos + 11 + 3 * local_palette_size)
+                delays.append(delay)
+                local_palette_sizes.append(local_palette_size)
+                delay = 0
+            elif block == 0x21:  # Extension
+                label = data[pos + 1]
+                if label == 0xF9:
+                    # Graphic control extension: applies to the next image
+                    delay = 10 * struct.unpack_from("<H", data, pos + 4)[0]
+                elif label == 0xFF and data[pos + 3 : pos + 14] == b"NETSCAPE2.0":
+                    loop = struct.unpack_from("<H", data, pos + 16)[0]
+                pos = _skip_sub_blocks(data, pos + 2)
+            elif block == 0x3B:  # Trailer
+                break
+            elif delays:
+                # Padding or garbage in place of the trailer
+                break
+            else:
+                raise ValueError(f"Unexpected block 0x{block:02x} at byte {pos}")
+    except (IndexError, struct.error):
+        raise ValueError("Truncated GIF file") from None
+
+    duration_ms = sum(delay or DEFAULT_FRAME_DELAY_MS for delay in delays)
+    return {
+        "width": width,
+        "height": height,
+        "frame_count": len(delays),
+        "frame_delays_ms": delays,
+        "duration_seconds": duration_ms / 1000,
+        "global_palette_size": global_palette_size,
+        "local_palette_sizes": local_palette_sizes,
+        "loop": loop,
+    }
+
 
 def validate_gif(
     gif_path: str | Path, is_emoji: bool = True, verbose: bool = True
@@ -22,8 +127,6 @@ def validate_gif(
     Returns:
         Tuple of (passes: bool, results: dict with all details)
     """
-    from PIL import Image
-
     gif_path = Path(gif_path)
 
     if not gif_path.exists():
@@ -36,30 +139,15 @@ def validate_gif(
 
     # Get dimensions and frame info
     try:
-        with Image.open(gif_path) as img:
-            width, height = img.size
-
-            # Count frames
-            frame_count = 0
-            try:
-                while True:
-                    img.seek(frame_count)
-                    frame_count += 1
-            except EOFError:
-                pass
-
-            # Get duration
-            try:
-                duration_ms = img.info.get("duration", 100)
-                total_duration = (duration_ms * frame_count) / 1000
-                fps = frame_count / total_duration if total_duration > 0 else 0
-            except:
-                total_duration = None
-                fps = None
-
+        gif_info = read_gif_info(gif_path)
     except Exception as e:
         return False, {"error": f"Failed to read GIF: {e}"}
 
+    width, height = gif_info["width"], gif_info["height"]
+    frame_count = gif_info["frame_count"]
+    total_duration = gif_info["duration_seconds"]
+    fps = frame_count / total_duration if total_duration > 0 else 0
+
     # Validate dimensions
     if is_emoji:
         optimal = width == height == 128
@@ -83,6 +171,9 @@ def validate_gif(
         "frame_count": frame_count,
         "duration_seconds": total_duration,
         "fps": fps,
+        "frame_delays_ms": gif_info["frame_delays_ms"],
+        "global_palette_size": gif_info["global_palette_size"],
+        "local_palette_sizes": gif_info["local_palette_sizes"],
         "is_emoji": is_emoji,
         "optimal": optimal if is_emoji else None,
     }
@@ -134,3 +225,52 @@ def is_slack_ready(
     """
     passes, _ = validate_gif(gif_path, is_emoji, verbose)
     return passes
+
+
+def _find_gifs(paths: list[str]):
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.suffix.lower() == ".gif")
+        else:
+            yield path
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check GIFs (files or directories, searched recursively) for Slack"
+    )
+    parser.add_argument("paths", nargs="+", help="GIF files or directories")
+    parser.add_argument(
+        "--message", action="store_true", help="Check as message GIFs instead of emoji"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print one JSON result per line"
+    )
+    args = parser.parse_args(argv)
+
+    checked = failed = 0
+    for gif_path in _find_gifs(args.paths):
+        passes, results = validate_gif(
+            gif_path, is_emoji=not args.message, verbose=False
+        )
+        checked += 1
+        failed += not passes
+        if args.json:
+            print(json.dumps({"file": str(gif_path), **results}))
+        elif "error" in results:
+            print(f"FAIL  {gif_path}: {results['error']}")
+        else:
+            print(
+                f"{'ok  ' if passes else 'FAIL'}  {gif_path}: "
+                f"{results['width']}x{results['height']}, "
+                f"{results['size_kb']:.1f} KB, {results['frame_count']} frames, "
+                f"{results['duration_seconds']:.2f}s"
+            )
+
+    if not args.json:
+        print(f"\n{checked - failed}/{checked} GIFs pass")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
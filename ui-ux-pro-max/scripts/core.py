@@ -5,7 +5,11 @@ UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
 import csv
+import hashlib
+import json
+import os
 import re
+import tempfile
 from pathlib import Path
 from math import log
 from collections import defaultdict
@@ -14,6 +18,10 @@ from collections import defaultdict
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
 
+# Prebuilt search indexes, one JSON file per CSV (see build_index)
+INDEX_DIR = Path.home() / ".cache" / "ui-ux-pro-max"
+INDEX_VERSION = 2
+
 CSV_CONFIG = {
     "style": {
         "file": "styles.csv",
@@ -92,12 +100,15 @@ class BM25:
     def __init__(self, k1=1.5, b=0.75):
         self.k1 = k1
         self.b = b
-        self.corpus = []
         self.doc_lengths = []
         self.avgdl = 0
         self.idf = {}
         self.doc_freqs = defaultdict(int)
         self.N = 0
+        # word -> [(doc index, term frequency), ...] in document order
+        self.postings = {}
+        # Per-document length normalization: k1 * (1 - b + b * doc_len / avgdl)
+        self.norms = []
 
     def tokenize(self, text):
         """Lowercase, split, remove punctuation, filter short words"""
@@ -106,76 +117,186 @@ class BM25:
 
     def fit(self, documents):
         """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+        corpus = [self.tokenize(doc) for doc in documents]
+        self.N = len(corpus)
         if self.N == 0:
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
+        self.doc_lengths = [len(doc) for doc in corpus]
         self.avgdl = sum(self.doc_lengths) / self.N
+        self.norms = [self.k1 * (1 - self.b + self.b * doc_len / self.avgdl) for doc_len in self.doc_lengths]
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
-
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
-
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
-
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
+        postings = defaultdict(list)
+        for idx, doc in enumerate(corpus):
             term_freqs = defaultdict(int)
             for word in doc:
                 term_freqs[word] += 1
-
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
+            for word, tf in term_freqs.items():
+                postings[word].append((idx, tf))
+        self.postings = dict(postings)
+
+        for word, docs in self.postings.items():
+            self.doc_freqs[word] = len(docs)
+            self.idf[word] = log((self.N - len(docs) + 0.5) / (len(docs) + 0.5) + 1)
+
+    def _accumulate(self, query):
+        # Scores of the documents containing at least one query term
+        scores = {}
+        for token in self.tokenize(query):
+            if token in self.idf:
+                idf = self.idf[token]
+                for idx, tf in self.postings[token]:
                     numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
-
-            scores.append((idx, score))
+                    denominator = tf + self.norms[idx]
+                    scores[idx] = scores.get(idx, 0) + idf * numerator / denominator
+        return scores
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+    def score(self, query):
+        """Score all documents against query"""
+        scores = self._accumulate(query)
+        ranked = [(idx, scores.get(idx, 0)) for idx in range(self.N)]
+        return sorted(ranked, key=lambda x: x[1], reverse=True)
+
+    def top(self, query, max_results):
+        """Best-scoring documents with a score > 0, as (doc index, score), best first"""
+        scores = self._accumulate(query)
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return [(idx, score) for idx, score in ranked[:max_results] if score > 0]
+
+    def to_dict(self):
+        """Plain-data form of the fitted index, for serializing"""
+        return {
+            "k1": self.k1, "b": self.b, "N": self.N, "avgdl": self.avgdl,
+            "doc_lengths": self.doc_lengths, "norms": self.norms,
+            "idf": self.idf, "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a fitted index from to_dict() output"""
+        bm25 = cls(state["k1"], state["b"])
+        bm25.N = state["N"]
+        bm25.avgdl = state["avgdl"]
+        bm25.doc_lengths = state["doc_lengths"]
+        bm25.norms = state["norms"]
+        bm25.idf = state["idf"]
+        bm25.postings = state["postings"]
+        bm25.doc_freqs.update((word, len(docs)) for word, docs in bm25.postings.items())
+        return bm25
+
+
+# ============ SEARCH INDEX ============
+# Indexes already loaded in this process: index path -> index
+_loaded_indexes = {}
 
 
-# ============ SEARCH FUNCTIONS ============
 def _load_csv(filepath):
     """Load CSV and return list of dicts"""
     with open(filepath, 'r', encoding='utf-8') as f:
         return list(csv.DictReader(f))
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
-    if not filepath.exists():
-        return []
+def _file_sha256(filepath):
+    with open(filepath, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
-    data = _load_csv(filepath)
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+def _index_path(filepath, search_cols):
+    """Index file for a CSV and the columns searched in it"""
+    key = "\0".join([str(Path(filepath).resolve())] + list(search_cols))
+    return INDEX_DIR / f"{Path(filepath).stem}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.json"
+
+
+def _read_index(index_path):
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if isinstance(index, dict) and index.get("version") == INDEX_VERSION else None
+
+
+def _write_index(index_path, index):
+    """Save an index atomically; a read-only cache directory only costs speed"""
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=index_path.parent, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            # Only plain data is stored; the BM25 searcher is rebuilt on load
+            json.dump({k: v for k, v in index.items() if k != "searcher"}, f, separators=(',', ':'))
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass
 
-    # BM25 search
+
+def _build_index(filepath, search_cols, mtime_ns, size):
+    data = _load_csv(filepath)
+    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
     bm25 = BM25()
     bm25.fit(documents)
-    ranked = bm25.score(query)
+    return {
+        "version": INDEX_VERSION,
+        "mtime_ns": mtime_ns,
+        "size": size,
+        "sha256": _file_sha256(filepath),
+        "rows": data,
+        "bm25": bm25.to_dict(),
+    }
+
+
+def _load_index(filepath, search_cols, rebuild=False):
+    """
+    Index for a CSV, loaded lazily and rebuilt when the CSV changes.
+
+    The CSV's mtime and size are checked on every call; if they changed, its
+    SHA-256 decides whether the index is stale (e.g. a checkout that only
+    touched the file keeps its index).
+    """
+    index_path = _index_path(filepath, search_cols)
+    stat = os.stat(filepath)
+
+    index = None if rebuild else _loaded_indexes.get(index_path) or _read_index(index_path)
+    if index is not None and (index["mtime_ns"], index["size"]) != (stat.st_mtime_ns, stat.st_size):
+        if index["size"] == stat.st_size and index["sha256"] == _file_sha256(filepath):
+            index["mtime_ns"] = stat.st_mtime_ns
+            _write_index(index_path, index)
+        else:
+            index = None
+    if index is None:
+        index = _build_index(filepath, search_cols, stat.st_mtime_ns, stat.st_size)
+        _write_index(index_path, index)
+
+    if "searcher" not in index:
+        index["searcher"] = BM25.from_dict(index["bm25"])
+    _loaded_indexes[index_path] = index
+    return index
+
+
+def build_index(rebuild=False):
+    """Precompute search indexes for every domain and stack; returns {name: document count}"""
+    sources = [(domain, DATA_DIR / config["file"], config["search_cols"]) for domain, config in CSV_CONFIG.items()]
+    sources += [(f"stack:{stack}", DATA_DIR / config["file"], _STACK_COLS["search_cols"]) for stack, config in STACK_CONFIG.items()]
+
+    built = {}
+    for name, filepath, search_cols in sources:
+        if filepath.exists():
+            built[name] = len(_load_index(filepath, search_cols, rebuild=rebuild)["rows"])
+    return built
+
+
+# ============ SEARCH FUNCTIONS ============
+def _search_csv(filepath, search_cols, output_cols, query, max_results):
+    """Core search function using BM25"""
+    if not filepath.exists():
+        return []
+
+    index = _load_index(filepath, search_cols)
+    data = index["rows"]
 
-    # Get top results with score > 0
+    # BM25 search over the postings of the query terms; top results with score > 0
     results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
+    for idx, score in index["searcher"].top(query, max_results):
+        row = data[idx]
+        results.append({col: row.get(col, "") for col in output_cols if col in row})
 
     return results
 
@@ -3,13 +3,14 @@
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+       python search.py --build-index [--rebuild]
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
 Stacks: html-tailwind, react, nextjs
 """
 
 import argparse
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
+from core import CSV_CONFIG, AVAILABLE_STACKS, INDEX_DIR, MAX_RESULTS, build_index, search, search_stack
 
 
 def format_output(result):
@@ -40,14 +41,23 @@ def format_output(result):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query")
     parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--build-index", action="store_true", help="Precompute the search index for every domain and stack")
+    parser.add_argument("--rebuild", action="store_true", help="With --build-index, rebuild even if the CSVs are unchanged")
 
     args = parser.parse_args()
 
+    if args.build_index:
+        built = build_index(rebuild=args.rebuild)
+        print(f"Indexed {len(built)} sources ({sum(built.values())} rows) in {INDEX_DIR}")
+        raise SystemExit(0)
+    if args.query is None:
+        parser.error("the following arguments are required: query")
+
     # Stack search takes priority
     if args.stack:
         result = search_stack(args.query, args.stack, args.max_results)
@@ -0,0 +1,1187 @@
+#!/usr/bin/env python3
+"""
+Pure-Python Formula Recalculation
+Evaluates simple workbooks without LibreOffice
+
+Handles cell and range references (including other sheets), arithmetic,
+comparison and text operators, and a set of common functions (SUM, AVERAGE,
+IF, VLOOKUP, ...). Formulas are read from the sheet XML, ordered by a
+dependency graph across sheets and evaluated once each; the results are
+written back as cached values. Anything outside that subset raises
+UnsupportedFormula so the caller can fall back to LibreOffice.
+"""
+
+import math
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from decimal import ROUND_DOWN, ROUND_HALF_UP, ROUND_UP, Decimal
+from functools import lru_cache
+
+from lxml import etree
+
+from recalc import (
+    SPREADSHEET_NS,
+    XML_PARSER,
+    _list_worksheets,
+    _local_name,
+    _read_rels,
+)
+
+CELL_TAG = f"{{{SPREADSHEET_NS}}}c"
+FORMULA_TAG = f"{{{SPREADSHEET_NS}}}f"
+VALUE_TAG = f"{{{SPREADSHEET_NS}}}v"
+INLINE_STRING_TAG = f"{{{SPREADSHEET_NS}}}is"
+MAX_ROW = 1048576
+MAX_COL = 16384
+
+
+class UnsupportedFormula(Exception):
+    """Raised when a workbook needs features the built-in evaluator lacks"""
+
+
+class ExcelError:
+    """An Excel error value such as #DIV/0!"""
+
+    __slots__ = ("code",)
+
+    def __init__(self, code):
+        self.code = code
+
+    def __eq__(self, other):
+        return isinstance(other, ExcelError) and other.code == self.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __repr__(self):
+        return self.code
+
+
+DIV0 = ExcelError("#DIV/0!")
+NA = ExcelError("#N/A")
+NUM = ExcelError("#NUM!")
+REF = ExcelError("#REF!")
+VALUE = ExcelError("#VALUE!")
+ERROR_LITERALS = {
+    e: ExcelError(e)
+    for e in ["#VALUE!", "#DIV/0!", "#REF!", "#NAME?", "#NULL!", "#NUM!", "#N/A"]
+}
+
+
+class Range:
+    """A rectangular block of cell values, row by row (None for empty cells)"""
+
+    __slots__ = ("rows",)
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def values(self):
+        for row in self.rows:
+            yield from row
+
+
+# --- Parsing -----------------------------------------------------------------
+
+TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<error>\#(?:NULL!|DIV/0!|VALUE!|REF!|NAME\?|NUM!|N/A))
+  | (?P<ref>
+        (?:(?:'(?:[^']|'')+'|[A-Za-z_][\w.]*)!)?
+        (?:
+            \$?[A-Za-z]{1,3}\$?\d+(?::\$?[A-Za-z]{1,3}\$?\d+)?
+          | \$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}
+          | \$?\d+:\$?\d+
+        )
+    )(?![\w(!])
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<func>(?:_xlfn\.|_xlws\.)?[A-Za-z][\w.]*)(?=\s*\()
+  | (?P<bool>TRUE|FALSE)(?![\w(])
+  | (?P<op><>|<=|>=|[-+*/^&=<>%(),:])
+""",
+    re.VERBOSE | re.IGNORECASE,
+)
+
+BINARY_PRECEDENCE = {
+    "=": 1,
+    "<>": 1,
+    "<": 1,
+    ">": 1,
+    "<=": 1,
+    ">=": 1,
+    "&": 2,
+    "+": 3,
+    "-": 3,
+    "*": 4,
+    "/": 4,
+    "^": 5,
+}
+
+
+@lru_cache(maxsize=None)
+def _column_index(letters):
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + ord(char) - 64
+    return index
+
+
+def _column_letter(index):
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+CELL_RE = re.compile(r"(\$?)([A-Za-z]{1,3})(\$?)(\d+)")
+# Strings and quoted sheet names are matched first so references inside them are left alone
+RELATIVE_KEY_RE = re.compile(
+    r'"(?:[^"]|"")*"|\'(?:[^\']|\'\')+\'|(?<![\w$.])(\$?)([A-Za-z]{1,3})(\$?)(\d+)(?![\w(!])'
+)
+
+WHOLE_LINE_RE = re.compile(
+    r"(?<![\w$.])\$?(?:[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}|\d+:\$?\d+)(?![\w(!])"
+)
+
+
+def _split_cell(text):
+    """Parse '$A$1' into (row, col, row_absolute, col_absolute)"""
+    m = CELL_RE.fullmatch(text)
+    return (
+        int(m.group(4)),
+        _column_index(m.group(2)),
+        bool(m.group(3)),
+        bool(m.group(1)),
+    )
+
+
+def _parse_reference(text, current_sheet):
+    """Turn a reference token into a ('range', sheet, r1, c1, r2, c2, flags) node"""
+    sheet = current_sheet
+    if "!" in text:
+        sheet, text = text.rsplit("!", 1)
+        if sheet.startswith("'"):
+            sheet = sheet[1:-1].replace("''", "'")
+    if sheet.startswith("["):
+        raise UnsupportedFormula("external workbook reference")
+
+    start, _, end = text.partition(":")
+    end = end or start
+    if start.lstrip("$").isdigit():
+        # Whole rows: 1:3
+        r1, r2 = int(start.lstrip("$")), int(end.lstrip("$"))
+        return (
+            "range",
+            sheet,
+            r1,
+            1,
+            r2,
+            None,
+            (start.startswith("$"), True, end.startswith("$"), True),
+        )
+    if start.lstrip("$").isalpha():
+        # Whole columns: A:C
+        c1, c2 = _column_index(start.lstrip("$")), _column_index(end.lstrip("$"))
+        return (
+            "range",
+            sheet,
+            1,
+            c1,
+            None,
+            c2,
+            (True, start.startswith("$"), True, end.startswith("$")),
+        )
+    r1, c1, r1_abs, c1_abs = _split_cell(start)
+    r2, c2, r2_abs, c2_abs = _split_cell(end)
+    return (
+        "range",
+        sheet,
+        min(r1, r2),
+        min(c1, c2),
+        max(r1, r2),
+        max(c1, c2),
+        (r1_abs, c1_abs, r2_abs, c2_abs),
+    )
+
+
+def tokenize(formula):
+    tokens = []
+    pos = 0
+    while pos < len(formula):
+        m = TOKEN_RE.match(formula, pos)
+        if not m:
+            raise UnsupportedFormula(
+                f"cannot parse formula near {formula[pos:pos + 20]!r}"
+            )
+        pos = m.end()
+        kind = m.lastgroup
+        if kind != "ws":
+            tokens.append((kind, m.group(kind)))
+    return tokens
+
+
+class Parser:
+    """Precedence-climbing parser producing tuple-based syntax trees"""
+
+    def __init__(self, formula, sheet):
+        self.tokens = tokenize(formula)
+        self.pos = 0
+        self.sheet = sheet
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, value):
+        kind, text = self.take()
+        if text != value:
+            raise UnsupportedFormula(f"expected {value!r}")
+
+    def parse(self):
+        node = self.expression(0)
+        if self.pos != len(self.tokens):
+            raise UnsupportedFormula(f"unexpected {self.peek()[1]!r}")
+        return node
+
+    def expression(self, min_precedence):
+        node = self.unary()
+        while True:
+            kind, text = self.peek()
+            precedence = BINARY_PRECEDENCE.get(text) if kind == "op" else None
+            if precedence is None or precedence < min_precedence:
+                return node
+            self.take()
+            # ^ is left-associative in Excel, like the other operators
+            node = ("binop", text, node, self.expression(precedence + 1))
+
+    def unary(self):
+        # Negation and % bind tighter than ^ in Excel: -2^2 is 4
+        kind, text = self.peek()
+        if kind == "op" and text in ("-", "+"):
+            self.take()
+            operand = self.unary()
+            return ("neg", operand) if text == "-" else operand
+        node = self.primary()
+        while self.peek() == ("op", "%"):
+            self.take()
+            node = ("percent", node)
+        return node
+
+    def primary(self):
+        kind, text = self.take()
+        if kind == "number":
+            return ("const", float(text))
+        if kind == "string":
+            return ("const", text[1:-1].replace('""', '"'))
+        if kind == "bool":
+            return ("const", text.upper() == "TRUE")
+        if kind == "error":
+            return ("const", ERROR_LITERALS[text.upper()])
+        if kind == "ref":
+            return _parse_reference(text, self.sheet)
+        if kind == "func":
+            return self.call(text)
+        if kind == "op" and text == "(":
+            node = self.expression(0)
+            self.expect(")")
+            return node
+        if kind is None:
+            raise UnsupportedFormula("unexpected end of formula")
+        raise UnsupportedFormula(f"unsupported syntax {text!r}")
+
+    def call(self, name):
+        name = name.upper()
+        for prefix in ("_XLFN.", "_XLWS."):
+            if name.startswith(prefix):
+                name = name[len(prefix) :]
+        if name not in FUNCTIONS and name not in LAZY_FUNCTIONS:
+            raise UnsupportedFormula(f"unsupported function {name}")
+        self.expect("(")
+        args = []
+        if self.peek()[1] == ")":
+            self.take()
+            return ("func", name, args)
+        while True:
+            if self.peek()[1] in (",", ")"):
+                args.append(("missing",))
+            else:
+                args.append(self.expression(0))
+            kind, text = self.take()
+            if text == ")":
+                return ("func", name, args)
+            if text != ",":
+                raise UnsupportedFormula(f"unexpected {text!r} in arguments of {name}")
+
+
+class FormulaCache:
+    """
+    Parse formulas once per relative shape
+
+    Filled-down formulas such as =A2*2+B1, =A3*2+B2, ... differ only in their
+    relative references. They share a key in R1C1-like notation, so later
+    copies are produced by shifting the first parse instead of parsing again.
+    """
+
+    def __init__(self):
+        self.trees = {}
+
+    def parse(self, formula, sheet, row, col):
+        if WHOLE_LINE_RE.search(formula):
+            # Whole-row/column references have no R1C1 form in the key; parse directly
+            return Parser(formula, sheet).parse()
+
+        def relative(m):
+            if m.group(2) is None:
+                return m.group(0)
+            ref_row, ref_col = int(m.group(4)), _column_index(m.group(2).upper())
+            col_part = f"C{ref_col}" if m.group(1) else f"C[{ref_col - col}]"
+            row_part = f"R{ref_row}" if m.group(3) else f"R[{ref_row - row}]"
+            return row_part + col_part
+
+        key = (sheet, RELATIVE_KEY_RE.sub(relative, formula))
+        cached = self.trees.get(key)
+        if cached is None:
+            tree = Parser(formula, sheet).parse()
+            self.trees[key] = (tree, row, col)
+            return tree
+        tree, cached_row, cached_col = cached
+        return shift_formula(tree, row - cached_row, col - cached_col)
+
+
+def shift_formula(node, row_offset, col_offset):
+    """Move the relative references of a syntax tree, as Excel does for shared formulas"""
+    kind = node[0]
+    if kind == "range":
+        _, sheet, r1, c1, r2, c2, flags = node
+        r1_abs, c1_abs, r2_abs, c2_abs = flags
+
+        def move(value, absolute, offset):
+            return value if value is None or absolute else value + offset
+
+        return (
+            "range",
+            sheet,
+            move(r1, r1_abs, row_offset),
+            move(c1, c1_abs, col_offset),
+            move(r2, r2_abs, row_offset),
+            move(c2, c2_abs, col_offset),
+            flags,
+        )
+    if kind == "func":
+        return (
+            "func",
+            node[1],
+            [shift_formula(arg, row_offset, col_offset) for arg in node[2]],
+        )
+    if kind == "binop":
+        return (
+            "binop",
+            node[1],
+            shift_formula(node[2], row_offset, col_offset),
+            shift_formula(node[3], row_offset, col_offset),
+        )
+    if kind in ("neg", "percent"):
+        return (kind, shift_formula(node[1], row_offset, col_offset))
+    return node
+
+
+def iter_references(node):
+    """Yield every range node in a syntax tree"""
+    kind = node[0]
+    if kind == "range":
+        yield node
+    elif kind == "func":
+        for arg in node[2]:
+            yield from iter_references(arg)
+    elif kind == "binop":
+        yield from iter_references(node[2])
+        yield from iter_references(node[3])
+    elif kind in ("neg", "percent"):
+        yield from iter_references(node[1])
+
+
+# --- Value coercion ----------------------------------------------------------
+
+
+def to_number(value):
+    """Coerce a scalar to a number for arithmetic, or return an ExcelError"""
+    if isinstance(value, ExcelError):
+        return value
+    if value is None:
+        return 0.0
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, float):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip()) if value.strip() else VALUE
+        except ValueError:
+            return VALUE
+    return float(value)
+
+
+def to_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float):
+        return format_number(value)
+    return value
+
+
+def to_bool(value):
+    if isinstance(value, ExcelError):
+        return value
+    if value is None:
+        return False
+    if isinstance(value, str):
+        if value.upper() in ("TRUE", "FALSE"):
+            return value.upper() == "TRUE"
+        return VALUE
+    return bool(value)
+
+
+def format_number(value):
+    """Format a number the way Excel stores it in a cell"""
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _type_rank(value):
+    # Excel orders numbers < text < booleans
+    if isinstance(value, bool):
+        return 2
+    if isinstance(value, str):
+        return 1
+    return 0
+
+
+def compare(left, right):
+    """Three-way comparison with Excel's rules for mixed and empty values"""
+    if left is None:
+        left = (
+            "" if isinstance(right, str) else False if isinstance(right, bool) else 0.0
+        )
+    if right is None:
+        right = (
+            "" if isinstance(left, str) else False if isinstance(left, bool) else 0.0
+        )
+    left_rank, right_rank = _type_rank(left), _type_rank(right)
+    if left_rank != right_rank:
+        return -1 if left_rank < right_rank else 1
+    if isinstance(left, str):
+        left, right = left.casefold(), right.casefold()
+    return (left > right) - (left < right)
+
+
+def _first_error(*values):
+    for value in values:
+        if isinstance(value, ExcelError):
+            return value
+    return None
+
+
+def _excel_round(value, digits, rounding):
+    quantum = Decimal(1).scaleb(-int(digits))
+    # repr() gives the shortest decimal that round-trips, avoiding 2.675 -> 2.67499...
+    return float(Decimal(repr(value)).quantize(quantum, rounding=rounding))
+
+
+# --- Functions ---------------------------------------------------------------
+
+
+def _numbers(args):
+    """
+    Collect the numbers of aggregate function arguments, as SUM does
+
+    Direct arguments are coerced (TRUE counts as 1, "3" as 3); values inside
+    ranges count only if they are numbers. Returns a list or an ExcelError.
+    """
+    numbers = []
+    for arg in args:
+        if isinstance(arg, Range):
+            for value in arg.values():
+                if isinstance(value, ExcelError):
+                    return value
+                if isinstance(value, float):
+                    numbers.append(value)
+        elif arg is not None:
+            value = to_number(arg)
+            if isinstance(value, ExcelError):
+                return value
+            numbers.append(value)
+    return numbers
+
+
+def fn_sum(*args):
+    numbers = _numbers(args)
+    return numbers if isinstance(numbers, ExcelError) else math.fsum(numbers)
+
+
+def fn_product(*args):
+    numbers = _numbers(args)
+    if isinstance(numbers, ExcelError):
+        return numbers
+    # Excel gives 0, not the empty product 1, when there is nothing to multiply
+    return float(math.prod(numbers)) if numbers else 0.0
+
+
+def fn_average(*args):
+    numbers = _numbers(args)
+    if isinstance(numbers, ExcelError):
+        return numbers
+    return math.fsum(numbers) / len(numbers) if numbers else DIV0
+
+
+def fn_min(*args):
+    numbers = _numbers(args)
+    return numbers if isinstance(numbers, ExcelError) else min(numbers, default=0.0)
+
+
+def fn_max(*args):
+    numbers = _numbers(args)
+    return numbers if isinstance(numbers, ExcelError) else max(numbers, default=0.0)
+
+
+def fn_count(*args):
+    count = 0
+    for arg in args:
+        if isinstance(arg, Range):
+            count += sum(1 for value in arg.values() if isinstance(value, float))
+        elif not isinstance(to_number(arg), ExcelError) and arg is not None:
+            count += 1
+    return float(count)
+
+
+def fn_counta(*args):
+    count = 0
+    for arg in args:
+        if isinstance(arg, Range):
+            count += sum(1 for value in arg.values() if value is not None)
+        elif arg is not None:
+            count += 1
+    return float(count)
+
+
+def fn_and(*args):
+    return _logical(args, all)
+
+
+def fn_or(*args):
+    return _logical(args, any)
+
+
+def _logical(args, combine):
+    flags = []
+    for arg in args:
+        values = (
+            [v for v in arg.values() if not isinstance(v, str)]
+            if isinstance(arg, Range)
+            else [arg]
+        )
+        for value in values:
+            if value is None:
+                continue
+            flag = to_bool(value)
+            if isinstance(flag, ExcelError):
+                return flag
+            flags.append(flag)
+    return combine(flags) if flags else VALUE
+
+
+def fn_not(value):
+    flag = to_bool(value)
+    return flag if isinstance(flag, ExcelError) else not flag
+
+
+def _unary_math(func):
+    def apply(value):
+        number = to_number(value)
+        return number if isinstance(number, ExcelError) else func(number)
+
+    return apply
+
+
+def _rounding(mode):
+    def apply(value, digits=0.0):
+        number, digits = to_number(value), to_number(digits)
+        error = _first_error(number, digits)
+        if error:
+            return error
+        return _excel_round(number, math.trunc(digits), mode)
+
+    return apply
+
+
+def fn_mod(number, divisor):
+    number, divisor = to_number(number), to_number(divisor)
+    error = _first_error(number, divisor)
+    if error:
+        return error
+    if divisor == 0:
+        return DIV0
+    return number - divisor * math.floor(number / divisor)
+
+
+def fn_concatenate(*args):
+    if any(isinstance(arg, Range) for arg in args):
+        raise UnsupportedFormula("CONCATENATE over a range")
+    error = _first_error(*args)
+    return error or "".join(to_text(arg) for arg in args)
+
+
+def _lookup_position(lookup, values, approximate):
+    """0-based position of lookup in values, or None; approximate assumes ascending order"""
+    if approximate:
+        found = None
+        for i, value in enumerate(values):
+            if value is None or _type_rank(value) != _type_rank(lookup):
+                continue
+            if compare(value, lookup) > 0:
+                break
+            found = i
+        return found
+    for i, value in enumerate(values):
+        if (
+            value is not None
+            and _type_rank(value) == _type_rank(lookup)
+            and compare(value, lookup) == 0
+        ):
+            return i
+    return None
+
+
+def _lookup(lookup, table, index, approximate, transpose):
+    if not isinstance(table, Range):
+        return VALUE
+    error = _first_error(lookup)
+    if error:
+        return error
+    index = to_number(index)
+    if isinstance(index, ExcelError):
+        return index
+    approximate = to_bool(approximate)
+    if isinstance(approximate, ExcelError):
+        return approximate
+    rows = [list(column) for column in zip(*table.rows)] if transpose else table.rows
+    index = int(index)
+    if index < 1:
+        return VALUE
+    if index > len(rows[0]):
+        return REF
+    position = _lookup_position(lookup, [row[0] for row in rows], approximate)
+    return NA if position is None else rows[position][index - 1]
+
+
+def fn_vlookup(lookup, table, col_index, approximate=True):
+    return _lookup(lookup, table, col_index, approximate, transpose=False)
+
+
+def fn_hlookup(lookup, table, row_index, approximate=True):
+    return _lookup(lookup, table, row_index, approximate, transpose=True)
+
+
+def fn_match(lookup, lookup_range, match_type=1.0):
+    if not isinstance(lookup_range, Range):
+        return NA
+    error = _first_error(lookup)
+    if error:
+        return error
+    values = list(lookup_range.values())
+    if len(lookup_range.rows) > 1 and len(lookup_range.rows[0]) > 1:
+        return NA
+    match_type = to_number(match_type)
+    if isinstance(match_type, ExcelError):
+        return match_type
+    if match_type == 0:
+        position = _lookup_position(lookup, values, approximate=False)
+    elif match_type > 0:
+        position = _lookup_position(lookup, values, approximate=True)
+    else:
+        raise UnsupportedFormula("MATCH with descending match type")
+    return NA if position is None else float(position + 1)
+
+
+def fn_index(table, row=None, col=None):
+    if not isinstance(table, Range):
+        raise UnsupportedFormula("INDEX on a scalar")
+    row = 0.0 if row is None else to_number(row)
+    col = 0.0 if col is None else to_number(col)
+    error = _first_error(row, col)
+    if error:
+        return error
+    row, col = int(row), int(col)
+    height, width = len(table.rows), len(table.rows[0])
+    if height == 1 and col == 0:
+        row, col = 1, row
+    elif width == 1 and col == 0:
+        col = 1
+    if row == 0 or col == 0:
+        raise UnsupportedFormula("INDEX returning a whole row or column")
+    if not (1 <= row <= height and 1 <= col <= width):
+        return REF
+    return table.rows[row - 1][col - 1]
+
+
+FUNCTIONS = {
+    "SUM": fn_sum,
+    "PRODUCT": fn_product,
+    "AVERAGE": fn_average,
+    "MIN": fn_min,
+    "MAX": fn_max,
+    "COUNT": fn_count,
+    "COUNTA": fn_counta,
+    "AND": fn_and,
+    "OR": fn_or,
+    "NOT": fn_not,
+    "ABS": _unary_math(abs),
+    "INT": _unary_math(lambda x: float(math.floor(x))),
+    "ROUND": _rounding(ROUND_HALF_UP),
+    "ROUNDUP": _rounding(ROUND_UP),
+    "ROUNDDOWN": _rounding(ROUND_DOWN),
+    "MOD": fn_mod,
+    "CONCATENATE": fn_concatenate,
+    "VLOOKUP": fn_vlookup,
+    "HLOOKUP": fn_hlookup,
+    "MATCH": fn_match,
+    "INDEX": fn_index,
+}
+# Functions whose arguments are evaluated on demand
+LAZY_FUNCTIONS = {"IF", "IFERROR"}
+# Argument positions that take ranges (None = all); other arguments must be single cells
+RANGE_ARGUMENTS = {
+    "SUM": None,
+    "PRODUCT": None,
+    "AVERAGE": None,
+    "MIN": None,
+    "MAX": None,
+    "COUNT": None,
+    "COUNTA": None,
+    "AND": None,
+    "OR": None,
+    "VLOOKUP": {1},
+    "HLOOKUP": {1},
+    "MATCH": {1},
+    "INDEX": {0},
+}
+
+
+# --- Workbook model ----------------------------------------------------------
+
+
+class Workbook:
+    """Cell values and parsed formulas of every worksheet"""
+
+    def __init__(self, xlsx_path):
+        self.path = xlsx_path
+        self.sheet_parts = {}  # sheet name -> part name
+        self.values = {}  # sheet name -> {(row, col): value}
+        self.formulas = {}  # (sheet, row, col) -> syntax tree
+        self.extent = {}  # sheet name -> (max row, max col)
+        self.sheet_names = {}  # case-folded name -> sheet name
+        self.formula_cache = FormulaCache()
+        self._load()
+
+    def _load(self):
+        with zipfile.ZipFile(self.path) as archive:
+            workbook_part, sheets = _list_worksheets(archive)
+            shared_strings = self._read_shared_strings(archive, workbook_part)
+            for name, part in sheets:
+                self.sheet_parts[name] = part
+                self.sheet_names[name.casefold()] = name
+                self._read_sheet(
+                    name,
+                    etree.fromstring(archive.read(part), XML_PARSER),
+                    shared_strings,
+                )
+
+    @staticmethod
+    def _read_shared_strings(archive, workbook_part):
+        for rel_type, target in _read_rels(archive, workbook_part).values():
+            if rel_type.endswith("/sharedStrings") and target in archive.namelist():
+                root = etree.fromstring(archive.read(target), XML_PARSER)
+                return [
+                    "".join(
+                        t.text or ""
+                        for child in si
+                        if _local_name(child.tag) in ("t", "r")
+                        for t in child.iter(f"{{{SPREADSHEET_NS}}}t")
+                    )
+                    for si in root
+                ]
+        return []
+
+    def _read_sheet(self, name, root, shared_strings):
+        values = self.values[name] = {}
+        shared_masters = {}  # si -> (row, col, syntax tree)
+        shared_dependents = []
+        max_row = max_col = 0
+
+        for cell in root.iter(CELL_TAG):
+            row, col, _, _ = _split_cell(cell.get("r"))
+            max_row, max_col = max(max_row, row), max(max_col, col)
+            formula = cell.find(FORMULA_TAG)
+            if formula is not None:
+                formula_type = formula.get("t", "normal")
+                if formula_type == "shared":
+                    if formula.text:
+                        tree = self.formula_cache.parse(formula.text, name, row, col)
+                        shared_masters[formula.get("si")] = (row, col, tree)
+                        self.formulas[name, row, col] = tree
+                    else:
+                        shared_dependents.append((row, col, formula.get("si")))
+                elif formula_type == "normal":
+                    self.formulas[name, row, col] = self.formula_cache.parse(
+                        formula.text or "", name, row, col
+                    )
+                else:
+                    raise UnsupportedFormula(
+                        f'{formula_type} formula in {name}!{cell.get("r")}'
+                    )
+                continue
+            values[row, col] = self._cell_value(cell, shared_strings)
+
+        for row, col, si in shared_dependents:
+            if si not in shared_masters:
+                raise UnsupportedFormula(
+                    f"shared formula {si} without a master in {name}"
+                )
+            master_row, master_col, tree = shared_masters[si]
+            self.formulas[name, row, col] = shift_formula(
+                tree, row - master_row, col - master_col
+            )
+
+        self.extent[name] = (max_row, max_col)
+
+    @staticmethod
+    def _cell_value(cell, shared_strings):
+        cell_type = cell.get("t", "n")
+        if cell_type == "inlineStr":
+            inline = cell.find(INLINE_STRING_TAG)
+            return (
+                "".join(t.text or "" for t in inline.iter(f"{{{SPREADSHEET_NS}}}t"))
+                if inline is not None
+                else None
+            )
+        value = cell.find(VALUE_TAG)
+        if value is None or value.text is None:
+            return None
+        text = value.text
+        if cell_type == "s":
+            return shared_strings[int(text)]
+        if cell_type == "b":
+            return text == "1"
+        if cell_type == "e":
+            return ERROR_LITERALS.get(text, ExcelError(text))
+        if cell_type in ("str", "d"):
+            return text
+        return float(text)
+
+    def range_bounds(self, node):
+        """Resolve whole-row/column references to the used area of the sheet"""
+        _, sheet, r1, c1, r2, c2, _ = node
+        # Sheet names in formulas are case-insensitive
+        sheet = self.sheet_names.get(sheet.casefold())
+        if sheet is None:
+            return None
+        max_row, max_col = self.extent[sheet]
+        r2 = max_row if r2 is None else r2
+        c2 = max_col if c2 is None else c2
+        r1, r2 = min(r1, r2), max(r1, r2)
+        c1, c2 = min(c1, c2), max(c1, c2)
+        if min(r1, c1) < 1 or r2 > MAX_ROW or c2 > MAX_COL:
+            return None
+        return sheet, r1, c1, r2, c2
+
+
+def _dependency_order(workbook):
+    """
+    Order formula cells so every cell comes after the formula cells it reads
+
+    Raises:
+        UnsupportedFormula: on a circular reference
+    """
+    # Formula cells per sheet and column, with sorted rows, for range lookups
+    by_column = defaultdict(lambda: defaultdict(list))
+    for sheet, row, col in workbook.formulas:
+        by_column[sheet][col].append(row)
+    for columns in by_column.values():
+        for rows in columns.values():
+            rows.sort()
+
+    dependents = defaultdict(list)
+    pending = {}
+    for key, tree in workbook.formulas.items():
+        precedents = set()
+        for node in iter_references(tree):
+            bounds = workbook.range_bounds(node)
+            if bounds is None:
+                continue
+            sheet, r1, c1, r2, c2 = bounds
+            columns = by_column.get(sheet, {})
+            for col in (
+                range(c1, c2 + 1)
+                if c2 - c1 < len(columns)
+                else [c for c in columns if c1 <= c <= c2]
+            ):
+                rows = columns.get(col)
+                if not rows:
+                    continue
+                for row in rows[bisect_left(rows, r1) : bisect_right(rows, r2)]:
+                    precedents.add((sheet, row, col))
+        for precedent in precedents:
+            dependents[precedent].append(key)
+        pending[key] = len(precedents)
+
+    queue = deque(key for key, count in pending.items() if count == 0)
+    order = []
+    while queue:
+        key = queue.popleft()
+        order.append(key)
+        for dependent in dependents[key]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                queue.append(dependent)
+
+    if len(order) != len(pending):
+        sheet, row, col = next(key for key, count in pending.items() if count > 0)
+        raise UnsupportedFormula(
+            f"circular reference involving {sheet}!{_column_letter(col)}{row}"
+        )
+    return order
+
+
+class Evaluator:
+    """Evaluates syntax trees against a Workbook, storing results as it goes"""
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+
+    def evaluate_cell(self, key):
+        sheet, row, col = key
+        value = self.scalar(self.evaluate(self.workbook.formulas[key]))
+        # A formula that points at an empty cell shows 0
+        self.workbook.values[sheet][row, col] = 0.0 if value is None else value
+        return self.workbook.values[sheet][row, col]
+
+    def evaluate(self, node):
+        kind = node[0]
+        if kind == "const":
+            return node[1]
+        if kind == "missing":
+            return None
+        if kind == "range":
+            return self.reference(node)
+        if kind == "neg":
+            value = to_number(self.scalar(self.evaluate(node[1])))
+            return value if isinstance(value, ExcelError) else -value
+        if kind == "percent":
+            value = to_number(self.scalar(self.evaluate(node[1])))
+            return value if isinstance(value, ExcelError) else value / 100
+        if kind == "binop":
+            return self.binary(
+                node[1],
+                self.scalar(self.evaluate(node[2])),
+                self.scalar(self.evaluate(node[3])),
+            )
+        if kind == "func":
+            return self.call(node[1], node[2])
+        raise UnsupportedFormula(f"unknown node {kind}")
+
+    def reference(self, node):
+        bounds = self.workbook.range_bounds(node)
+        if bounds is None:
+            return REF
+        sheet, r1, c1, r2, c2 = bounds
+        values = self.workbook.values[sheet]
+        if r1 == r2 and c1 == c2:
+            return Range([[values.get((r1, c1))]])
+        return Range(
+            [
+                [values.get((row, col)) for col in range(c1, c2 + 1)]
+                for row in range(r1, r2 + 1)
+            ]
+        )
+
+    @staticmethod
+    def scalar(value):
+        """Reduce a single-cell range to its value; larger ranges need implicit intersection"""
+        if isinstance(value, Range):
+            if len(value.rows) == 1 and len(value.rows[0]) == 1:
+                return value.rows[0][0]
+            raise UnsupportedFormula("range used as a single value")
+        return value
+
+    def call(self, name, arg_nodes):
+        if name == "IF":
+            if not 1 <= len(arg_nodes) <= 3:
+                raise UnsupportedFormula("IF with wrong number of arguments")
+            condition = to_bool(self.scalar(self.evaluate(arg_nodes[0])))
+            if isinstance(condition, ExcelError):
+                return condition
+            if condition:
+                branch = arg_nodes[1] if len(arg_nodes) > 1 else ("const", True)
+            else:
+                branch = arg_nodes[2] if len(arg_nodes) > 2 else ("const", False)
+            value = self.evaluate(branch)
+            return 0.0 if branch == ("missing",) else value
+        if name == "IFERROR":
+            if len(arg_nodes) != 2:
+                raise UnsupportedFormula("IFERROR with wrong number of arguments")
+            value = self.scalar(self.evaluate(arg_nodes[0]))
+            return (
+                self.scalar(self.evaluate(arg_nodes[1]))
+                if isinstance(value, ExcelError)
+                else value
+            )
+
+        args = [self.evaluate(arg) for arg in arg_nodes]
+        if name not in RANGE_ARGUMENTS:
+            args = [self.scalar(arg) for arg in args]
+        elif RANGE_ARGUMENTS[name] is not None:
+            args = [
+                arg if i in RANGE_ARGUMENTS[name] else self.scalar(arg)
+                for i, arg in enumerate(args)
+            ]
+        try:
+            return FUNCTIONS[name](*args)
+        except TypeError:
+            raise UnsupportedFormula(f"{name} with {len(args)} arguments")
+
+    @staticmethod
+    def binary(op, left, right):
+        error = _first_error(left, right)
+        if error:
+            return error
+        if op == "&":
+            return to_text(left) + to_text(right)
+        if op in ("=", "<>", "<", ">", "<=", ">="):
+            result = compare(left, right)
+            return {
+                "=": result == 0,
+                "<>": result != 0,
+                "<": result < 0,
+                ">": result > 0,
+                "<=": result <= 0,
+                ">=": result >= 0,
+            }[op]
+
+        left, right = to_number(left), to_number(right)
+        error = _first_error(left, right)
+        if error:
+            return error
+        try:
+            if op == "+":
+                result = left + right
+            elif op == "-":
+                result = left - right
+            elif op == "*":
+                result = left * right
+            elif op == "/":
+                if right == 0:
+                    return DIV0
+                result = left / right
+            else:
+                if left == 0 and right <= 0:
+                    return NUM if right == 0 else DIV0
+                result = left**right
+                if isinstance(result, complex):
+                    return NUM
+        except OverflowError:
+            return NUM
+        return NUM if math.isinf(result) or math.isnan(result) else result
+
+
+# --- Writing results ---------------------------------------------------------
+
+
+def _write_value(cell, value):
+    """Store a computed value as the cell's cached result"""
+    for old in cell.findall(VALUE_TAG):
+        cell.remove(old)
+    v = etree.Element(VALUE_TAG)
+    if isinstance(value, ExcelError):
+        cell.set("t", "e")
+        v.text = value.code
+    elif isinstance(value, bool):
+        cell.set("t", "b")
+        v.text = "1" if value else "0"
+    elif isinstance(value, str):
+        cell.set("t", "str")
+        v.text = value
+    else:
+        if "t" in cell.attrib:
+            del cell.attrib["t"]
+        v.text = format_number(value)
+    cell.find(FORMULA_TAG).addnext(v)
+
+
+def _write_results(workbook):
+    """Rewrite the worksheets that hold formulas with their cached values"""
+    sheets_with_formulas = {sheet for sheet, _, _ in workbook.formulas}
+    fd, temp_path = tempfile.mkstemp(
+        suffix=".xlsx", dir=os.path.dirname(os.path.abspath(workbook.path))
+    )
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(workbook.path) as source, zipfile.ZipFile(
+            temp_path, "w", zipfile.ZIP_DEFLATED
+        ) as target:
+            parts = {
+                workbook.sheet_parts[sheet]: sheet for sheet in sheets_with_formulas
+            }
+            for info in source.infolist():
+                data = source.read(info.filename)
+                sheet = parts.get(info.filename)
+                if sheet is not None:
+                    root = etree.fromstring(data, XML_PARSER)
+                    values = workbook.values[sheet]
+                    for cell in root.iter(CELL_TAG):
+                        if cell.find(FORMULA_TAG) is not None:
+                            row, col, _, _ = _split_cell(cell.get("r"))
+                            _write_value(cell, values[row, col])
+                    data = etree.tostring(
+                        root, xml_declaration=True, encoding="UTF-8", standalone=True
+                    )
+                target.writestr(info, data)
+        shutil.move(temp_path, workbook.path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def recalculate(xlsx_path):
+    """
+    Recalculate every formula in an Excel file in place, without LibreOffice
+
+    Args:
+        xlsx_path: Path to Excel file
+
+    Returns:
+        Number of formulas evaluated
+
+    Raises:
+        UnsupportedFormula: if the workbook uses anything the evaluator does not
+            handle; the file is left unchanged
+    """
+    workbook = Workbook(xlsx_path)
+    evaluator = Evaluator(workbook)
+    for key in _dependency_order(workbook):
+        evaluator.evaluate_cell(key)
+    _write_results(workbook)
+    return len(workbook.formulas)
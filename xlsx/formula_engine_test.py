@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from openpyxl import Workbook, load_workbook
+
+from formula_engine import UnsupportedFormula, recalculate
+
+# (formula, expected cached value) evaluated on a sheet where A1:A3 = 1, 2, 3,
+# B1:B2 = "x", "y" and C1:C3 are empty
+EXPECTED_VALUES = [
+    ("=SUM(A1:A3)", 6),
+    ("=PRODUCT(A1:A3)", 6),
+    ("=PRODUCT(A1:A3, 2)", 12),
+    ("=PRODUCT(C1:C3)", 0),
+    ("=PRODUCT(B1:B2)", 0),
+    ("=PRODUCT(B1:C3)", 0),
+    ("=AVERAGE(A1:A3)", 2),
+    ("=MIN(C1:C3)", 0),
+    ("=MAX(A1:A3)", 3),
+    ("=COUNT(A1:B2)", 2),
+    ("=COUNTA(A1:C3)", 5),
+    ("=ROUND(2.5, 0)", 3),
+    ('=IF(A1>1, "big", "small")', "small"),
+    ('=CONCATENATE(B1, "-", A2)', "x-2"),
+    ("=VLOOKUP(2, A1:A3, 1, FALSE)", 2),
+    ("=INDEX(A1:A3, MATCH(3, A1:A3, 0))", 3),
+    ("=1/0", "#DIV/0!"),
+]
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestRecalculate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "book.xlsx")
+
+    def make_workbook(self, formulas):
+        wb = Workbook()
+        ws = wb.active
+        for row, value in enumerate([1, 2, 3], start=1):
+            ws.cell(row=row, column=1, value=value)
+        ws["B1"] = "x"
+        ws["B2"] = "y"
+        for row, formula in enumerate(formulas, start=1):
+            ws.cell(row=row, column=5, value=formula)
+        wb.save(self.path)
+
+    def test_expected_values(self):
+        formulas = [formula for formula, _ in EXPECTED_VALUES]
+        self.make_workbook(formulas)
+
+        self.assertEqual(recalculate(self.path), len(formulas))
+
+        ws = load_workbook(self.path, data_only=True).active
+        for row, (formula, expected) in enumerate(EXPECTED_VALUES, start=1):
+            with self.subTest(formula=formula):
+                self.assertEqual(ws.cell(row=row, column=5).value, expected)
+
+    def test_unsupported_formula_leaves_file_unchanged(self):
+        self.make_workbook(["=SUM(A1:A3)", "=NOSUCHFUNCTION(A1)"])
+        with open(self.path, "rb") as f:
+            before = f.read()
+
+        with self.assertRaises(UnsupportedFormula):
+            recalculate(self.path)
+
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
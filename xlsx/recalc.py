@@ -4,13 +4,36 @@ Excel Formula Recalculation Script
 Recalculates all formulas in an Excel file using LibreOffice
 """
 
+import argparse
+import importlib.util
 import json
-import sys
 import subprocess
 import os
 import platform
+import posixpath
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from openpyxl import load_workbook
+
+from lxml import etree
+
+EXCEL_ERRORS = ['#VALUE!', '#DIV/0!', '#REF!', '#NAME?', '#NULL!', '#NUM!', '#N/A']
+SPREADSHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELATIONSHIP_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+# Workbooks are untrusted: never expand entities or fetch anything over the network
+XML_PARSER_OPTIONS = {
+    'resolve_entities': False,
+    'no_network': True,
+    'remove_comments': True,
+    'remove_pis': True,
+}
+XML_PARSER = etree.XMLParser(**XML_PARSER_OPTIONS)
 
 
 def setup_libreoffice_macro():
@@ -50,13 +73,16 @@ def setup_libreoffice_macro():
         return False
 
 
-def recalc(filename, timeout=30):
+def recalc(filename, timeout=30, workers=1, engine='libreoffice'):
     """
     Recalculate formulas in Excel file and report any errors
     
     Args:
         filename: Path to Excel file
         timeout: Maximum time to wait for recalculation (seconds)
+        workers: Number of sheets to scan for errors in parallel (0 = one per CPU)
+        engine: 'libreoffice', 'python' (built-in evaluator only) or 'auto'
+            (built-in evaluator, falling back to LibreOffice for unsupported formulas)
     
     Returns:
         dict with error locations and counts
@@ -64,6 +90,11 @@ def recalc(filename, timeout=30):
     if not Path(filename).exists():
         return {'error': f'File {filename} does not exist'}
     
+    if engine != 'libreoffice':
+        result = recalc_builtin(filename, workers)
+        if engine == 'python' or 'unsupported' not in result:
+            return result
+
     abs_path = str(Path(filename).absolute())
     
     if not setup_libreoffice_macro():
@@ -98,80 +129,566 @@ def recalc(filename, timeout=30):
         else:
             return {'error': error_msg}
     
-    # Check for Excel errors in the recalculated file - scan ALL cells
     try:
-        wb = load_workbook(filename, data_only=True)
-        
-        excel_errors = ['#VALUE!', '#DIV/0!', '#REF!', '#NAME?', '#NULL!', '#NUM!', '#N/A']
-        error_details = {err: [] for err in excel_errors}
-        total_errors = 0
-        
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            # Check ALL rows and columns - no limits
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value is not None and isinstance(cell.value, str):
-                        for err in excel_errors:
-                            if err in cell.value:
-                                location = f"{sheet_name}!{cell.coordinate}"
-                                error_details[err].append(location)
-                                total_errors += 1
-                                break
-        
-        wb.close()
-        
-        # Build result summary
-        result = {
-            'status': 'success' if total_errors == 0 else 'errors_found',
-            'total_errors': total_errors,
-            'error_summary': {}
-        }
-        
-        # Add non-empty error categories
-        for err_type, locations in error_details.items():
-            if locations:
-                result['error_summary'][err_type] = {
-                    'count': len(locations),
-                    'locations': locations[:20]  # Show up to 20 locations
-                }
-        
-        # Add formula count for context - also check ALL cells
-        wb_formulas = load_workbook(filename, data_only=False)
-        formula_count = 0
-        for sheet_name in wb_formulas.sheetnames:
-            ws = wb_formulas[sheet_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value and isinstance(cell.value, str) and cell.value.startswith('='):
-                        formula_count += 1
-        wb_formulas.close()
-        
-        result['total_formulas'] = formula_count
-        
-        return result
-        
+        result = scan_workbook_errors(filename, workers=workers)
+    except Exception as e:
+        return {'error': str(e)}
+    if engine != 'libreoffice':
+        result['engine'] = 'libreoffice'
+    return result
+
+
+def recalc_builtin(filename, workers=1):
+    """
+    Recalculate formulas with the pure-Python evaluator in formula_engine.py
+
+    Returns:
+        dict like recalc() with engine 'python', or with 'error' and
+        'unsupported' set when the workbook needs LibreOffice
+    """
+    from formula_engine import UnsupportedFormula, recalculate
+
+    try:
+        recalculate(filename)
+    except UnsupportedFormula as e:
+        return {'error': f'Built-in evaluator cannot recalculate this file: {e}', 'unsupported': True}
+    try:
+        result = scan_workbook_errors(filename, workers=workers)
     except Exception as e:
         return {'error': str(e)}
+    result['engine'] = 'python'
+    return result
+
+
+def _local_name(tag):
+    """Strip the namespace from an element tag ('' for unexpanded entities)"""
+    if not isinstance(tag, str):
+        return ''
+    return tag.rsplit('}', 1)[-1]
+
+
+def _column_letter(index):
+    """Convert a 1-based column index to letters (1 -> A, 27 -> AA)"""
+    letters = ''
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _column_index(letters):
+    """Convert column letters to a 1-based column index (A -> 1, AA -> 27)"""
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - 64
+    return index
+
+
+def _split_reference(ref):
+    """Split a cell reference like 'AB12' into ('AB', 12)"""
+    for i, char in enumerate(ref):
+        if char.isdigit():
+            return ref[:i], int(ref[i:])
+    return ref, 0
+
+
+def _find_error(value):
+    """Return the first Excel error contained in a cell string, or None"""
+    for err in EXCEL_ERRORS:
+        if err in value:
+            return err
+    return None
+
+
+def _resolve_target(base_dir, target):
+    """Resolve a relationship target against the directory of its source part"""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(base_dir, target))
+
+
+def _read_rels(archive, part_name):
+    """Map relationship ids to (type, part name) for a package part"""
+    base_dir, file_name = posixpath.split(part_name)
+    rels_name = posixpath.join(base_dir, '_rels', file_name + '.rels')
+    if rels_name not in archive.namelist():
+        return {}
+    root = etree.fromstring(archive.read(rels_name), XML_PARSER)
+    return {
+        rel.get('Id'): (rel.get('Type', ''), _resolve_target(base_dir, rel.get('Target', '')))
+        for rel in root
+        if rel.get('TargetMode') != 'External'
+    }
+
+
+def _list_worksheets(archive):
+    """Return the workbook part name and its (sheet name, part name) pairs in tab order"""
+    workbook_part = 'xl/workbook.xml'
+    for rel_type, target in _read_rels(archive, '').values():
+        if rel_type.endswith('/officeDocument'):
+            workbook_part = target
+            break
+
+    rels = _read_rels(archive, workbook_part)
+    root = etree.fromstring(archive.read(workbook_part), XML_PARSER)
+    sheets = []
+    for sheet in root.iter(f'{{{SPREADSHEET_NS}}}sheet'):
+        rel_type, target = rels.get(sheet.get(f'{{{RELATIONSHIP_NS}}}id'), ('', ''))
+        # Chartsheets and dialog sheets hold no cells
+        if rel_type.endswith('/worksheet'):
+            sheets.append((sheet.get('name'), target))
+    return workbook_part, sheets
+
+
+def _scan_shared_strings(archive, workbook_part):
+    """
+    Stream the shared string table and keep only the entries that contain an error
+
+    Returns:
+        dict mapping shared string index -> error string
+    """
+    part_name = None
+    for rel_type, target in _read_rels(archive, workbook_part).values():
+        if rel_type.endswith('/sharedStrings'):
+            part_name = target
+            break
+    if part_name is None or part_name not in archive.namelist():
+        return {}
+
+    error_strings = {}
+    index = 0
+    with archive.open(part_name) as f:
+        parent = None
+        for event, elem in etree.iterparse(f, events=('start', 'end'), **XML_PARSER_OPTIONS):
+            name = _local_name(elem.tag)
+            if event == 'start':
+                if name == 'sst':
+                    parent = elem
+                continue
+            if name != 'si':
+                continue
+            # Phonetic runs (rPh) are not part of the displayed value
+            text = ''.join(
+                t.text or ''
+                for child in elem
+                if _local_name(child.tag) in ('t', 'r')
+                for t in child.iter()
+                if _local_name(t.tag) == 't'
+            )
+            err = _find_error(text)
+            if err:
+                error_strings[index] = err
+            index += 1
+            elem.clear()
+            if parent is not None:
+                parent.remove(elem)
+    return error_strings
+
+
+def _scan_worksheet(xlsx_path, sheet_name, part_name, error_strings):
+    """
+    Stream one worksheet and collect error cells and the formula count
+
+    Error cells are either typed t="e" or hold a string (shared, inline or
+    formula result) containing an error value. Rows are discarded as soon as
+    they are read, so memory does not grow with the sheet size.
+
+    Returns:
+        (list of (error, location) in cell order, formula count)
+    """
+    errors = []
+    formula_count = 0
+
+    with zipfile.ZipFile(xlsx_path) as archive, archive.open(part_name) as f:
+        sheet_data = None
+        row_number = 0
+        column = 0
+        for event, elem in etree.iterparse(f, events=('start', 'end'), **XML_PARSER_OPTIONS):
+            name = _local_name(elem.tag)
+            if event == 'start':
+                if name == 'sheetData':
+                    sheet_data = elem
+                elif name == 'row':
+                    row_number = int(elem.get('r', row_number + 1))
+                    column = 0
+                continue
+
+            if name == 'c':
+                ref = elem.get('r')
+                if ref:
+                    letters, _ = _split_reference(ref)
+                    column = _column_index(letters)
+                else:
+                    column += 1
+                    ref = f'{_column_letter(column)}{row_number}'
+
+                value = None
+                cell_type = elem.get('t', 'n')
+                for child in elem:
+                    child_name = _local_name(child.tag)
+                    if child_name == 'f':
+                        formula_count += 1
+                    elif child_name == 'v':
+                        value = child.text
+                    elif child_name == 'is':
+                        value = ''.join(
+                            t.text or ''
+                            for t in child.iter()
+                            if _local_name(t.tag) == 't'
+                        )
+
+                err = None
+                if value is not None:
+                    if cell_type == 's':
+                        err = error_strings.get(int(value))
+                    elif cell_type in ('e', 'str', 'inlineStr'):
+                        err = _find_error(value)
+                if err:
+                    errors.append((err, f"{sheet_name}!{ref}"))
+            elif name == 'row':
+                elem.clear()
+                if sheet_data is not None:
+                    sheet_data.remove(elem)
+
+    return errors, formula_count
+
+
+def scan_workbook_errors(filename, workers=1):
+    """
+    Scan an Excel file for formula errors without loading the workbook
+
+    Reads the sheet XML directly with iterparse, so memory stays bounded
+    regardless of the number of rows.
+
+    Args:
+        filename: Path to Excel file
+        workers: Number of sheets to scan in parallel (0 = one per CPU)
+
+    Returns:
+        dict with status, total_errors, error_summary and total_formulas
+    """
+    with zipfile.ZipFile(filename) as archive:
+        workbook_part, sheets = _list_worksheets(archive)
+        error_strings = _scan_shared_strings(archive, workbook_part)
+
+    workers = workers or os.cpu_count() or 1
+    jobs = [(filename, name, part, error_strings) for name, part in sheets]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            results = list(executor.map(_scan_worksheet, *zip(*jobs)))
+    else:
+        results = [_scan_worksheet(*job) for job in jobs]
+
+    error_details = {err: [] for err in EXCEL_ERRORS}
+    formula_count = 0
+    for errors, sheet_formulas in results:
+        for err, location in errors:
+            error_details[err].append(location)
+        formula_count += sheet_formulas
+    total_errors = sum(len(locations) for locations in error_details.values())
+
+    # Build result summary
+    result = {
+        'status': 'success' if total_errors == 0 else 'errors_found',
+        'total_errors': total_errors,
+        'error_summary': {}
+    }
+
+    # Add non-empty error categories
+    for err_type, locations in error_details.items():
+        if locations:
+            result['error_summary'][err_type] = {
+                'count': len(locations),
+                'locations': locations[:20]  # Show up to 20 locations
+            }
+
+    result['total_formulas'] = formula_count
+
+    return result
+
+
+class LibreOfficeSession:
+    """
+    A headless LibreOffice instance driven over UNO
+
+    Each session runs with its own user profile and pipe name, so several
+    sessions can run side by side. A watchdog kills the instance when a file
+    takes longer than its timeout; the session then restarts on demand.
+    """
+
+    def __init__(self, startup_timeout=60):
+        self.startup_timeout = startup_timeout
+        self.profile_dir = tempfile.mkdtemp(prefix='recalc_profile_')
+        self.pipe_name = f'recalc_{os.getpid()}_{uuid.uuid4().hex[:8]}'
+        self.process = None
+        self.desktop = None
+        self.starts = 0
+        self.timed_out = False
+
+    @property
+    def restarts(self):
+        return max(0, self.starts - 1)
+
+    def start(self):
+        """Launch soffice and connect to it"""
+        self.starts += 1
+        try:
+            import uno
+            from com.sun.star.connection import NoConnectException
+        except ImportError:
+            raise RuntimeError('Batch mode needs the LibreOffice Python bridge (uno)')
+
+        self.process = subprocess.Popen(
+            [
+                'soffice', '--headless', '--invisible', '--norestore',
+                '--nologo', '--nodefault', '--nolockcheck',
+                f'-env:UserInstallation={Path(self.profile_dir).as_uri()}',
+                f'--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext',
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            'com.sun.star.bridge.UnoUrlResolver', local_context
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            try:
+                context = resolver.resolve(
+                    f'uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext'
+                )
+                break
+            except NoConnectException:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.kill()
+                    raise RuntimeError('LibreOffice did not start')
+                time.sleep(0.25)
+
+        self.desktop = context.ServiceManager.createInstanceWithContext(
+            'com.sun.star.frame.Desktop', context
+        )
+
+    def kill(self):
+        """Stop the soffice process immediately"""
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+        self.desktop = None
+
+    def close(self):
+        """Shut down LibreOffice and remove the temporary profile"""
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+                self.process.wait(timeout=10)
+            except Exception as e:
+                # kill() below stops the process regardless
+                print(f'Warning: LibreOffice did not shut down cleanly: {e}', file=sys.stderr)
+        self.kill()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+    def recalculate(self, filename, timeout=30):
+        """
+        Open, recalculate and store one file in this instance
+
+        Raises:
+            TimeoutError: if the file took longer than timeout; the instance is killed
+            RuntimeError: if LibreOffice failed or crashed
+        """
+        if self.desktop is None:
+            self.start()
+
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def prop(name, value):
+            p = PropertyValue()
+            p.Name = name
+            p.Value = value
+            return p
+
+        def on_timeout():
+            self.timed_out = True
+            self.kill()
+
+        self.timed_out = False
+        watchdog = threading.Timer(timeout, on_timeout)
+        watchdog.start()
+        try:
+            doc = self.desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(str(Path(filename).absolute())),
+                '_blank', 0, (prop('Hidden', True), prop('MacroExecutionMode', 0)),
+            )
+            if doc is None:
+                raise RuntimeError('LibreOffice could not open the file')
+            try:
+                doc.calculateAll()
+                doc.store()
+            finally:
+                doc.close(True)
+        except Exception as e:
+            if self.timed_out:
+                raise TimeoutError(f'Recalculation timed out after {timeout}s')
+            # The instance may be in any state after a failure; start over
+            self.kill()
+            raise RuntimeError(f'LibreOffice failed: {e}')
+        finally:
+            watchdog.cancel()
+
+
+def uno_available():
+    """Return True if the LibreOffice Python bridge (uno) can be imported"""
+    return importlib.util.find_spec('uno') is not None
+
+
+def _recalc_batch_worker(filenames, timeout, max_restarts, engine='libreoffice', workers=1):
+    """Recalculate a list of files in one LibreOffice session and report on each"""
+    session = LibreOfficeSession()
+    reports = []
+    try:
+        for filename in filenames:
+            report = {'file': str(filename)}
+            start = time.monotonic()
+            builtin = None
+            if engine != 'libreoffice' and Path(filename).exists():
+                builtin = recalc_builtin(filename, workers)
+            if not Path(filename).exists():
+                report['error'] = f'File {filename} does not exist'
+            elif builtin is not None and (engine == 'python' or 'unsupported' not in builtin):
+                report.update(builtin)
+            elif session.desktop is None and session.starts > max_restarts:
+                report['error'] = 'Skipped: LibreOffice restart limit reached'
+            else:
+                try:
+                    # Starts the instance, or restarts it if the last file took it down
+                    session.recalculate(filename, timeout)
+                    report.update(scan_workbook_errors(filename, workers=workers))
+                    if engine != 'libreoffice':
+                        report['engine'] = 'libreoffice'
+                except (TimeoutError, RuntimeError) as e:
+                    report['error'] = str(e)
+                except Exception as e:
+                    report['error'] = f'Error scanning workbook: {e}'
+            report['seconds'] = round(time.monotonic() - start, 3)
+            reports.append(report)
+    finally:
+        session.close()
+    return reports
+
+
+def recalc_batch(filenames, timeout=30, jobs=1, max_restarts=3, engine='libreoffice', workers=1):
+    """
+    Recalculate many Excel files, reusing LibreOffice instances across files
+
+    Files are split across jobs; each job runs one LibreOffice instance with
+    an isolated profile and processes its files in turn. An instance that
+    crashes or exceeds a file's timeout is killed and restarted, up to
+    max_restarts times per job; after that the job's remaining files are
+    skipped.
+
+    The instances are driven through the LibreOffice Python bridge (uno).
+    Without it, each file is recalculated in turn with its own soffice launch,
+    as recalc() does, and jobs and max_restarts are ignored.
+
+    Args:
+        filenames: Paths to Excel files
+        timeout: Maximum time to wait for each file (seconds)
+        jobs: Number of LibreOffice instances to run in parallel
+        max_restarts: Restarts allowed per instance before giving up
+        engine: 'libreoffice', 'python' or 'auto', as for recalc()
+        workers: Number of sheets of each file to scan for errors in parallel
+
+    Returns:
+        list of per-file dicts in input order: 'file', 'seconds', and either
+        the recalc() error summary or an 'error' message
+    """
+    filenames = [str(f) for f in filenames]
+    if not uno_available():
+        reports = []
+        for filename in filenames:
+            start = time.monotonic()
+            report = {'file': filename}
+            report.update(recalc(filename, timeout, workers, engine))
+            report['seconds'] = round(time.monotonic() - start, 3)
+            reports.append(report)
+        return reports
+
+    jobs = max(1, min(jobs, len(filenames)))
+    chunks = [filenames[i::jobs] for i in range(jobs)]
+
+    if jobs == 1:
+        chunk_reports = [_recalc_batch_worker(chunks[0], timeout, max_restarts, engine, workers)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            chunk_reports = list(executor.map(
+                _recalc_batch_worker, chunks, [timeout] * jobs, [max_restarts] * jobs,
+                [engine] * jobs, [workers] * jobs,
+            ))
+
+    # Chunks were interleaved, so interleave the reports back into input order
+    reports = [None] * len(filenames)
+    for i, chunk in enumerate(chunk_reports):
+        reports[i::jobs] = chunk
+    return reports
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python recalc.py <excel_file> [timeout_seconds]")
-        print("\nRecalculates all formulas in an Excel file using LibreOffice")
-        print("\nReturns JSON with error details:")
-        print("  - status: 'success' or 'errors_found'")
-        print("  - total_errors: Total number of Excel errors found")
-        print("  - total_formulas: Number of formulas in the file")
-        print("  - error_summary: Breakdown by error type with locations")
-        print("    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A")
-        sys.exit(1)
-    
-    filename = sys.argv[1]
-    timeout = int(sys.argv[2]) if len(sys.argv) > 2 else 30
-    
-    result = recalc(filename, timeout)
-    print(json.dumps(result, indent=2))
+    parser = argparse.ArgumentParser(
+        description='Recalculates all formulas in Excel files using LibreOffice',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Returns JSON with error details:
+  - status: 'success' or 'errors_found'
+  - total_errors: Total number of Excel errors found
+  - total_formulas: Number of formulas in the file
+  - error_summary: Breakdown by error type with locations
+    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A
+
+With several files (or --batch), all files are recalculated in long-running
+LibreOffice instances and the output is a JSON list with one report per file.
+This needs the LibreOffice Python bridge (uno); without it, soffice is
+launched once per file instead.
+        """,
+    )
+    parser.add_argument('files', nargs='+', help='Excel file(s) to recalculate')
+    parser.add_argument('--timeout', type=int, default=None,
+                        help='Maximum time per file in seconds (default: 30)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Use batch mode even for a single file')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='LibreOffice instances to run in parallel in batch mode')
+    parser.add_argument('--max-restarts', type=int, default=3,
+                        help='Restarts allowed per instance after a crash or timeout')
+    parser.add_argument('--engine', choices=['libreoffice', 'python', 'auto'], default='libreoffice',
+                        help="Recalculation engine; 'auto' tries the built-in evaluator "
+                             "and falls back to LibreOffice for unsupported formulas")
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Sheets to scan for errors in parallel per file (0 = one per CPU)')
+    parser.add_argument('--report', help='Also write the JSON output to this file')
+    args = parser.parse_args()
+
+    files = args.files
+    timeout = args.timeout
+    # Legacy form: recalc.py <excel_file> [timeout_seconds]
+    if len(files) == 2 and files[1].isdigit() and not Path(files[1]).exists():
+        timeout = timeout or int(files[1])
+        files = files[:1]
+    timeout = timeout or 30
+
+    if len(files) > 1 or args.batch:
+        result = recalc_batch(files, timeout, jobs=args.jobs, max_restarts=args.max_restarts,
+                              engine=args.engine, workers=args.workers)
+    else:
+        result = recalc(files[0], timeout, workers=args.workers, engine=args.engine)
+
+    output = json.dumps(result, indent=2)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(output)
+    print(output)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from openpyxl import Workbook
+
+import recalc
+from recalc import recalc_batch, scan_workbook_errors
+
+
+# Currently this is not run automatically in CI; it's just for documentation and manual checking.
+class TestScanWorkbookErrors(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "book.xlsx")
+
+    def edit_part(self, part_name, edit):
+        """Rewrite one part of the saved workbook with edit(bytes) -> bytes"""
+        with zipfile.ZipFile(self.path) as source:
+            parts = {info: source.read(info.filename) for info in source.infolist()}
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED) as target:
+            for info, data in parts.items():
+                if info.filename == part_name:
+                    data = edit(data)
+                target.writestr(info, data)
+
+    def test_errors_on_every_sheet(self):
+        wb = Workbook()
+        wb.active["A1"] = "=1/0"
+        for i in range(3):
+            ws = wb.create_sheet(f"Sheet{i + 2}")
+            ws["B2"] = "#N/A"
+            ws["C3"] = "=A1"
+        wb.save(self.path)
+
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                result = scan_workbook_errors(self.path, workers=workers)
+                self.assertEqual(result["total_formulas"], 4)
+                self.assertEqual(
+                    result["error_summary"]["#N/A"]["locations"],
+                    ["Sheet2!B2", "Sheet3!B2", "Sheet4!B2"],
+                )
+
+    def test_entities_are_not_expanded(self):
+        wb = Workbook()
+        wb.active["A1"] = "placeholder"
+        wb.save(self.path)
+        # An internal entity that would expand to an error value
+        doctype = b'<!DOCTYPE worksheet [<!ENTITY e "#REF!">]>'
+        self.edit_part(
+            "xl/worksheets/sheet1.xml",
+            lambda data: doctype + data.replace(b"placeholder", b"&e;"),
+        )
+
+        result = scan_workbook_errors(self.path)
+        self.assertEqual(result["total_errors"], 0)
+
+
+class TestRecalcBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    @mock.patch.object(recalc, "uno_available", return_value=False)
+    def test_without_uno_each_file_is_recalculated_on_its_own(self, _):
+        paths = []
+        for i in range(3):
+            path = os.path.join(self.tmp.name, f"book{i}.xlsx")
+            wb = Workbook()
+            wb.active["A1"] = f"=1/{i}"
+            wb.save(path)
+            paths.append(path)
+        missing = os.path.join(self.tmp.name, "missing.xlsx")
+
+        with mock.patch.object(recalc, "LibreOfficeSession") as session:
+            reports = recalc_batch(paths + [missing], jobs=2, engine="python")
+
+        session.assert_not_called()
+        self.assertEqual([r["file"] for r in reports], paths + [missing])
+        self.assertEqual(reports[0]["error_summary"]["#DIV/0!"]["count"], 1)
+        self.assertEqual(reports[1]["status"], "success")
+        self.assertIn("does not exist", reports[3]["error"])
+        self.assertTrue(all("seconds" in r for r in reports))
+
+
+if __name__ == "__main__":
+    unittest.main()